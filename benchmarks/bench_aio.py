@@ -0,0 +1,96 @@
+"""
+Benchmark: async validation
+
+Simulates a gateway: many client coroutines each validate a stream of
+packets while a corpus spike arrives as one bulk request. A ticker task
+measures how long the event loop is blocked. Compares calling
+validate_packet inline with AsyncValidator on a thread and a process pool.
+
+Usage:
+    python benchmarks/bench_aio.py [clients] [packets_per_client] [spike]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import sys
+import time
+
+from vse_core import AsyncValidator
+from vse_core.validator import validate_packet
+
+from bench_batch import make_packets
+
+
+async def ticker(stop, stalls, interval=0.001):
+    """Record how late each tick fires: the loop's longest stall."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        stalls.append(loop.time() - start - interval)
+
+
+async def run(mode, clients, per_client, spike):
+    packets = make_packets(per_client)
+    bulk = make_packets(spike)
+    stop = asyncio.Event()
+    stalls = []
+    tick = asyncio.create_task(ticker(stop, stalls))
+    validator = None
+    pool = None
+    if mode == "thread":
+        validator = AsyncValidator()
+    elif mode == "process":
+        pool = ProcessPoolExecutor(max_workers=2)
+        validator = AsyncValidator(executor=pool)
+
+    async def client():
+        for packet in packets:
+            if validator is None:
+                validate_packet(packet)
+                await asyncio.sleep(0)
+            else:
+                await validator.validate(packet)
+
+    async def spike_request():
+        await asyncio.sleep(0.005)
+        if validator is None:
+            [validate_packet(p) for p in bulk]
+        else:
+            await validator.validate_many(bulk)
+
+    start = time.perf_counter()
+    await asyncio.gather(spike_request(), *(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    latencies = {}
+    if validator is not None:
+        latencies = validator.latency_percentiles((50, 99))
+        await validator.aclose()
+    if pool is not None:
+        pool.shutdown()
+    total = clients * per_client + spike
+    return total / elapsed, max(stalls, default=0.0), latencies
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    spike = int(sys.argv[3]) if len(sys.argv) > 3 else 50_000
+
+    print("=" * 60)
+    print(f"Async validation benchmark ({clients} clients x {per_client} packets, "
+          f"{spike:,}-packet spike)")
+    print("=" * 60)
+    for mode in ("inline", "thread", "process"):
+        throughput, stall, latencies = asyncio.run(run(mode, clients, per_client, spike))
+        line = f"  {mode:8} {throughput:>10,.0f} packets/s   max loop stall {stall * 1e3:>8.1f} ms"
+        if latencies:
+            line += (f"   p50 {latencies[50] * 1e3:.2f} ms"
+                     f"   p99 {latencies[99] * 1e3:.2f} ms")
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
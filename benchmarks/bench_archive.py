@@ -0,0 +1,68 @@
+"""
+Benchmark: memory-mapped packet archive
+
+Builds an archive, then reports open time, random positional access,
+id lookup and sequential range iteration.
+
+Usage:
+    python benchmarks/bench_archive.py [num_packets]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from vse_core import Packet, PacketArchive, ArchiveWriter
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(7)
+
+    print("=" * 60)
+    print(f"Packet archive benchmark ({n:,} packets)")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.vsea")
+        ids = []
+        start = time.perf_counter()
+        with ArchiveWriter(path) as writer:
+            for i in range(n):
+                packet = Packet(intent=f"task_{i}", constraints=["formal_tone", "3_sentences"],
+                                divergence=(i % 100) / 100,
+                                kbm={"coherence_vector": [0.8, 0.92]})
+                writer.append(packet)
+                if i % 97 == 0:
+                    ids.append(packet.digest())
+        build = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+        print(f"  build             {n / build:>10,.0f} packets/sec   {size / n:.0f} B/packet on disk")
+
+        start = time.perf_counter()
+        archive = PacketArchive(path)
+        print(f"  open              {(time.perf_counter() - start) * 1e3:10.2f} ms")
+
+        positions = [rng.randrange(n) for _ in range(20_000)]
+        start = time.perf_counter()
+        for i in positions:
+            archive[i]
+        elapsed = time.perf_counter() - start
+        print(f"  archive[i]        {elapsed / len(positions) * 1e6:10.1f} us/lookup")
+
+        start = time.perf_counter()
+        for packet_id in ids:
+            archive.get(packet_id)
+        elapsed = time.perf_counter() - start
+        print(f"  archive.get(id)   {elapsed / len(ids) * 1e6:10.1f} us/lookup")
+
+        start = time.perf_counter()
+        count = sum(1 for _ in archive.iter_range(0, n))
+        elapsed = time.perf_counter() - start
+        print(f"  iter_range        {count / elapsed:>10,.0f} packets/sec")
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: PacketBatch memory and filtering
+
+Reports memory per packet for a list of Packet dataclasses next to the
+same corpus held in a columnar PacketBatch, and compares a Python-loop
+filter with a vectorized mask.
+
+Usage:
+    python benchmarks/bench_batch.py [num_packets]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from vse_core import Packet, PacketBatch
+
+
+def make_packets(n: int):
+    """Build a mixed corpus with realistic token reuse."""
+    packets = []
+    for i in range(n):
+        kind = i % 3
+        divergence = (i % 100) / 100
+        if kind == 0:
+            packets.append(Packet(intent=f"summarize_{i % 500}",
+                                  constraints=["3_sentences", "formal_tone"],
+                                  divergence=divergence, version="1.3"))
+        elif kind == 1:
+            packets.append(Packet(intent=f"essay_{i % 500}",
+                                  constraints=["1000_words", "academic_tone"],
+                                  divergence=divergence,
+                                  kbm={"coherence_vector": [0.8, 0.92]},
+                                  c_tvm=["intro_premise", "conclusion_thesis", 150],
+                                  foundation=["Milieu", "Gravitas"],
+                                  mu_loop={"window_size": 5, "threshold": 0.25}))
+        else:
+            packets.append(Packet(intent=f"explore_{i % 500}", constraints=["creative"],
+                                  divergence=divergence, immune=["product name"],
+                                  gsn={"network_id": "net-7", "curiosity_factor": 0.6},
+                                  evf=["seed-3", 0.4, 5], urp_enabled=True))
+    return packets
+
+
+def traced(fn):
+    """Run fn and return (result, bytes still allocated by it)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    print("=" * 60)
+    print(f"PacketBatch benchmark ({n:,} packets)")
+    print("=" * 60)
+
+    packets, packet_bytes = traced(lambda: make_packets(n))
+    batch, batch_bytes = traced(lambda: PacketBatch.from_packets(packets))
+
+    print(f"  Packet dataclasses:  {packet_bytes / n:>8.0f} B/packet")
+    print(f"  PacketBatch:         {batch_bytes / n:>8.0f} B/packet "
+          f"(self-reported {batch.bytes_per_packet():.0f})")
+    print(f"  Reduction:           {packet_bytes / batch_bytes:>8.1f}x")
+    print()
+
+    start = time.perf_counter()
+    loop = [p for p in packets if p.divergence > 0.5 and p.get_version_layer() == "v1.4-kinetic"]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    masked = batch[(batch.divergence > 0.5) & batch.layer_mask("v1.4-kinetic")]
+    mask_time = time.perf_counter() - start
+
+    assert len(loop) == len(masked)
+    print(f"  Python loop filter:  {loop_time * 1000:>8.1f} ms")
+    print(f"  Vectorized filter:   {mask_time * 1000:>8.1f} ms")
+    print(f"  Speedup:             {loop_time / mask_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: trusted bulk reload
+
+Reloads stored packet records (to_dict() output, as kept by our store)
+through the validating constructor and through Packet.bulk_load.
+
+Usage:
+    python benchmarks/bench_bulk_load.py [num_packets]
+"""
+
+import sys
+import time
+
+from vse_core import Packet
+
+
+def make_records(n: int):
+    """Stored records for a mixed corpus."""
+    records = []
+    for i in range(n):
+        kind = i % 3
+        record = {"intent": f"task_{i % 500}", "constraints": ["3_sentences"],
+                  "divergence": (i % 100) / 100, "version": "1.4"}
+        if kind >= 1:
+            record["kbm"] = {"coherence_vector": [0.8, 0.92]}
+            record["mu_loop"] = {"window_size": 5, "threshold": 0.25}
+        if kind == 2:
+            record["gsn"] = {"network_id": "net-7", "curiosity_factor": 0.6}
+            record["urp_enabled"] = True
+        records.append(record)
+    return records
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    records = make_records(n)
+
+    print("=" * 60)
+    print(f"Bulk reload benchmark ({n:,} packets)")
+    print("=" * 60)
+    checked, t_checked = timed(lambda: [Packet(**r) for r in records])
+    del checked
+    trusted, t_trusted = timed(lambda: Packet.bulk_load(records))
+    del trusted
+    print(f"  Packet(**record)    {t_checked:6.2f} s  {n / t_checked:>10,.0f} packets/sec")
+    print(f"  Packet.bulk_load    {t_trusted:6.2f} s  {n / t_trusted:>10,.0f} packets/sec")
+    print(f"  Speedup             {t_checked / t_trusted:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
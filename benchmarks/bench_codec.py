@@ -0,0 +1,68 @@
+"""
+Benchmark: binary codec vs JSON
+
+Compares encoded size and encode/decode throughput of Packet.to_bytes /
+Packet.from_buffer against Packet.to_json / Packet.from_json.
+
+Usage:
+    python benchmarks/bench_codec.py [num_packets]
+"""
+
+import sys
+import time
+
+from vse_core import Packet
+
+
+def make_packets(n: int):
+    templates = [
+        Packet(intent="summarize_article", constraints=["3_sentences", "formal_tone"],
+               divergence=0.2, version="1.3"),
+        Packet(intent="write_technical_essay", constraints=["1000_words", "academic_tone"],
+               divergence=0.25, kbm={"coherence_vector": [0.8, 0.92]},
+               c_tvm=["intro_premise", "conclusion_thesis", 150],
+               foundation=["Milieu", "Gravitas"], mu_loop={"window_size": 5, "threshold": 0.25}),
+        Packet(intent="brainstorm_features", constraints=["creative"], divergence=0.45,
+               immune=["product name"], gsn={"network_id": "net-7", "curiosity_factor": 0.6},
+               evf=["seed-3", 0.4, 5], urp_enabled=True),
+    ]
+    return [templates[i % len(templates)] for i in range(n)]
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    packets = make_packets(n)
+
+    print("=" * 60)
+    print(f"Binary codec benchmark ({n:,} packets)")
+    print("=" * 60)
+
+    binary = [p.to_bytes() for p in packets]
+    compact = [p.to_json(indent=None) for p in packets]
+    binary_size = sum(len(b) for b in binary) / n
+    json_size = sum(len(s.encode("utf-8")) for s in compact) / n
+    print(f"  JSON size:      {json_size:>8.1f} B/packet")
+    print(f"  Binary size:    {binary_size:>8.1f} B/packet ({binary_size / json_size:.0%})")
+    print()
+
+    rows = [
+        ("encode JSON", lambda: [p.to_json(indent=None) for p in packets]),
+        ("encode binary", lambda: [p.to_bytes() for p in packets]),
+        ("decode JSON", lambda: [Packet.from_json(s) for s in compact]),
+        ("decode binary", lambda: [Packet.from_buffer(b) for b in binary]),
+    ]
+    for label, fn in rows:
+        print(f"  {label:<16} {n / best_of(fn):>12,.0f} packets/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: lazy nested-field decoding
+
+Parses a VSE corpus eagerly and lazily. The routing stage reads only
+intent, divergence and constraints; the full stage touches every field.
+
+Usage:
+    python benchmarks/bench_lazy.py [num_packets]
+"""
+
+import sys
+import time
+
+from vse_core import Packet, parse_packets
+
+
+def make_lines(n: int):
+    """VSE lines with realistically sized Kinetic and Gregarious fields."""
+    lines = []
+    for i in range(n):
+        packet = Packet(
+            intent=f"essay_{i % 500}",
+            constraints=["1000_words", "academic_tone"],
+            divergence=(i % 100) / 100,
+            kbm={"coherence_vector": [0.8, 0.92], "momentum": 0.4, "decay": [0.1, 0.2, 0.3]},
+            c_tvm=["intro_premise", "conclusion_thesis", 150],
+            mu_loop={"window_size": 5, "threshold": 0.25, "history": [0.1] * 8},
+            gsn={"network_id": f"net-{i % 7}", "curiosity_factor": 0.6,
+                 "peers": [f"agent-{j}" for j in range(12)],
+                 "weights": {f"agent-{j}": j / 12 for j in range(6)}},
+            evf=["seed-3", 0.4, 5],
+        )
+        lines.append(packet.to_vse())
+    return lines
+
+
+def route(packets):
+    """Routing stage: touches only the core fields."""
+    total = 0
+    for packet in packets:
+        if packet.divergence < 0.5 and packet.constraints:
+            total += len(packet.intent)
+    return total
+
+
+def full(packets):
+    """Full stage: touches every field."""
+    return sum(len(packet.to_dict()) for packet in packets)
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    lines = make_lines(n)
+
+    print("=" * 60)
+    print(f"Lazy decoding benchmark ({n:,} packets)")
+    print("=" * 60)
+    for stage_name, stage in (("routing", route), ("full", full)):
+        eager = best_of(lambda: stage(parse_packets(lines)))
+        lazy = best_of(lambda: stage(parse_packets(lines, lazy=True)))
+        print(f"  {stage_name:<8} eager {n / eager:>9,.0f}/s   lazy {n / lazy:>9,.0f}/s   "
+              f"({eager / lazy:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
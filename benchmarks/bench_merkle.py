@@ -0,0 +1,78 @@
+"""
+Benchmark: incremental Merkle roots
+
+Grows a history one entry at a time and takes the root after each
+append, recomputing with merkle_root and with a MerkleTree. Then updates
+random entries of the full history, and times proof generation and
+verification.
+
+Usage:
+    python benchmarks/bench_merkle.py [num_entries]
+"""
+
+import random
+import sys
+import time
+
+from vse_core.merkle_semantic import ConsistencyProof, InclusionProof, MerkleTree, merkle_root
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    items = [f"entry-{i}" for i in range(n)]
+
+    print("=" * 60)
+    print(f"Incremental Merkle benchmark ({n:,} appends)")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    for i in range(1, n + 1):
+        expected = merkle_root(items[:i])
+    rebuild = time.perf_counter() - start
+
+    tree = MerkleTree()
+    start = time.perf_counter()
+    for item in items:
+        tree.append(item)
+        root = tree.root()
+    incremental = time.perf_counter() - start
+    assert root == expected
+
+    print(f"  merkle_root per append   {rebuild / n * 1e6:>10.1f} us/append")
+    print(f"  MerkleTree.append        {incremental / n * 1e6:>10.1f} us/append "
+          f"({rebuild / incremental:.0f}x)")
+
+    rng = random.Random(0)
+    updates = [(rng.randrange(n), f"changed-{i}") for i in range(n)]
+    start = time.perf_counter()
+    for index, item in updates:
+        tree.update(index, item)
+        items[index] = item
+        tree.root()
+    elapsed = time.perf_counter() - start
+    print(f"  MerkleTree.update        {elapsed / n * 1e6:>10.1f} us/update")
+
+    root = tree.root()
+    indexes = [rng.randrange(n) for _ in range(n)]
+    start = time.perf_counter()
+    proofs = [tree.inclusion_proof(i).to_bytes() for i in indexes]
+    made = time.perf_counter() - start
+    start = time.perf_counter()
+    for i, data in zip(indexes, proofs):
+        assert InclusionProof.from_bytes(data).verify(items[i], root)
+    checked = time.perf_counter() - start
+    print(f"  Inclusion proof          {made / n * 1e6:>10.1f} us to make, "
+          f"{checked / n * 1e6:.1f} us to verify, {len(proofs[0])} bytes")
+
+    old_size = n // 3
+    old_root = merkle_root(items[:old_size])
+    start = time.perf_counter()
+    data = tree.consistency_proof(old_size).to_bytes()
+    assert ConsistencyProof.from_bytes(data).verify(old_root, root)
+    elapsed = time.perf_counter() - start
+    print(f"  Consistency proof        {elapsed * 1e6:>10.1f} us to make and verify, "
+          f"{len(data)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: parallel Merkle builds
+
+Times merkle_root and merkle_root_parallel over small leaves (short
+strings) and large payload leaves, with 1, 2, 4, ... threads up to the
+CPU count. Threads only overlap while hashlib hashes buffers of 2 KiB
+or more, so small leaves are not expected to scale.
+
+Usage:
+    python benchmarks/bench_merkle_parallel.py [small_leaves] [large_leaves] [payload_bytes]
+"""
+
+import os
+import sys
+import time
+
+from vse_core.merkle_semantic import merkle_root, merkle_root_parallel
+
+
+def best(fn, repeats=3):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def run(label, items):
+    print(f"  {label}")
+    serial, expected = best(lambda: merkle_root(items))
+    print(f"    merkle_root                 {serial:>8.3f}s")
+    cores = os.cpu_count() or 1
+    workers = sorted({1, cores} | {2 ** k for k in range(1, cores.bit_length())})
+    for count in workers:
+        elapsed, root = best(lambda: merkle_root_parallel(items, workers=count))
+        assert root == expected
+        print(f"    parallel, {count:>2} thread(s)        {elapsed:>8.3f}s  "
+              f"({serial / elapsed:.2f}x)")
+
+
+def main():
+    small = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    large = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    payload = int(sys.argv[3]) if len(sys.argv) > 3 else 64 * 1024
+
+    print("=" * 60)
+    print(f"Parallel Merkle benchmark ({os.cpu_count()} CPUs)")
+    print("=" * 60)
+    run(f"{small:,} small leaves", [f"entry-{i}" for i in range(small)])
+    blob = os.urandom(payload + large)
+    run(f"{large:,} leaves of {payload:,} bytes",
+        [blob[i:i + payload] for i in range(large)])
+
+
+if __name__ == "__main__":
+    main()
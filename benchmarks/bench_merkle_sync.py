@@ -0,0 +1,46 @@
+"""
+Benchmark: Merkle anti-entropy
+
+Syncs a replica that differs from the server in k scattered entries and
+reports the bytes exchanged against re-sending the whole history. The
+server answers in-process; traffic does not depend on the transport.
+
+Usage:
+    python benchmarks/bench_merkle_sync.py [num_entries]
+"""
+
+import random
+import sys
+import time
+
+from vse_core.merkle_semantic import MerkleTree
+from vse_core.merkle_sync import SyncClient, SyncServer
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    items = [f"entry-{i:08d}" for i in range(n)]
+    server = SyncServer(MerkleTree(items), items)
+    full = sum(len(item) for item in items)
+
+    print("=" * 60)
+    print(f"Merkle sync benchmark ({n:,} entries, {full:,} bytes to re-send)")
+    print("=" * 60)
+    rng = random.Random(0)
+    for changes in (1, 10, 100, 1000):
+        replica = list(items)
+        for index in rng.sample(range(n), changes):
+            replica[index] = "stale"
+        tree = MerkleTree(replica)
+        client = SyncClient(tree, server.handle)
+        start = time.perf_counter()
+        client.sync()
+        elapsed = time.perf_counter() - start
+        assert tree.root() == server.tree.root()
+        traffic = client.bytes_sent + client.bytes_received
+        print(f"  {changes:>5} differences: {traffic:>9,} bytes ({traffic / full:7.3%}), "
+              f"{client.round_trips} round trips, {elapsed * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
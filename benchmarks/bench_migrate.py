@@ -0,0 +1,57 @@
+"""
+Benchmark: batch migration
+
+Migrates a v1.3 corpus to v1.4 one packet at a time with migrate_packet,
+then with migrate_batch in this process and on a process pool.
+
+Usage:
+    python benchmarks/bench_migrate.py [num_packets] [workers]
+"""
+
+import os
+import sys
+import time
+
+from vse_core import Packet, migrate_batch, migrate_packet
+
+
+INTENTS = ["summarize_report", "write_formal_essay", "describe_the_setting",
+           "explain_main_argument", "capture_the_mood", "translate_text"]
+CONSTRAINTS = [["3_sentences", "formal_tone"], ["1000_words", "academic_tone"],
+               ["creative"], ["emotional_register", "key_points"], []]
+
+
+def make_v13_packets(n: int):
+    return [Packet(intent=f"{INTENTS[i % len(INTENTS)]}_{i % 997}",
+                   constraints=list(CONSTRAINTS[i % len(CONSTRAINTS)]),
+                   divergence=(i % 100) / 100, version="1.3")
+            for i in range(n)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    print("=" * 60)
+    print(f"Migration benchmark ({n:,} v1.3 packets)")
+    print("=" * 60)
+
+    packets = make_v13_packets(n)
+    single = min(timed(lambda: [migrate_packet(p) for p in packets]) for _ in range(3))
+    batch = min(timed(lambda: migrate_batch(packets, workers=0)) for _ in range(3))
+    pool = timed(lambda: migrate_batch(packets, workers=workers))
+    for label, seconds in (("migrate_packet loop", single),
+                           ("migrate_batch, in process", batch),
+                           (f"migrate_batch, {workers} workers", pool)):
+        print(f"  {label:<28} {seconds:>7.2f}s  {n / seconds:>10,.0f} packets/s "
+              f"({single / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark: parallel corpus validation
+
+Writes a JSON Lines corpus, then validates it sequentially (iter_packets
+plus validate_packet) and with validate_corpus on a process pool,
+printing throughput and worker utilization.
+
+Usage:
+    python benchmarks/bench_parallel.py [num_packets] [workers]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from vse_core import PacketWriter, iter_packets, validate_corpus
+from vse_core.validator import validate_packet
+
+from bench_batch import make_packets
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    print("=" * 60)
+    print(f"Parallel validation benchmark ({n:,} packets, {workers} workers)")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.jsonl")
+        with PacketWriter(path) as writer:
+            writer.write_many(make_packets(n))
+
+        start = time.perf_counter()
+        sequential = sum(not validate_packet(p).valid for p in iter_packets(path))
+        seq_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = sum(not r.valid for r in validate_corpus(path, workers=workers,
+                                                             report=sys.stdout))
+        par_time = time.perf_counter() - start
+
+    assert sequential == parallel
+    print(f"  Sequential:          {n / seq_time:>10,.0f} packets/s")
+    print(f"  validate_corpus:     {n / par_time:>10,.0f} packets/s")
+    print(f"  Speedup:             {seq_time / par_time:>10.2f}x on {os.cpu_count()} CPU(s)")
+
+
+if __name__ == "__main__":
+    main()
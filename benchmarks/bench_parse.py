@@ -0,0 +1,97 @@
+"""
+Benchmark: VSE string parsing throughput
+
+Compares the single-pass scanner (Packet.from_vse / parse_packets) with the
+original split-and-regex parser, in packets per second.
+
+Usage:
+    python benchmarks/bench_parse.py [num_packets]
+"""
+
+import json
+import re
+import sys
+import time
+
+from vse_core import Packet, parse_packets
+
+
+def legacy_from_vse(vse_str: str) -> Packet:
+    """The pre-scanner parser, kept here as the comparison baseline."""
+    content = vse_str.strip().strip('<>')
+    parts = [p.strip() for p in content.split('|')]
+
+    version_match = re.match(r'VSE\s+v([\d.]+)', parts[0])
+    version = version_match.group(1) if version_match else "1.4"
+    packet_data = {"version": version}
+
+    for part in parts[1:]:
+        if ':' not in part:
+            continue
+        key, value = part.split(':', 1)
+        key = key.strip()
+        value = value.strip()
+        if key == "intent":
+            packet_data["intent"] = value
+        elif key == "divergence":
+            packet_data["divergence"] = float(value)
+        elif key == "constraints":
+            packet_data["constraints"] = Packet._parse_list(value)
+        elif key == "immune":
+            packet_data["immune"] = Packet._parse_quoted_list(value)
+        elif key in ["kbm", "gsn", "mu_loop", "c_tvm", "evf", "foundation"]:
+            packet_data[key] = json.loads(value)
+        elif key == "urp":
+            packet_data["urp_enabled"] = (value.lower() == "enabled")
+
+    return Packet(**packet_data)
+
+
+def make_corpus(n: int):
+    """Build a mixed v1.3 / kinetic / gregarious corpus both parsers accept."""
+    templates = [
+        Packet(intent="summarize_article", constraints=["3_sentences", "formal_tone"],
+               divergence=0.2, version="1.3"),
+        Packet(intent="write_technical_essay", constraints=["1000_words", "academic_tone"],
+               divergence=0.25, kbm={"coherence_vector": [0.8, 0.92]},
+               c_tvm=["intro_premise", "conclusion_thesis", 150],
+               foundation=["Milieu", "Gravitas"], mu_loop={"window_size": 5, "threshold": 0.25}),
+        Packet(intent="brainstorm_features", constraints=["creative"], divergence=0.45,
+               immune=["product name"], gsn={"network_id": "net-7", "curiosity_factor": 0.6},
+               evf=["seed-3", 0.4, 5], urp_enabled=True),
+    ]
+    lines = [t.to_vse() for t in templates]
+    return [lines[i % len(lines)] for i in range(n)]
+
+
+def bench(label: str, fn, corpus, repeat: int = 5) -> float:
+    """Best-of-N throughput, to damp scheduler noise."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(corpus)
+        best = min(best, time.perf_counter() - start)
+    rate = len(corpus) / best
+    print(f"  {label:<28} {rate:>12,.0f} packets/sec")
+    return rate
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    corpus = make_corpus(n)
+
+    print("=" * 60)
+    print(f"VSE parse benchmark ({n:,} packets)")
+    print("=" * 60)
+
+    legacy = bench("legacy from_vse", lambda c: [legacy_from_vse(s) for s in c], corpus)
+    single = bench("Packet.from_vse", lambda c: [Packet.from_vse(s) for s in c], corpus)
+    bulk = bench("parse_packets", lambda c: list(parse_packets(c)), corpus)
+
+    print()
+    print(f"  from_vse speedup:      {single / legacy:.2f}x")
+    print(f"  parse_packets speedup: {bulk / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: incremental revalidation
+
+Tweaks one field per packet, as a μ-Loop controller does between
+revalidations, and compares Validator.validate() with
+Validator.revalidate() given the previous result and the changed field.
+
+Usage:
+    python benchmarks/bench_revalidate.py [num_packets] [repeats]
+"""
+
+import gc
+import sys
+import time
+
+from vse_core import Validator
+
+from bench_batch import make_packets
+
+
+# (changed field, tweak) applied to every packet in turn
+TWEAKS = [
+    ("divergence", lambda p, step: setattr(p, "divergence", (step % 10) / 10)),
+    ("kbm.coherence_vector",
+     lambda p, step: p.kbm and p.kbm.update(coherence_vector=[0.8, 0.82 + step % 10 / 100])),
+    ("intent", lambda p, step: setattr(p, "intent", f"tuned_{step}")),
+]
+
+
+def timed(packets, previous, name, tweak, step, incremental):
+    for packet in packets:
+        tweak(packet, step)
+    # Results hold no cycles; keep collector passes out of the timings
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    if incremental:
+        results = [Validator(p).revalidate(r, (name,)) for p, r in zip(packets, previous)]
+    else:
+        results = [Validator(p).validate() for p in packets]
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed / len(packets) * 1e6, results
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print("=" * 60)
+    print(f"Revalidation benchmark ({n:,} packets)")
+    print("=" * 60)
+
+    packets = make_packets(n)
+    previous = [Validator(p).validate() for p in packets]
+    for name, tweak in TWEAKS:
+        full = incremental = float("inf")
+        for step in range(repeats):
+            seconds, expected = timed(packets, previous, name, tweak, step, False)
+            full = min(full, seconds)
+            seconds, results = timed(packets, previous, name, tweak, step, True)
+            incremental = min(incremental, seconds)
+            assert [r.errors + r.warnings for r in results] == \
+                [r.errors + r.warnings for r in expected]
+            previous = results
+        print(f"  {name}:")
+        print(f"    validate():    {full:>8.2f} us/packet")
+        print(f"    revalidate():  {incremental:>8.2f} us/packet ({full / incremental:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark: validation rules
+
+Validates a mixed corpus under each rule profile, then again with a
+RuleProfiler attached, and prints the per-rule cost table used to decide
+which rules a throughput budget can afford.
+
+Usage:
+    python benchmarks/bench_rules.py [num_packets] [repeats]
+"""
+
+import sys
+import time
+
+from vse_core import RuleProfiler, Validator, get_default_rules
+
+from bench_batch import make_packets
+
+
+def timed(packets, rules, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for packet in packets:
+            Validator(packet, rules=rules).validate()
+        best = min(best, time.perf_counter() - start)
+    return best / len(packets) * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print("=" * 60)
+    print(f"Validation rules benchmark ({n:,} packets)")
+    print("=" * 60)
+
+    packets = make_packets(n)
+    rules = get_default_rules().copy()
+    for profile in ("all", "core"):
+        rules.use_profile(profile)
+        print(f"  Profile {profile!r:8} {len(rules.enabled()):>2} rules: "
+              f"{timed(packets, rules, repeats):>8.2f} us/packet")
+
+    rules.use_profile("all")
+    plain = timed(packets, rules, repeats)
+    rules.profiler = profiler = RuleProfiler()
+    profiled = timed(packets, rules, 1)
+    print(f"  Profiling overhead: {plain:.2f} -> {profiled:.2f} us/packet")
+    print()
+    print(profiler.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: cached Packet serialization
+
+Times repeated to_vse / to_dict / to_json / repr on unchanged packets
+against the uncached rendering.
+
+Usage:
+    python benchmarks/bench_serialize.py [num_packets]
+"""
+
+import json
+import sys
+import time
+
+from vse_core import Packet
+
+
+def make_packets(n: int):
+    return [
+        Packet(intent=f"essay_{i}", constraints=["1000_words", "academic_tone"],
+               divergence=(i % 100) / 100,
+               kbm={"coherence_vector": [0.8, 0.92]},
+               c_tvm=["intro_premise", "conclusion_thesis", 150],
+               mu_loop={"window_size": 5, "threshold": 0.25},
+               gsn={"network_id": "net-7", "curiosity_factor": 0.6})
+        for i in range(n)
+    ]
+
+
+def best_of(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    packets = make_packets(n)
+
+    print("=" * 60)
+    print(f"Serialization cache benchmark ({n:,} packets)")
+    print("=" * 60)
+    uncached = {
+        "to_vse": lambda p: p._render_vse(False),
+        "to_dict": lambda p: p._render_dict(),
+        "to_json": lambda p: json.dumps(p._render_dict(), indent=2),
+    }
+    for name, render in uncached.items():
+        method = getattr(Packet, name)
+        for p in packets:
+            method(p)  # fill caches
+        cold = best_of(lambda: [render(p) for p in packets])
+        warm = best_of(lambda: [method(p) for p in packets])
+        print(f"  {name:<8} uncached {n / cold:>10,.0f}/s   cached {n / warm:>10,.0f}/s   "
+              f"({cold / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
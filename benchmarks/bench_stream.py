@@ -0,0 +1,61 @@
+"""
+Benchmark: streaming JSONL memory
+
+Writes gzip-compressed corpora of increasing size with PacketWriter, then
+reads each one with iter_packets in a fresh process and reports peak RSS
+and throughput. Peak RSS should stay flat as the file grows.
+
+Usage:
+    python benchmarks/bench_stream.py [max_packets]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+from vse_core import Packet, PacketWriter
+
+
+READER = """
+import resource, sys, time
+from vse_core import iter_packets
+start = time.perf_counter()
+n = sum(1 for _ in iter_packets(sys.argv[1]))
+elapsed = time.perf_counter() - start
+print(n, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def write_corpus(path: str, n: int) -> None:
+    with PacketWriter(path) as writer:
+        for i in range(n):
+            writer.write(Packet(intent=f"essay_{i}", constraints=["1000_words", "academic_tone"],
+                                divergence=(i % 100) / 100,
+                                kbm={"coherence_vector": [0.8, 0.92]},
+                                foundation=["Milieu", "Gravitas"],
+                                mu_loop={"window_size": 5, "threshold": 0.25}))
+
+
+def main():
+    max_n = int(sys.argv[1]) if len(sys.argv) > 1 else 400_000
+    sizes = [max_n // 16, max_n // 4, max_n]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+    print("=" * 60)
+    print("Streaming JSONL benchmark (gzip)")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = os.path.join(tmp, f"corpus_{n}.jsonl.gz")
+            write_corpus(path, n)
+            out = subprocess.run([sys.executable, "-c", READER, path], env=env,
+                                 capture_output=True, text=True, check=True).stdout
+            count, elapsed, rss_kb = out.split()
+            print(f"  {int(count):>9,} packets  {os.path.getsize(path) / 1e6:7.1f} MB gz  "
+                  f"{int(count) / float(elapsed):>9,.0f} packets/sec  "
+                  f"peak RSS {int(rss_kb) / 1024:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark: vectorized batch validation
+
+Validates a corpus packet by packet with Validator and all at once with
+validate_batch over a PacketBatch, checks the verdicts agree, and reports
+throughput for both.
+
+Usage:
+    python benchmarks/bench_validate_batch.py [num_packets]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from vse_core import PacketBatch, validate_batch
+from vse_core.validator import validate_packet
+
+from bench_batch import make_packets
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    base = min(n, 100_000)
+
+    print("=" * 60)
+    print(f"Batch validation benchmark ({n:,} packets)")
+    print("=" * 60)
+
+    base_packets = make_packets(base)
+    rows = np.arange(n) % base
+    packets = [base_packets[i] for i in rows.tolist()]
+    batch = PacketBatch.from_packets(base_packets).take(rows)
+
+    start = time.perf_counter()
+    verdicts = [validate_packet(p).valid for p in packets]
+    loop_time = time.perf_counter() - start
+
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        result = validate_batch(batch)
+        best = min(best, time.perf_counter() - start)
+
+    assert result["valid"].tolist() == verdicts
+    print(f"  Validator loop:      {loop_time:>8.2f} s  ({n / loop_time:>12,.0f} packets/s)")
+    print(f"  validate_batch:      {best:>8.2f} s  ({n / best:>12,.0f} packets/s)")
+    print(f"  Speedup:             {loop_time / best:>8.1f}x")
+    print(f"  Result size:         {result.nbytes / n:>8.0f} B/packet")
+
+
+if __name__ == "__main__":
+    main()
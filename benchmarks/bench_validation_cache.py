@@ -0,0 +1,59 @@
+"""
+Benchmark: validation result cache
+
+Validates the same corpus several times, as a pipeline does on ingest,
+after migration, before routing and before dispatch, with and without a
+ValidationCache. The first cached pass pays for content keys and for
+setting up change tracking on each packet (shared with the serialization
+cache), so it is reported separately from the later passes.
+
+Usage:
+    python benchmarks/bench_validation_cache.py [num_packets] [passes]
+"""
+
+import sys
+import time
+
+from vse_core import ValidationCache
+from vse_core.validator import validate_packet
+
+from bench_batch import make_packets
+
+
+def timed_pass(packets, cache=None):
+    start = time.perf_counter()
+    for packet in packets:
+        validate_packet(packet, cache=cache)
+    return (time.perf_counter() - start) / len(packets) * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    passes = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    print("=" * 60)
+    print(f"Validation cache benchmark ({n:,} packets x {passes} passes)")
+    print("=" * 60)
+
+    packets = make_packets(n)
+    uncached = min(timed_pass(packets) for _ in range(passes))
+
+    for label, serialized in (("fresh packets", False), ("serialized packets", True)):
+        packets = make_packets(n)
+        if serialized:
+            for packet in packets:
+                packet.to_json()
+        cache = ValidationCache(maxsize=n)
+        first = timed_pass(packets, cache)
+        later = min(timed_pass(packets, cache) for _ in range(passes - 1))
+        total = first + later * (passes - 1)
+        print(f"  {label}:")
+        print(f"    Uncached:          {uncached:>8.2f} us/packet per pass")
+        print(f"    Cached, 1st pass:  {first:>8.2f} us/packet")
+        print(f"    Cached, later:     {later:>8.2f} us/packet ({uncached / later:.1f}x)")
+        print(f"    {passes} passes:          {uncached * passes / total:>8.1f}x overall")
+        print(f"    Hit rate:          {cache.stats()['hit_rate']:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: vocabulary interning
+
+Decodes a JSON Lines corpus with and without the shared vocabulary pool
+and reports retained memory, decode throughput and pool statistics.
+
+Usage:
+    python benchmarks/bench_vocab.py [num_packets]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from vse_core import Packet, Vocabulary, set_default_vocabulary
+
+CONSTRAINTS = [f"{n}_sentences" for n in range(1, 8)] + [
+    "formal_tone", "academic_tone", "casual_tone", "no_jargon", "cite_sources",
+]
+FOUNDATION = ["Milieu", "Gravitas", "Fulcrum", "Ambience"]
+
+
+def make_lines(n: int):
+    lines = []
+    for i in range(n):
+        packet = Packet(intent=f"task_{i}",
+                        constraints=[CONSTRAINTS[(i + k) % len(CONSTRAINTS)] for k in range(3)],
+                        foundation=FOUNDATION[:1 + i % 4],
+                        immune=["Project Atlas"] if i % 5 == 0 else [])
+        lines.append(packet.to_json(indent=None))
+    return lines
+
+
+def decode(lines):
+    """Return (packets, seconds, retained bytes); timed without tracing."""
+    start = time.perf_counter()
+    packets = [Packet.from_json(line) for line in lines]
+    elapsed = time.perf_counter() - start
+    del packets
+    tracemalloc.start()
+    packets = [Packet.from_json(line) for line in lines]
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return packets, elapsed, retained
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lines = make_lines(n)
+
+    print("=" * 60)
+    print(f"Vocabulary interning benchmark ({n:,} packets)")
+    print("=" * 60)
+
+    set_default_vocabulary(None)
+    packets, plain_time, plain_mem = decode(lines)
+    del packets
+
+    vocab = Vocabulary()
+    set_default_vocabulary(vocab)
+    packets, pooled_time, pooled_mem = decode(lines)
+    del packets
+
+    stats = vocab.stats()
+    print(f"  retained, no pool:   {plain_mem / n:7.0f} B/packet   {n / plain_time:>9,.0f} packets/sec")
+    print(f"  retained, pooled:    {pooled_mem / n:7.0f} B/packet   {n / pooled_time:>9,.0f} packets/sec")
+    print(f"  pool: {stats['tokens']} tokens, hit rate {stats['hit_rate']:.1%}, "
+          f"saved {stats['saved_bytes'] / 1e6:.1f} MB, pool {stats['pool_bytes'] / 1e3:.1f} kB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Test Suite for Async Validation
+Tests micro-batching, executor offload, latency percentiles, and shutdown.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import threading
+
+import pytest
+
+from vse_core import AsyncValidator, Packet
+from vse_core.validator import validate_packet
+
+
+def make_packets(n):
+    return [Packet(intent=f"task_{i}", constraints=["c1"] if i % 3 else [],
+                   divergence=(i % 10) / 10)
+            for i in range(n)]
+
+
+def summary(results):
+    return [(r.valid, r.errors, r.warnings, r.layer) for r in results]
+
+
+class TestAsyncValidator:
+    """Test AsyncValidator on a running event loop."""
+
+    def test_concurrent_requests_share_a_batch(self):
+        """Test requests made in one loop iteration are validated together."""
+        packets = make_packets(20)
+
+        async def main():
+            async with AsyncValidator(inline_limit=64) as validator:
+                results = await asyncio.gather(*(validator.validate(p) for p in packets))
+                return results, validator.stats()
+
+        results, stats = asyncio.run(main())
+
+        assert summary(results) == summary(validate_packet(p) for p in packets)
+        assert (stats["inline_batches"], stats["executor_batches"]) == (1, 0)
+        assert stats["mean_batch"] == 20
+        assert stats["requests"] == 20 and stats["pending"] == 0
+
+    def test_large_batches_go_to_the_executor(self):
+        """Test micro-batches above inline_limit are offloaded, in order."""
+        packets = make_packets(50)
+
+        async def main():
+            async with AsyncValidator(inline_limit=8, max_batch=16) as validator:
+                results = await asyncio.gather(*(validator.validate(p) for p in packets))
+                many = await validator.validate_many(packets)
+                small = await validator.validate_many(packets[:4])
+                return results, many, small, validator.stats()
+
+        results, many, small, stats = asyncio.run(main())
+
+        expected = summary(validate_packet(p) for p in packets)
+        assert summary(results) == expected
+        assert summary(many) == expected
+        assert summary(small) == expected[:4]
+        # 50 requests -> 16 + 16 + 16 flushed when full, 2 left for the loop;
+        # validate_many -> 4 chunks; the small call -> inline
+        assert stats["executor_batches"] == 3 + 4
+        assert stats["inline_batches"] == 2
+
+    def test_process_executor_and_strict(self):
+        """Test a process pool validates offloaded batches in strict mode."""
+        packets = make_packets(12)
+
+        async def main():
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                validator = AsyncValidator(executor=pool, strict=True, inline_limit=0)
+                results = await validator.validate_many(packets)
+                await validator.aclose()
+                return results
+
+        results = asyncio.run(main())
+
+        assert summary(results) == summary(validate_packet(p, strict=True) for p in packets)
+
+    def test_latency_percentiles(self):
+        """Test percentiles are reported in order once requests complete."""
+        async def main():
+            validator = AsyncValidator(max_delay=0.001)
+            assert validator.latency_percentiles() == {}
+            await asyncio.gather(*(validator.validate(p) for p in make_packets(30)))
+            await validator.aclose()
+            return validator.latency_percentiles((50, 99)), validator.stats()
+
+        percentiles, stats = asyncio.run(main())
+
+        assert 0 < percentiles[50] <= percentiles[99]
+        assert percentiles[50] >= 0.001  # waited max_delay for the batch
+        assert stats["p99"] == percentiles[99]
+
+    @pytest.mark.parametrize("inline_limit", [64, 0])
+    def test_failing_packet_fails_only_its_request(self, inline_limit):
+        """Test an exception from one packet leaves the rest of its batch alone."""
+        bad = Packet(intent="x", constraints=[None])
+        good = Packet(intent="y", constraints=["c1"])
+
+        async def main():
+            async with AsyncValidator(inline_limit=inline_limit) as validator:
+                outcomes = await asyncio.gather(validator.validate(bad),
+                                                validator.validate(good),
+                                                return_exceptions=True)
+                return outcomes, validator.stats()
+
+        (error, result), stats = asyncio.run(main())
+
+        assert isinstance(error, AttributeError)
+        assert result.valid
+        assert stats["pending"] == 0
+
+    def test_pending_counts_requests(self):
+        """Test pending counts queued requests, not batches."""
+        packets = make_packets(10)
+        gate = threading.Event()
+
+        async def main():
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pool.submit(gate.wait)  # holds the only worker
+                validator = AsyncValidator(executor=pool, inline_limit=0)
+                tasks = [asyncio.ensure_future(validator.validate(p)) for p in packets]
+                await asyncio.sleep(0)
+                await asyncio.sleep(0)
+                during = validator.stats()["pending"]
+                gate.set()
+                await asyncio.gather(*tasks)
+                return during, validator.stats()
+
+        during, stats = asyncio.run(main())
+
+        assert during == 10
+        assert stats["executor_batches"] == 1
+        assert stats["pending"] == 0
+
+    def test_closed(self):
+        """Test a closed validator refuses work."""
+        async def main():
+            validator = AsyncValidator()
+            await validator.aclose()
+            with pytest.raises(ValueError):
+                await validator.validate(Packet(intent="late"))
+
+        asyncio.run(main())
+
+    def test_bad_arguments(self):
+        """Test argument checking."""
+        with pytest.raises(ValueError):
+            AsyncValidator(max_batch=0)
@@ -0,0 +1,179 @@
+"""
+Test Suite for the VSE Packet Archive
+Tests appends, random access, id lookup, and concurrent readers.
+"""
+
+import multiprocessing
+import os
+
+import pytest
+
+from vse_core import Packet, PacketArchive, ArchiveWriter, ArchiveError
+
+
+def make_packets(n, start=0):
+    return [
+        Packet(intent=f"task_{i}", constraints=["formal_tone"], divergence=(i % 10) / 10,
+               kbm={"coherence_vector": [0.1, 0.9]} if i % 2 else None)
+        for i in range(start, start + n)
+    ]
+
+
+def read_intents(path, positions):
+    with PacketArchive(path) as archive:
+        return [archive[i].intent for i in positions]
+
+
+class TestPacketArchive:
+    """Test ArchiveWriter and PacketArchive."""
+
+    def test_random_access_and_ids(self, tmp_path):
+        """Test positional access, slices, ranges and id lookup."""
+        path = tmp_path / "corpus.vsea"
+        packets = make_packets(100)
+        with ArchiveWriter(path, flush_every=7) as writer:
+            writer.extend(packets)
+            writer.append(packets[3], packet_id="custom")
+
+        with PacketArchive(path) as archive:
+            assert len(archive) == 101
+            assert archive[42] == packets[42]
+            assert archive[-1] == packets[3]
+            assert archive[10:13] == packets[10:13]
+            assert list(archive.iter_range(95)) == packets[95:] + [packets[3]]
+            assert archive.get(packets[57].digest()) == packets[57]
+            assert archive.get("custom") == packets[3]
+            assert archive.get("missing") is None
+            assert "custom" in archive
+            with pytest.raises(IndexError):
+                archive[101]
+
+    def test_append_reopen(self, tmp_path):
+        """Test reopening appends; duplicate ids resolve to the newest."""
+        path = tmp_path / "corpus.vsea"
+        with ArchiveWriter(path) as writer:
+            writer.extend(make_packets(10))
+            writer.append(make_packets(1)[0], packet_id="dup")
+        with ArchiveWriter(path) as writer:
+            writer.extend(make_packets(5, start=10))
+            writer.append(make_packets(1, start=99)[0], packet_id="dup")
+
+        with PacketArchive(path) as archive:
+            assert len(archive) == 17
+            assert archive[15].intent == "task_14"
+            assert archive.get("dup").intent == "task_99"
+            assert archive.position(make_packets(1, start=3)[0].digest()) == 3
+
+    def test_repeated_flushes(self, tmp_path):
+        """Test ids merged over several flushes, with a duplicate id."""
+        path = tmp_path / "corpus.vsea"
+        with ArchiveWriter(path) as writer:
+            for start in range(0, 30, 10):
+                writer.extend(make_packets(10, start=start))
+                writer.append(make_packets(1, start=100 + start)[0], packet_id="dup")
+                writer.flush()
+
+        with PacketArchive(path) as archive:
+            assert len(archive) == 33
+            assert archive.get("dup").intent == "task_120"
+            assert all(archive.position(p.digest()) == i + i // 10
+                       for i, p in enumerate(make_packets(30)))
+
+    def test_recover_unflushed(self, tmp_path):
+        """Test reopening drops records written after the last flush."""
+        path = tmp_path / "corpus.vsea"
+        with ArchiveWriter(path) as writer:
+            writer.extend(make_packets(10))
+        # A crash after data, a partial offset and an offset without its id
+        crashed = ArchiveWriter(path, flush_every=2)
+        crashed.extend(make_packets(5, start=10))
+        crashed._data.flush()
+        with open(f"{path}.idx", "ab") as f:
+            f.write(b"\x00" * 11)
+
+        with ArchiveWriter(path) as writer:
+            assert len(writer) == 10
+            writer.extend(make_packets(3, start=20))
+
+        with PacketArchive(path) as archive:
+            assert [p.intent for p in archive] == [f"task_{i}" for i in list(range(10)) + [20, 21, 22]]
+            assert archive.get(make_packets(1, start=21)[0].digest()).intent == "task_21"
+            assert make_packets(1, start=12)[0].digest() not in archive
+
+    def test_many_flushes_keep_few_runs(self, tmp_path):
+        """Test id runs are merged, so flushes stay cheap and lookups exact."""
+        path = tmp_path / "corpus.vsea"
+        packets = make_packets(64)
+        with ArchiveWriter(path) as writer:
+            for packet in packets:
+                writer.append(packet)
+                writer.append(packet, packet_id="dup")
+                writer.flush()
+            # 128 ids in runs of strictly decreasing size (a binary counter)
+            sizes = [size for _, size in writer._runs]
+            assert sizes == sorted(set(sizes), reverse=True) and sum(sizes) == 128
+
+        assert sorted(p.name for p in tmp_path.iterdir() if ".ids." in p.name) == \
+            sorted(f"corpus.vsea.ids.{gen}" for gen, _ in writer._runs)
+        with PacketArchive(path) as archive:
+            assert all(archive.position(p.digest()) == 2 * i for i, p in enumerate(packets))
+            assert archive.position("dup") == 127
+
+    def test_reader_during_flush(self, tmp_path, monkeypatch):
+        """Test readers see only committed records, and keep runs merged away."""
+        path = tmp_path / "corpus.vsea"
+        writer = ArchiveWriter(path)
+        writer.extend(make_packets(10))
+        writer.flush()
+        early = PacketArchive(path)
+        during = []
+        replace = os.replace
+
+        def open_reader_then_replace(src, dst):
+            # Data, offsets and the new run are written; the manifest is not
+            with PacketArchive(path) as archive:
+                during.append((len(archive), archive[-1].intent))
+            replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", open_reader_then_replace)
+        writer.extend(make_packets(10, start=10))
+        writer.close()  # merges early's only run into a new one
+
+        assert during == [(10, "task_9")]
+        assert early.get(make_packets(1, start=4)[0].digest()).intent == "task_4"
+        early.close()
+        with PacketArchive(path) as archive:
+            assert [p.intent for p in archive] == [f"task_{i}" for i in range(20)]
+
+    def test_close_with_record_in_use(self, tmp_path):
+        """Test record() returns a copy, so closing the archive is safe."""
+        path = tmp_path / "corpus.vsea"
+        with ArchiveWriter(path) as writer:
+            writer.extend(make_packets(3))
+
+        archive = PacketArchive(path)
+        record = archive.record(1)
+        archive.close()
+
+        assert Packet.from_buffer(record).intent == "task_1"
+
+    def test_concurrent_readers(self, tmp_path):
+        """Test several processes read the same archive at once."""
+        path = str(tmp_path / "corpus.vsea")
+        with ArchiveWriter(path) as writer:
+            writer.extend(make_packets(50))
+
+        with multiprocessing.Pool(3) as pool:
+            results = pool.starmap(read_intents, [(path, [0, 49]), (path, [25]), (path, [7])])
+
+        assert results == [["task_0", "task_49"], ["task_25"], ["task_7"]]
+
+    def test_not_an_archive(self, tmp_path):
+        """Test opening other files fails cleanly."""
+        path = tmp_path / "other.vsea"
+        path.write_bytes(b"hello world")
+
+        with pytest.raises(ArchiveError):
+            PacketArchive(path)
+        with pytest.raises(ArchiveError):
+            PacketArchive(tmp_path / "missing.vsea")
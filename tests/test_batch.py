@@ -0,0 +1,154 @@
+"""
+Test Suite for VSE Packet Batches
+Tests columnar conversion, filtering, and memory reporting.
+"""
+
+import numpy as np
+import pytest
+
+import random
+
+from vse_core import Packet, PacketBatch
+from vse_core import validate_batch
+from vse_core.validator import Validator
+
+
+def make_packets():
+    """A small corpus covering every layer and field."""
+    return [
+        Packet(intent="summarize", constraints=["3_sentences"], divergence=0.2, version="1.3"),
+        Packet(
+            intent="essay",
+            constraints=["formal_tone", "3_sentences"],
+            divergence=0.6,
+            kbm={"coherence_vector": [0.8, 0.9]},
+            c_tvm=["premise", "conclusion", 100],
+            foundation=["Milieu", "Gravitas"],
+            mu_loop={"window_size": 5, "threshold": 0.2},
+            metadata={"source": "unit"}
+        ),
+        Packet(
+            intent="explore",
+            immune=["Project Atlas"],
+            divergence=0.7,
+            gsn={"network_id": "net-1", "curiosity_factor": 0.4},
+            evf=["seed-1", 0.4, 5],
+            urp_enabled=True,
+            foundation=[]
+        ),
+    ]
+
+
+class TestPacketBatch:
+    """Test PacketBatch conversion and filtering."""
+    
+    def test_roundtrip(self):
+        """Test lossless Packet -> batch -> Packet conversion."""
+        packets = make_packets()
+        batch = PacketBatch.from_packets(packets)
+        
+        assert len(batch) == 3
+        for original, restored in zip(packets, batch.to_packets()):
+            assert restored == original
+    
+    def test_columns(self):
+        """Test the numeric and layer columns."""
+        batch = PacketBatch.from_packets(make_packets())
+        
+        np.testing.assert_allclose(batch.divergence, [0.2, 0.6, 0.7])
+        assert batch.kbm_max[1] == 0.9
+        assert np.isnan(batch.kbm_min[0])
+        assert list(batch.layer) == [0, 1, 2]
+        assert list(batch.list_lengths("constraints")) == [1, 2, 0]
+    
+    def test_mask_filtering(self):
+        """Test vectorized filtering keeps ragged lists aligned."""
+        batch = PacketBatch.from_packets(make_packets())
+        
+        high = batch[batch.divergence > 0.5]
+        
+        assert len(high) == 2
+        assert high[0].constraints == ["formal_tone", "3_sentences"]
+        assert high[1].immune == ["Project Atlas"]
+        assert len(batch.filter(batch.layer_mask("v1.3"))) == 1
+        assert [p.intent for p in batch[[2, 0]]] == ["explore", "summarize"]
+    
+    def test_string_interning(self):
+        """Test repeated constraint tokens are stored once."""
+        batch = PacketBatch.from_packets(make_packets() * 100)
+        
+        assert batch.strings.values.count("3_sentences") == 1
+        assert batch.bytes_per_packet() > 0
+    
+    def test_bad_mask_length(self):
+        """Test that a mask of the wrong length is rejected."""
+        batch = PacketBatch.from_packets(make_packets())
+        
+        with pytest.raises(IndexError):
+            batch.filter(np.array([True]))
+
+
+
+def random_record(rng):
+    """A packet record mixing valid, borderline and malformed values."""
+    pick = rng.choice
+    record = {
+        "intent": pick(["", "summarize", "x" * 201]),
+        "divergence": pick([0.0, 0.3, 0.55, 0.75, 1.0, 1.5, -0.1, float("nan")]),
+        "constraints": rng.sample(["formal_tone", "3_sentences", "", "  "], rng.randint(0, 3)),
+        "immune": rng.sample(["Project Atlas", "", "y" * 501], rng.randint(0, 2)),
+    }
+    if rng.random() < 0.5:
+        record["kbm"] = pick([{}, {"other": 1}, {"coherence_vector": [0.8, 0.9]},
+                              {"coherence_vector": [0.5, 0.52]}, {"coherence_vector": [0.9, 0.1]},
+                              {"coherence_vector": [0.2, 1.5]}, {"coherence_vector": [1]},
+                              {"coherence_vector": "bad"}])
+    if rng.random() < 0.5:
+        record["c_tvm"] = pick([["a", "b", 100], ["a", "b", 20000], ["a", "b", 0],
+                                ["a", "b", 1.5], ["a", "b"], []])
+    if rng.random() < 0.5:
+        record["foundation"] = pick([[], ["Milieu"], ["Milieu", "Elsewhere"], ["Other", "Gravitas"]])
+    if rng.random() < 0.5:
+        record["mu_loop"] = pick([{}, {"window_size": 5, "threshold": 0.2}, {"window_size": 0},
+                                  {"window_size": 2.5}, {"threshold": 1.2}, {"threshold": "hi"},
+                                  {"window_size": True, "threshold": 1}])
+    if rng.random() < 0.5:
+        record["gsn"] = pick([{}, {"network_id": "n"}, {"curiosity_factor": 0.9},
+                              {"network_id": "n", "curiosity_factor": 0.4, "link_vectors": []},
+                              {"curiosity_factor": 1.2}, {"curiosity_factor": "x"},
+                              {"network_id": "n", "curiosity_factor": 0.1, "link_vectors": "x"},
+                              {"network_id": "n", "curiosity_factor": 0.1,
+                               "link_vectors": list(range(101))}])
+    if rng.random() < 0.5:
+        record["evf"] = pick([[], ["s", 0.4, 5], ["s", 0.4, 25], ["s", 1.4, 5], ["s", "r", 5],
+                              ["s", 0.4, 0], ["s", 0.4, 2.0], ["s", 0.4]])
+    return record
+
+
+class TestValidateBatch:
+    """Test vectorized batch validation against the per-packet Validator."""
+    
+    @pytest.mark.parametrize("strict", [False, True])
+    def test_matches_validator(self, strict):
+        """Test counts and verdicts equal Validator.validate() for every packet."""
+        rng = random.Random(11)
+        packets = [Packet._trusted(random_record(rng)) for _ in range(3000)]
+        
+        result = validate_batch(PacketBatch.from_packets(packets), strict=strict)
+        
+        for packet, row in zip(packets, result):
+            expected = Validator(packet, strict=strict).validate()
+            assert bool(row["valid"]) == expected.valid
+            assert row["errors"] == len(expected.errors)
+            assert row["warnings"] == len(expected.warnings)
+    
+    def test_accepts_packet_list(self):
+        """Test packet iterables are converted to a batch first."""
+        result = validate_batch(make_packets())
+        
+        assert len(result) == 3
+        assert result["valid"].all()
+    
+    def test_empty(self):
+        """Test an empty batch gives an empty result."""
+        assert len(validate_batch([])) == 0
@@ -0,0 +1,84 @@
+"""
+Test Suite for VSE Canonical Encoding
+Tests canonical bytes, packet digests, and Merkle leaf compatibility.
+"""
+
+import hashlib
+import math
+
+import pytest
+
+from vse_core import Packet, canonical_bytes, canonical_json
+from vse_core.merkle_semantic import merkle_root
+
+
+def make_packet(**overrides):
+    fields = dict(
+        intent="summarize",
+        constraints=["3_sentences", "formal_tone"],
+        divergence=0.2,
+        kbm={"coherence_vector": [0.8, 0.95]},
+        gsn={"network_id": "net-1", "curiosity_factor": 0.5},
+        metadata={"source": "x"},
+    )
+    fields.update(overrides)
+    return Packet(**fields)
+
+
+class TestCanonicalEncoding:
+    """Test the canonical encoder."""
+
+    def test_key_order_and_whitespace(self):
+        """Test insertion order and nesting do not change the bytes."""
+        a = {"b": 1, "a": {"y": [1, 2], "x": "é"}}
+        b = {"a": {"x": "é", "y": (1, 2)}, "b": 1}
+
+        assert canonical_bytes(a) == canonical_bytes(b)
+        assert canonical_json(a) == '{"a":{"x":"é","y":[1,2]},"b":1}'
+
+    def test_numbers(self):
+        """Test equal numbers encode identically and floats round-trip."""
+        assert canonical_json([1.0, -0.0, 1, 0.1, 1e300, 2.0 ** 60]) == \
+            "[1,0,1,0.1,1e+300,1.152921504606847e+18]"
+        assert canonical_json(True) == "true"
+
+        with pytest.raises(ValueError):
+            canonical_json(math.nan)
+        with pytest.raises(TypeError):
+            canonical_json({1: "x"})
+
+
+class TestPacketDigest:
+    """Test Packet.canonical_bytes and Packet.digest."""
+
+    def test_known_digest(self):
+        """Test the digest is fixed across processes and versions."""
+        assert make_packet().digest() == \
+            "03c2ab5bdda62510d5a2e2c2511f78c4f30faf0d99692d27687ec6c56fc7b7b9"
+
+    def test_content_equivalence(self):
+        """Test metadata, field order and empty optionals don't matter."""
+        packet = make_packet()
+        same = make_packet(metadata={}, kbm={"coherence_vector": [0.8, 0.95]},
+                           gsn={"curiosity_factor": 0.5, "network_id": "net-1"}, evf=[])
+
+        assert same.digest() == packet.digest()
+        assert same.digest(include_metadata=True) != packet.digest(include_metadata=True)
+        assert make_packet(divergence=0.3).digest() != packet.digest()
+
+    def test_digest_tracks_changes(self):
+        """Test the cached digest is invalidated by edits."""
+        packet = make_packet()
+        before = packet.digest()
+
+        packet.kbm["coherence_vector"][1] = 0.99
+
+        assert packet.digest() != before
+
+    def test_merkle_leaf(self):
+        """Test a packet's Merkle leaf hash is its digest."""
+        packet = make_packet()
+        leaf = bytes.fromhex(packet.digest())
+
+        assert merkle_root([packet]) == leaf.hex()
+        assert merkle_root([packet, packet]) == hashlib.sha256(leaf + leaf).hexdigest()
@@ -0,0 +1,138 @@
+"""
+Test Suite for the Command Line Tools
+Tests vse-validate and vse-migrate output, options, and exit status.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from vse_core import Packet, PacketWriter
+from vse_core.cli import migrate_cli, validate_cli
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """A JSONL file and a VSE-lines file with the same ten packets."""
+    packets = [Packet(intent=f"task_{i}", constraints=["3_sentences"],
+                      divergence=(i % 10) / 10) for i in range(10)]
+    jsonl = tmp_path / "corpus.jsonl.gz"
+    with PacketWriter(jsonl) as writer:
+        writer.write_many(packets)
+    vse = tmp_path / "corpus.vse"
+    vse.write_text("".join(p.to_vse() + "\n" for p in packets))
+    return jsonl, vse
+
+
+class TestValidateCli:
+    """Test vse-validate."""
+
+    def test_results_per_packet(self, corpus, capsys):
+        """Test one JSON result per packet, for both input formats."""
+        jsonl, vse = corpus
+
+        assert validate_cli(["-j", "0", str(jsonl), str(vse)]) == 0
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert len(lines) == 20
+        assert [r["line"] for r in lines[:10]] == list(range(1, 11))
+        assert lines[10]["source"] == str(vse)
+        assert lines[9]["warnings"] == ["High divergence (0.9) may reduce determinism"]
+
+    def test_strict_and_stats(self, corpus, capsys):
+        """Test --strict fails on warnings and --stats prints histograms."""
+        jsonl, _ = corpus
+
+        assert validate_cli(["-j", "2", "--strict", "--stats", "-q", str(jsonl)]) == 1
+
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "Processed 10 packets" in captured.err
+        assert "HIGH_DIVERGENCE" in captured.err
+
+    def test_fail_fast_on_bad_line(self, tmp_path, capsys):
+        """Test --fail-fast stops at the first bad line."""
+        path = tmp_path / "bad.jsonl"
+        path.write_text('not json\n{"intent": "a"}\n')
+
+        assert validate_cli(["-j", "0", "--fail-fast", str(path)]) == 1
+
+        captured = capsys.readouterr()
+        assert f"{path}:1: not a packet" in captured.err
+
+    def test_line_numbers(self, tmp_path, capsys):
+        """Test results report input line numbers past blank and bad lines."""
+        path = tmp_path / "mixed.jsonl"
+        path.write_text('{"intent": "a"}\n\nnot json\n{"intent": ""}\n')
+
+        assert validate_cli(["-j", "0", str(path)]) == 1
+
+        captured = capsys.readouterr()
+        lines = [json.loads(line) for line in captured.out.splitlines()]
+        assert [(r["line"], r["valid"]) for r in lines] == [(1, True), (4, False)]
+        assert f"{path}:3: not a packet" in captured.err
+
+    @pytest.mark.parametrize("option", [["--jobs", "-1"], ["--chunk-size", "0"],
+                                        ["--jobs", "many"]])
+    def test_bad_counts(self, option, capsys):
+        """Test out-of-range --jobs and --chunk-size are usage errors."""
+        with pytest.raises(SystemExit) as exc:
+            validate_cli(option)
+
+        assert exc.value.code == 2
+        assert option[0] in capsys.readouterr().err
+
+    @pytest.mark.parametrize("data", [
+        b'{"intent": "a"}\n{"intent": "b", "divergence": "high"}\n{"intent": "c"}\n',
+        b'{"intent": "a"}\n{"intent": "\xff"}\n{"intent": "c"}\n',
+    ], ids=["wrong-type", "invalid-utf8"])
+    def test_bad_line_in_middle(self, tmp_path, capsys, data):
+        """Test a line that cannot be validated is reported, not a crash."""
+        path = tmp_path / "bad.jsonl"
+        path.write_bytes(data)
+
+        assert validate_cli(["-j", "0", str(path)]) == 1
+
+        captured = capsys.readouterr()
+        assert [json.loads(line)["line"] for line in captured.out.splitlines()] == [1, 3]
+        assert f"{path}:2: not a packet" in captured.err
+
+    def test_corrupt_compressed_file(self, tmp_path, capsys):
+        """Test a truncated compressed file exits with status 2."""
+        path = tmp_path / "corpus.jsonl.gz"
+        data = gzip.compress(b'{"intent": "a"}\n' * 100)
+        path.write_bytes(data[:-10])
+
+        assert validate_cli(["-j", "0", "-q", str(path)]) == 2
+        assert f"vse-validate: error: {path}" in capsys.readouterr().err
+
+    def test_missing_file(self, capsys):
+        """Test unreadable input exits with status 2."""
+        assert validate_cli(["-j", "0", "/nonexistent/corpus.jsonl"]) == 2
+        assert "vse-validate: error" in capsys.readouterr().err
+
+
+class TestMigrateCli:
+    """Test vse-migrate."""
+
+    def test_migrate_to_vse_lines(self, corpus, capsys):
+        """Test migrated packets are written in input order."""
+        _, vse = corpus
+
+        assert migrate_cli(["-j", "0", "--output-format", "vse", str(vse)]) == 0
+
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 10
+        migrated = [Packet.from_vse(line) for line in lines]
+        assert [p.intent for p in migrated] == [f"task_{i}" for i in range(10)]
+        assert all(p.get_version_layer() == "v1.4-kinetic" for p in migrated)
+
+    def test_downgrade_jsonl(self, corpus, capsys):
+        """Test --to 1.3 strips v1.4 fields."""
+        jsonl, _ = corpus
+
+        assert migrate_cli(["-j", "0", "--to", "1.3", str(jsonl)]) == 0
+
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert {r["version"] for r in records} == {"1.3"}
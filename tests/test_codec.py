@@ -0,0 +1,130 @@
+"""
+Test Suite for the VSE Binary Codec
+Tests round trips, randomized fuzzing, and corrupt-buffer handling.
+"""
+
+import random
+
+import pytest
+
+from vse_core import Packet, CodecError
+from vse_core.codec import FORMAT_VERSION, MAGIC, packet_size
+
+
+def random_value(rng, depth=0):
+    """Random JSON-compatible value."""
+    kinds = ["none", "bool", "int", "float", "str"]
+    if depth < 3:
+        kinds += ["list", "dict"]
+    kind = rng.choice(kinds)
+    if kind == "none":
+        return None
+    if kind == "bool":
+        return rng.random() < 0.5
+    if kind == "int":
+        return rng.randint(-2 ** 70, 2 ** 70) if rng.random() < 0.2 else rng.randint(-300, 300)
+    if kind == "float":
+        return rng.uniform(-1e6, 1e6)
+    if kind == "str":
+        return random_text(rng)
+    if kind == "list":
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {random_text(rng): random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))}
+
+
+def random_text(rng):
+    alphabet = "abcxyz _|:,[]{}\"'<>é漢🙂\\\n"
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+
+
+def random_packet(rng):
+    """Random packet that passes Packet validation."""
+    lo = rng.random()
+    return Packet(
+        intent=random_text(rng),
+        constraints=[random_text(rng) for _ in range(rng.randint(0, 3))],
+        divergence=rng.random(),
+        immune=[random_text(rng) for _ in range(rng.randint(0, 2))],
+        version=rng.choice(["1.3", "1.4"]),
+        kbm=rng.choice([None, {"coherence_vector": [lo, lo + (1 - lo) * rng.random()],
+                               "extra": random_value(rng)}]),
+        c_tvm=rng.choice([None, [random_text(rng), random_text(rng), rng.randint(-5, 20000)]]),
+        foundation=rng.choice([None, [], ["Milieu", random_text(rng)]]),
+        mu_loop=rng.choice([None, {"window_size": rng.randint(1, 50), "threshold": rng.random()}]),
+        gsn=rng.choice([None, {"network_id": random_text(rng), "curiosity_factor": rng.random(),
+                               "link_vectors": random_value(rng)}]),
+        evf=rng.choice([None, [random_text(rng), rng.random(), rng.randint(1, 30)]]),
+        urp_enabled=rng.random() < 0.5,
+        metadata=rng.choice([{}, {"source": random_value(rng)}]),
+    )
+
+
+class TestBinaryCodec:
+    """Test Packet.to_bytes / Packet.from_buffer."""
+    
+    def test_roundtrip(self):
+        """Test a full packet survives encoding."""
+        packet = Packet(
+            intent="summarize",
+            constraints=["3_sentences"],
+            divergence=0.25,
+            kbm={"coherence_vector": [0.8, 0.9]},
+            c_tvm=["premise", "conclusion", 100],
+            urp_enabled=True
+        )
+        
+        restored = Packet.from_buffer(packet.to_bytes())
+        
+        assert restored.to_dict() == packet.to_dict()
+    
+    def test_fuzz_roundtrip(self):
+        """Test random packets round-trip against to_dict()."""
+        rng = random.Random(1234)
+        for _ in range(500):
+            packet = random_packet(rng)
+            data = packet.to_bytes()
+            
+            restored = Packet.from_buffer(memoryview(data))
+            
+            assert restored.to_dict() == packet.to_dict()
+            assert restored.foundation == packet.foundation
+    
+    def test_concatenated_buffer(self):
+        """Test decoding packets at offsets within one buffer."""
+        packets = [Packet(intent=f"p{i}", divergence=i / 10) for i in range(5)]
+        buf = memoryview(b"".join(p.to_bytes() for p in packets))
+        
+        offset = 0
+        decoded = []
+        while offset < len(buf):
+            decoded.append(Packet.from_buffer(buf, offset))
+            offset += packet_size(buf, offset)
+        
+        assert [p.intent for p in decoded] == [p.intent for p in packets]
+    
+    def test_corrupt_buffers(self):
+        """Test truncated and foreign buffers raise CodecError."""
+        data = Packet(intent="test", kbm={"coherence_vector": [0.1, 0.2]}).to_bytes()
+        
+        with pytest.raises(CodecError):
+            Packet.from_buffer(data[:-3])
+        with pytest.raises(CodecError):
+            Packet.from_buffer(b"JSON" + data[4:])
+    
+    def test_truncated_header(self):
+        """Test a buffer cut inside the header raises CodecError."""
+        data = Packet(intent="test").to_bytes()
+        
+        for cut in (0, 3, 8):
+            with pytest.raises(CodecError):
+                Packet.from_buffer(data[:cut])
+            with pytest.raises(CodecError):
+                packet_size(data[:cut])
+    
+    def test_missing_intent(self):
+        """Test a well-formed packet without an intent raises CodecError."""
+        # Empty string section (mode 0, no strings, 0 bytes) and no fields
+        data = MAGIC + bytes([FORMAT_VERSION]) + (3).to_bytes(4, "little") + b"\x00\x00\x00"
+        
+        with pytest.raises(CodecError):
+            Packet.from_buffer(data)
@@ -4,8 +4,19 @@ Tests packet creation, validation, parsing, and migration.
 """
 
 import pytest
+import dataclasses
 import json
-from vse_core import Packet, Validator, ValidationResult, migrate_packet
+import os
+import re
+import subprocess
+import sys
+import threading
+from vse_core import (
+    Packet, Validator, ValidationResult, ValidationCode, ValidationCache, migrate_packet,
+    migrate_batch, parse_packets, PacketSyntaxError, set_network_id_strategy,
+)
+from vse_core.migration import digest_network_id, infer_foundation, v13_to_v14
+from vse_core.validator import RULE_FIELDS, validate_packet
 
 
 class TestPacketCreation:
@@ -131,6 +142,277 @@ class TestPacketSerialization:
         assert d["kbm"]["coherence_vector"] == [0.8, 0.9]
 
 
+class TestPacketScanner:
+    """Test the single-pass VSE scanner."""
+    
+    def test_roundtrip_all_layers(self):
+        """Test to_vse/from_vse round trip across every field."""
+        original = Packet(
+            intent="compare_options",
+            constraints=["3_sentences", "formal_tone"],
+            divergence=0.25,
+            immune=["Project Atlas"],
+            kbm={"coherence_vector": [0.8, 0.9]},
+            c_tvm=["premise", "conclusion", 100],
+            foundation=["Milieu", "Gravitas"],
+            mu_loop={"window_size": 5, "threshold": 0.2},
+            gsn={"network_id": "net-1", "curiosity_factor": 0.4},
+            evf=["seed-1", 0.4, 5],
+            urp_enabled=True
+        )
+        
+        parsed = Packet.from_vse(original.to_vse())
+        
+        assert parsed.to_dict() == original.to_dict()
+    
+    def test_separators_inside_values(self):
+        """Test that '|' and ':' inside quoted or nested values survive."""
+        original = Packet(
+            intent="ratio: a | b",
+            constraints=["x, y", "plain"],
+            immune=['He said "stop | go"'],
+            gsn={"network_id": "net|1:a"}
+        )
+        
+        parsed = Packet.from_vse(original.to_vse(compact=True))
+        
+        assert parsed.intent == "ratio: a | b"
+        assert parsed.constraints == ["x, y", "plain"]
+        assert parsed.immune == ['He said "stop | go"']
+        assert parsed.gsn["network_id"] == "net|1:a"
+
+    def test_intent_whitespace_roundtrip(self):
+        """Test that intents with edge whitespace or a leading quote survive."""
+        for intent in ["  padded ", "tab\t", '"quoted', ""]:
+            parsed = Packet.from_vse(Packet(intent=intent).to_vse())
+
+            assert parsed.intent == intent
+
+    def test_empty_constraint_roundtrip(self):
+        """Test that empty constraints are written quoted and read back."""
+        for constraints in [[""], ["", "a"], ["a", ""]]:
+            parsed = Packet.from_vse(Packet(intent="t", constraints=constraints).to_vse())
+
+            assert parsed.constraints == constraints
+
+    def test_quoted_intent_with_tail(self):
+        """Test that text after a quoted intent is kept verbatim, as before."""
+        packet = Packet.from_vse('<VSE v1.4 | intent: "quoted" tail | divergence: 0.3>')
+
+        assert packet.intent == '"quoted" tail'
+        assert packet.divergence == 0.3
+
+    def test_python_literal_values(self):
+        """Test legacy Python-style lists and dicts."""
+        vse_str = ("<VSE v1.4 | intent: test | c_tvm: ['premise', 'conclusion', 100] "
+                   "| kbm: {'coherence_vector': [0.8, 0.9]} | foundation: [Milieu, Gravitas]>")
+        
+        packet = Packet.from_vse(vse_str)
+        
+        assert packet.c_tvm == ["premise", "conclusion", 100]
+        assert packet.kbm == {"coherence_vector": [0.8, 0.9]}
+        assert packet.foundation == ["Milieu", "Gravitas"]
+    
+    def test_malformed_value(self):
+        """Test that a truncated structure raises PacketSyntaxError."""
+        with pytest.raises(PacketSyntaxError):
+            Packet.from_vse("<VSE v1.4 | intent: test | kbm: {\"coherence_vector\": [0.8>")
+        
+        with pytest.raises(ValueError):
+            Packet.from_vse("<VSE v1.4 | intent: test | divergence: high>")
+    
+    def test_parse_packets(self):
+        """Test bulk parsing skips blank lines and keeps order."""
+        lines = [
+            "<VSE v1.3 | intent: first | divergence: 0.10>\n",
+            "\n",
+            "<VSE v1.4 | intent: second | kbm: {\"coherence_vector\": [0.7, 0.9]}>\n",
+        ]
+        
+        packets = list(parse_packets(lines))
+        
+        assert [p.intent for p in packets] == ["first", "second"]
+        assert packets[1].get_version_layer() == "v1.4-kinetic"
+
+
+class TestLazyPackets:
+    """Test lazy decoding of nested fields."""
+    
+    def make_vse(self):
+        return Packet(
+            intent="route_me",
+            constraints=["short"],
+            kbm={"coherence_vector": [0.8, 0.9]},
+            c_tvm=["premise", "conclusion", 100],
+            mu_loop={"window_size": 5, "threshold": 0.2},
+            gsn={"network_id": "net|1 'a'", "curiosity_factor": 0.4},
+            evf=["seed-1", 0.4, 5],
+        ).to_vse()
+    
+    def test_matches_eager_parse(self):
+        """Test lazy and eager parses produce equal packets."""
+        vse_str = self.make_vse()
+        
+        lazy = Packet.from_vse(vse_str, lazy=True)
+        
+        assert lazy == Packet.from_vse(vse_str)
+        assert lazy.to_dict() == Packet.from_vse(vse_str).to_dict()
+    
+    def test_decodes_on_first_access(self):
+        """Test raw slices are decoded once, on access, and cached."""
+        packet = Packet.from_vse(self.make_vse(), lazy=True)
+        
+        assert packet.intent == "route_me"
+        assert packet.get_version_layer() == "v1.4-gregarious"
+        assert "gsn" not in vars(packet)
+        
+        gsn = packet.gsn
+        
+        assert gsn["network_id"] == "net|1 'a'"
+        assert packet.gsn is gsn
+        assert "kbm" not in vars(packet)
+    
+    def test_validation_deferred(self):
+        """Test invalid nested values raise on access, not on parse."""
+        vse_str = '<VSE v1.4 | intent: x | kbm: {"coherence_vector": [0.9, 0.1]}>'
+        
+        packet = Packet.from_vse(vse_str, lazy=True)
+        
+        with pytest.raises(ValueError):
+            packet.kbm
+        with pytest.raises(ValueError):
+            packet.kbm
+        with pytest.raises(ValueError):
+            Packet.from_vse(vse_str)
+    
+    def test_assignment_overrides_raw(self):
+        """Test assigning a lazy field replaces the pending raw value."""
+        packet = Packet.from_vse(self.make_vse(), lazy=True)
+        
+        packet.gsn = None
+        packet.evf = None
+        
+        assert packet.gsn is None
+        assert packet.get_version_layer() == "v1.4-kinetic"
+        assert list(parse_packets([self.make_vse()], lazy=True))[0].c_tvm[2] == 100
+
+
+class TestSerializationCache:
+    """Test memoized serialization and invalidation."""
+    
+    def make_packet(self):
+        return Packet(
+            intent="cache_me",
+            constraints=["short"],
+            kbm={"coherence_vector": [0.8, 0.9]},
+            gsn={"network_id": "net-1", "peers": ["a"]},
+        )
+    
+    def test_repeat_calls_reuse_result(self):
+        """Test unchanged packets return the cached string."""
+        packet = self.make_packet()
+        
+        assert packet.to_vse() is packet.to_vse()
+        assert packet.to_json() is packet.to_json()
+        assert packet.to_dict() == packet.to_dict()
+        assert packet.to_dict() is not packet.to_dict()
+    
+    def test_invalidated_by_changes(self):
+        """Test reassignment and in-place edits at any depth invalidate."""
+        packet = self.make_packet()
+        packet.to_vse()
+        
+        packet.constraints.append("formal")
+        assert "formal" in packet.to_vse()
+        
+        packet.kbm["coherence_vector"][0] = 0.5
+        assert packet.to_dict()["kbm"] == {"coherence_vector": [0.5, 0.9]}
+        
+        packet.gsn["peers"] += ["b"]
+        assert json.loads(packet.to_json())["gsn"]["peers"] == ["a", "b"]
+        
+        packet.divergence = 0.9
+        assert "divergence: 0.90" in repr(packet)
+        
+        packet.immune = ["keep"]
+        packet.immune.insert(0, "first")
+        assert packet.to_dict()["immune"] == ["first", "keep"]
+    
+    def test_caller_objects_kept(self):
+        """Test filling the cache leaves caller-owned field objects in place."""
+        import copy
+        constraints = ["short"]
+        kbm = {"coherence_vector": [0.8, 0.9]}
+        packet = Packet(intent="cache_me", constraints=constraints, kbm=kbm)
+        cons = packet.constraints
+        repr(packet)
+        
+        assert packet.constraints is constraints and type(packet.constraints) is list
+        assert packet.kbm is kbm and type(packet.kbm) is dict
+        assert packet.to_dict()["kbm"] is kbm
+        
+        cons.append("formal")
+        kbm["coherence_vector"][1] = 0.95
+        
+        assert packet.constraints == ["short", "formal"]
+        assert "formal" in repr(packet)
+        assert json.loads(packet.to_json())["kbm"]["coherence_vector"] == [0.8, 0.95]
+        
+        clone = copy.copy(packet)
+        assert clone.constraints is constraints
+        clone.constraints = ["other"]
+        assert "formal" in packet.to_vse() and "other" in clone.to_vse()
+    
+    def test_pickle_and_equality(self):
+        """Test cached packets pickle as plain data and compare equal."""
+        import pickle
+        packet = self.make_packet()
+        packet.to_json()
+        
+        restored = pickle.loads(pickle.dumps(packet))
+        
+        assert restored == packet
+        assert type(restored.kbm) is dict
+        assert restored.to_json() == packet.to_json()
+
+
+class TestBulkLoad:
+    """Test trusted bulk construction."""
+    
+    def test_matches_constructor(self):
+        """Test bulk_load builds packets equal to from_dict."""
+        records = [
+            Packet(intent="a", constraints=["x"], kbm={"coherence_vector": [0.1, 0.2]}).to_dict(),
+            {"intent": "b"},
+        ]
+        
+        packets = Packet.bulk_load(records)
+        
+        assert packets == [Packet.from_dict(r) for r in records]
+        assert packets[1].constraints == [] and packets[1].metadata == {}
+        assert packets[1].constraints is not Packet.bulk_load([{"intent": "c"}])[0].constraints
+    
+    def test_rejects_malformed_records(self):
+        """Test unknown keys and missing intents still raise."""
+        with pytest.raises(TypeError):
+            Packet.bulk_load([{"intent": "a", "bogus": 1}])
+        with pytest.raises(TypeError):
+            Packet.bulk_load([{"divergence": 0.5}])
+    
+    def test_verify_switch(self, monkeypatch):
+        """Test the debug switch restores __post_init__ validation."""
+        import gc
+        record = {"intent": "a", "divergence": 1.5}
+        
+        assert Packet.bulk_load([record])[0].divergence == 1.5
+        assert gc.isenabled()
+        
+        monkeypatch.setattr(Packet, "verify_trusted", True)
+        with pytest.raises(ValueError):
+            Packet.bulk_load([record])
+        assert gc.isenabled()
+
+
 class TestPacketValidation:
     """Test packet validation."""
     
@@ -197,6 +479,226 @@ class TestPacketValidation:
         assert not strict_result.valid
 
 
+class TestValidationCodes:
+    """Test structured findings and lazily rendered messages."""
+    
+    def test_findings_carry_codes_and_params(self):
+        """Test findings are (code, params) tuples."""
+        packet = Packet(intent="test", divergence=0.85, immune=["name"])
+        result = Validator(packet).validate()
+        
+        assert (ValidationCode.HIGH_DIVERGENCE, (0.85,)) in result.warning_findings
+        assert result.codes == [ValidationCode.HIGH_DIVERGENCE, ValidationCode.NO_CONSTRAINTS,
+                                ValidationCode.DIVERGENCE_IMMUNE_CONFLICT]
+    
+    def test_messages_rendered_on_access(self):
+        """Test message text matches the original wording."""
+        packet = Packet(
+            intent="test",
+            constraints=["c1"],
+            kbm={"coherence_vector": [0.5, 0.52]},
+            c_tvm=["premise", "conclusion", -50],
+            foundation=["Elsewhere"],
+        )
+        result = Validator(packet).validate()
+        
+        assert "_errors" not in vars(result)
+        assert result.errors == ["token_budget must be positive integer, got -50"]
+        assert result.warnings == [
+            "Very tight KBM range (0.02)",
+            "Non-standard foundation anchor: 'Elsewhere'",
+        ]
+        assert "token_budget must be positive integer" in str(result)
+    
+    def test_strict_moves_findings(self):
+        """Test strict mode moves warning findings to errors."""
+        packet = Packet(intent="test", constraints=["c1"], divergence=0.85)
+        result = Validator(packet, strict=True).validate()
+        
+        assert result.codes == [ValidationCode.HIGH_DIVERGENCE]
+        assert result.errors == ["High divergence (0.85) may reduce determinism"]
+        assert result.warnings == []
+    
+    def test_every_code_has_message(self):
+        """Test each code renders a message."""
+        for code in ValidationCode:
+            assert code.template
+    
+    def test_string_messages_accepted(self):
+        """Test results built from plain strings still render."""
+        result = ValidationResult(False, ["custom error"], [], "v1.3")
+        
+        assert result.errors == ["custom error"]
+        assert result.codes == []
+    
+    def test_keyword_construction(self):
+        """Test results take errors and warnings by keyword."""
+        result = ValidationResult(valid=True, errors=[],
+                                  warnings=[(ValidationCode.LONG_INTENT, (300,))], layer="v1.3")
+        
+        assert result.warnings == ["Intent is very long (300 chars)"]
+        assert result.warning_findings == [(ValidationCode.LONG_INTENT, (300,))]
+    
+    def test_validator_messages(self):
+        """Test validator errors and warnings read as strings beside their codes."""
+        validator = Validator(Packet(intent="test", divergence=0.85, constraints=["c1"]))
+        validator.validate()
+        validator.warnings.append("custom warning")
+        
+        assert validator.warnings == ["High divergence (0.85) may reduce determinism",
+                                      "custom warning"]
+        assert validator.warning_findings == [(ValidationCode.HIGH_DIVERGENCE, (0.85,)),
+                                              "custom warning"]
+
+
+class TestValidationCache:
+    """Test the LRU validation result cache."""
+    
+    def test_hit_on_repeat_and_equal_copy(self):
+        """Test unchanged and equal packets are served from the cache."""
+        cache = ValidationCache()
+        packet = Packet(intent="test", divergence=0.85, metadata={"stage": "ingest"})
+        copy = Packet(intent="test", divergence=0.85, metadata={"stage": "routing"})
+        
+        first = validate_packet(packet, cache=cache)
+        assert validate_packet(packet, cache=cache) is first
+        assert validate_packet(copy, cache=cache) is first
+        assert (cache.hits, cache.misses) == (2, 1)
+    
+    def test_strict_and_changes_are_separate_keys(self):
+        """Test strict mode and edited packets miss."""
+        cache = ValidationCache()
+        packet = Packet(intent="test", constraints=["c1"], c_tvm=["p", "c", 100])
+        
+        assert validate_packet(packet, cache=cache).valid
+        assert validate_packet(packet, strict=True, cache=cache).valid
+        packet.c_tvm[2] = 100.0
+        assert not validate_packet(packet, cache=cache).valid
+        assert cache.misses == 3
+    
+    def test_eviction(self):
+        """Test the least recently used result is evicted."""
+        cache = ValidationCache(maxsize=2)
+        packets = [Packet(intent=f"p{i}") for i in range(3)]
+        for packet in packets:
+            cache.validate(packet)
+        
+        assert len(cache) == 2
+        assert cache.stats()["evictions"] == 1
+        cache.validate(Packet(intent="p0"))
+        assert cache.misses == 4
+    
+    def test_clear_forgets_packet_memo(self):
+        """Test results remembered on packets do not outlive clear()."""
+        cache = ValidationCache()
+        packet = Packet(intent="test")
+        cache.validate(packet)
+        cache.clear()
+        
+        cache.validate(packet)
+        assert (cache.hits, cache.misses) == (0, 1)
+    
+    def test_types_are_part_of_the_key(self):
+        """Test values that compare equal but validate differently miss."""
+        cache = ValidationCache()
+        listed = Packet(intent="test", c_tvm=["p", "c", 100])
+        
+        assert cache.validate(listed).valid
+        assert not cache.validate(Packet(intent="test", c_tvm=("p", "c", 100))).valid
+        assert not cache.validate(Packet(intent="test", c_tvm=["p", "c", 100.0])).valid
+    
+    def test_thread_safety(self):
+        """Test concurrent use keeps counters consistent."""
+        cache = ValidationCache(maxsize=8)
+        packets = [Packet(intent=f"p{i % 16}") for i in range(64)]
+        
+        def work():
+            for packet in packets:
+                cache.validate(packet)
+        
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        stats = cache.stats()
+        assert stats["hits"] + stats["misses"] == 4 * 64
+        assert stats["size"] <= 8
+
+
+
+class TestRevalidation:
+    """Test incremental revalidation after field changes."""
+    
+    TWEAKS = [
+        ("divergence", lambda p: setattr(p, "divergence", 0.9)),
+        ("kbm.coherence_vector", lambda p: p.kbm.update(coherence_vector=[0.5, 0.52])),
+        ("divergence", lambda p: setattr(p, "divergence", 1.5)),
+        ("immune", lambda p: setattr(p, "immune", ["keep", " "])),
+        ("foundation", lambda p: setattr(p, "foundation", [])),
+        ("kbm", lambda p: setattr(p, "kbm", None)),
+        ("mu_loop.threshold", lambda p: p.mu_loop.update(threshold=2)),
+        ("c_tvm", lambda p: setattr(p, "c_tvm", ["p", "c", 20000])),
+        ("gsn", lambda p: setattr(p, "gsn", {"link_vectors": "x"})),
+        ("divergence", lambda p: setattr(p, "divergence", 0.2)),
+        ("evf", lambda p: setattr(p, "evf", ["s", 0.5, 50])),
+        ("urp_enabled", lambda p: setattr(p, "urp_enabled", True)),
+        ("c_tvm", lambda p: setattr(p, "c_tvm", None)),
+        ("constraints", lambda p: setattr(p, "constraints", [])),
+        ("intent", lambda p: setattr(p, "intent", "")),
+    ]
+    
+    @pytest.mark.parametrize("strict", [False, True])
+    def test_matches_full_validation(self, strict):
+        """Test every tweak in sequence gives the same result as validate()."""
+        packet = Packet(
+            intent="tune", constraints=["c1"], divergence=0.3,
+            kbm={"coherence_vector": [0.2, 0.8]}, foundation=["Milieu", "Other"],
+            mu_loop={"window_size": 4, "threshold": 0.5},
+        )
+        result = validate_packet(packet, strict=strict)
+        for name, tweak in self.TWEAKS:
+            tweak(packet)
+            result = Validator(packet, strict=strict).revalidate(result, [name])
+            expected = validate_packet(packet, strict=strict)
+            assert (result.errors, result.warnings, result.layer) == \
+                (expected.errors, expected.warnings, expected.layer), name
+    
+    def test_cross_field_conflict(self):
+        """Test a divergence change alone re-runs the divergence/KBM conflict check."""
+        packet = Packet(intent="tune", constraints=["c1"], divergence=0.3,
+                        kbm={"coherence_vector": [0.5, 0.52]})
+        result = validate_packet(packet)
+        assert ValidationCode.DIVERGENCE_KBM_CONFLICT not in result.codes
+        
+        packet.divergence = 0.6
+        result = Validator(packet).revalidate(result, {"divergence"})
+        assert ValidationCode.DIVERGENCE_KBM_CONFLICT in result.codes
+    
+    def test_unchanged_rules_are_not_rerun(self):
+        """Test findings of rules whose fields did not change are reused."""
+        packet = Packet(intent="tune", constraints=["c1"], divergence=0.3)
+        result = validate_packet(packet)
+        
+        packet.intent = ""  # not declared below, so not re-checked
+        result = Validator(packet).revalidate(result, ["divergence"])
+        assert result.valid
+    
+    def test_unknown_field(self):
+        """Test misspelled fields are rejected."""
+        packet = Packet(intent="tune")
+        with pytest.raises(ValueError, match="divergance"):
+            Validator(packet).revalidate(validate_packet(packet), ["divergance"])
+    
+    def test_rule_fields_cover_every_rule(self):
+        """Test the dependency map lists real packet fields."""
+        packet_fields = {f.name for f in dataclasses.fields(Packet)}
+        assert "conflicts" in RULE_FIELDS
+        for fields in RULE_FIELDS.values():
+            assert fields <= packet_fields
+
+
 class TestPacketMigration:
     """Test packet migration between versions."""
     
@@ -240,6 +742,82 @@ class TestPacketMigration:
         
         assert v14.foundation is not None
         assert "Gravitas" in v14.foundation  # Inferred from "formal" and "professional"
+    
+    def test_foundation_keyword_matching(self):
+        """Test anchors come back in a fixed order, including overlapping keywords."""
+        assert infer_foundation("Atmospheric_MOOD", ["key_context"]) == \
+            ["Milieu", "Fulcrum", "Ambience"]
+        # "context" and "thesis" share the "t"
+        assert infer_foundation("contexthesis", []) == ["Milieu", "Fulcrum"]
+        assert infer_foundation("plain", ["words"]) is None
+    
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_migrate_batch(self, workers):
+        """Test batch migration matches migrate_packet, in order."""
+        def corpus():
+            return [Packet(intent=f"main_task_{i}", constraints=["formal"] if i % 2 else [],
+                           divergence=(i % 10) / 10, version="1.3")
+                    for i in range(40)]
+        
+        expected = [migrate_packet(p) for p in corpus()]
+        
+        assert migrate_batch(corpus(), workers=workers, chunk_size=7) == expected
+        assert migrate_batch(expected, "1.3", workers=workers, chunk_size=7) == \
+            [migrate_packet(p, "1.3") for p in expected]
+        with pytest.raises(ValueError):
+            migrate_batch([], chunk_size=0)
+    
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_migrate_batch_leaves_input_unchanged(self, workers):
+        """Test already-Kinetic packets are upgraded on copies."""
+        kinetic = [migrate_packet(Packet(intent=f"task_{i}", version="1.3")) for i in range(10)]
+        
+        gregarious = migrate_batch(kinetic, workers=workers, chunk_size=4)
+        
+        assert all(p.gsn is None for p in kinetic)
+        assert all(p.gsn for p in gregarious)
+        assert not any(new is old for new, old in zip(gregarious, kinetic))
+    
+    def test_network_id_is_stable_across_processes(self):
+        """Test auto network ids do not depend on the process's hash seed."""
+        script = ("from vse_core import Packet, migrate_packet; "
+                  "p = Packet(intent='summarize_report', version='1.3'); "
+                  "print(migrate_packet(migrate_packet(p)).gsn['network_id'])")
+        ids = set()
+        for seed in ("1", "2"):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            out = subprocess.run([sys.executable, "-c", script], env=env, check=True,
+                                 capture_output=True, text=True)
+            ids.add(out.stdout.strip())
+        
+        packet = v13_to_v14(Packet(intent="summarize_report", version="1.3"), "gregarious")
+        assert ids == {packet.gsn["network_id"]}
+        assert re.fullmatch(r"auto-\d{1,4}", packet.gsn["network_id"])
+    
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_network_id_strategy(self, workers):
+        """Test a custom network id strategy, passed or set as the default."""
+        def corpus():
+            return [Packet(intent=f"task_{i}", version="1.3") for i in range(20)]
+        
+        kinetic = migrate_batch(corpus())
+        batch = migrate_batch(kinetic, workers=workers, chunk_size=7,
+                              network_id=intent_network_id)
+        assert [p.gsn["network_id"] for p in batch] == [f"net-{p.intent}" for p in batch]
+        
+        set_network_id_strategy(intent_network_id)
+        try:
+            packet = migrate_packet(migrate_packet(Packet(intent="x", version="1.3")))
+            assert packet.gsn["network_id"] == "net-x"
+        finally:
+            set_network_id_strategy(digest_network_id)
+        packet = migrate_packet(migrate_packet(Packet(intent="x", version="1.3")))
+        assert packet.gsn["network_id"] == digest_network_id(packet)
+
+
+def intent_network_id(packet):
+    """Network id strategy for tests (module level, so it pickles)."""
+    return f"net-{packet.intent}"
 
 
 class TestPacketLayerDetection:
@@ -0,0 +1,132 @@
+"""
+Test Suite for Merkle Trees
+Tests incremental and parallel Merkle builds against merkle_root, and
+Merkle proofs.
+"""
+
+import hashlib
+import random
+
+import pytest
+
+from vse_core import Packet
+from vse_core.merkle_semantic import (
+    ConsistencyProof, InclusionProof, MerkleTree, ProofError, merkle_root, merkle_root_parallel,
+)
+
+
+def make_items(n, seed=0):
+    rng = random.Random(seed)
+    return [f"entry-{rng.random()}" for _ in range(n)]
+
+
+class TestMerkleTree:
+    """Test MerkleTree roots match merkle_root."""
+
+    def test_empty(self):
+        """Test the empty tree uses the empty-set convention."""
+        assert MerkleTree().root() == merkle_root([]) == hashlib.sha256(b"").hexdigest()
+        assert len(MerkleTree()) == 0
+
+    def test_append(self):
+        """Test the root after every append, across odd and even levels."""
+        items = make_items(40)
+        tree = MerkleTree()
+        for i, item in enumerate(items):
+            tree.append(item)
+            assert tree.root() == merkle_root(items[:i + 1])
+        assert len(tree) == 40
+
+    @pytest.mark.parametrize("n", [1, 2, 3, 7, 8, 9, 33])
+    def test_update_and_extend(self, n):
+        """Test updates anywhere, and extending a built tree."""
+        items = make_items(n, seed=n)
+        tree = MerkleTree(items[:n // 2])
+        tree.extend(items[n // 2:])
+        assert tree.root() == merkle_root(items)
+        for index in (0, n // 2, n - 1, -1):
+            items[index] = f"changed-{index}"
+            tree.update(index, items[index])
+            assert tree.root() == merkle_root(items)
+        with pytest.raises(IndexError):
+            tree.update(n, "x")
+
+    def test_mixed_leaves(self):
+        """Test packets, bytes and JSON values hash as in merkle_root."""
+        items = [Packet(intent="summarize"), b"raw", {"a": [1, 2]}, "text"]
+        tree = MerkleTree(items)
+        assert tree.root() == merkle_root(items)
+        assert tree.leaf(0) == bytes.fromhex(items[0].digest())
+
+
+class TestMerkleRootParallel:
+    """Test the thread-pool builder matches merkle_root."""
+
+    @pytest.mark.parametrize("n", [0, 1, 2, 5, 16, 17, 100, 257])
+    @pytest.mark.parametrize("chunk_size", [1, 4, 16, 1 << 14])
+    def test_same_root(self, n, chunk_size):
+        """Test roots across chunk boundaries and partial last chunks."""
+        items = make_items(n, seed=n)
+        assert merkle_root_parallel(items, workers=3, chunk_size=chunk_size) == \
+            merkle_root(items)
+
+    def test_iterables_and_arguments(self):
+        """Test non-list input and chunk_size checking."""
+        items = [b"x" * 4096] * 9
+        assert merkle_root_parallel(iter(items), chunk_size=2) == merkle_root(items)
+        with pytest.raises(ValueError):
+            merkle_root_parallel(items, chunk_size=3)
+
+
+class TestMerkleProofs:
+    """Test inclusion and consistency proofs."""
+
+    @pytest.mark.parametrize("n", [1, 2, 5, 8, 13])
+    def test_inclusion(self, n):
+        """Test every leaf's proof verifies, round-trips, and binds the item."""
+        items = make_items(n, seed=n)
+        tree = MerkleTree(items)
+        root = tree.root()
+        for index, item in enumerate(items):
+            proof = InclusionProof.from_bytes(tree.inclusion_proof(index).to_bytes())
+            assert proof == tree.inclusion_proof(index)
+            assert proof.verify(item, root)
+            assert not proof.verify("other", root)
+            assert not proof.verify(item, merkle_root(items + ["more"]))
+        assert len(tree.inclusion_proof(n - 1).hashes) <= (n - 1).bit_length()
+        with pytest.raises(IndexError):
+            tree.inclusion_proof(n)
+
+    @pytest.mark.parametrize("n", [1, 2, 6, 9, 16, 21])
+    def test_consistency(self, n):
+        """Test proofs from every earlier size to the grown tree."""
+        items = make_items(n, seed=n)
+        tree = MerkleTree(items)
+        root = tree.root()
+        for old_size in range(n + 1):
+            old_root = merkle_root(items[:old_size])
+            proof = ConsistencyProof.from_bytes(tree.consistency_proof(old_size).to_bytes())
+            assert proof.verify(old_root, root)
+            if 0 < old_size < n:
+                rewritten = items[:old_size - 1] + ["rewritten"]
+                assert not proof.verify(merkle_root(rewritten), root)
+                assert not proof.verify(old_root, merkle_root(items[:-1] + ["changed"]))
+        with pytest.raises(ValueError):
+            tree.consistency_proof(n + 1)
+
+    def test_malformed(self):
+        """Test decoding errors and proofs with missing or extra hashes."""
+        items = make_items(11)
+        tree = MerkleTree(items)
+        proof = tree.consistency_proof(5)
+        data = proof.to_bytes()
+        with pytest.raises(ProofError):
+            InclusionProof.from_bytes(data)
+        with pytest.raises(ProofError):
+            ConsistencyProof.from_bytes(data[:-1])
+        with pytest.raises(ProofError):
+            ConsistencyProof.from_bytes(data[:2])
+        old_root = merkle_root(items[:5])
+        for hashes in (proof.hashes[:-1], proof.hashes + proof.hashes[:1]):
+            assert not ConsistencyProof(5, 11, hashes).verify(old_root, tree.root())
+        assert not InclusionProof(11, 11, ()).verify(items[0], tree.root())
@@ -0,0 +1,92 @@
+"""
+Test Suite for the Merkle Store
+Tests file-backed trees against MerkleTree, reopening, crash recovery,
+and readers in other processes.
+"""
+
+import multiprocessing
+
+import pytest
+
+from vse_core.merkle_semantic import MerkleTree, diff_trees
+from vse_core.merkle_store import MerkleStore, MerkleStoreError
+
+
+def make_items(n, start=0):
+    return [f"entry-{i}" for i in range(start, start + n)]
+
+
+def read_root(path, index, item):
+    with MerkleStore(path, readonly=True) as store:
+        return store.root(), len(store), store.inclusion_proof(index).verify(item, store.root())
+
+
+class TestMerkleStore:
+    """Test MerkleStore."""
+
+    def test_matches_merkle_tree(self, tmp_path):
+        """Test roots, every node and proofs after each append."""
+        items = make_items(40)
+        tree = MerkleTree()
+        with MerkleStore(tmp_path / "ledger.vsem", flush_every=3) as store:
+            assert store.root() == tree.root()
+            for n, item in enumerate(items, 1):
+                store.append(item)
+                tree.append(item)
+                assert store.root() == tree.root()
+                for level in range((n - 1).bit_length() + 1):
+                    for index in range(((n - 1) >> level) + 1):
+                        assert store.node(level, index) == tree.node(level, index)
+                assert store.inclusion_proof(n // 2) == tree.inclusion_proof(n // 2)
+                assert store.consistency_proof(n // 3) == tree.consistency_proof(n // 3)
+            with pytest.raises(IndexError):
+                store.node(0, 40)
+            assert diff_trees(store, MerkleTree(items[:-1] + ["changed"])) == [(39, 40)]
+
+    def test_reopen_and_crash(self, tmp_path):
+        """Test reopening keeps flushed appends and drops unflushed ones."""
+        path = tmp_path / "ledger.vsem"
+        items = make_items(100)
+        with MerkleStore(path) as store:
+            store.extend(items[:70])
+
+        store = MerkleStore(path)
+        assert len(store) == 70 and store.root() == MerkleTree(items[:70]).root()
+        store.extend(items[70:])
+        store.flush()
+        # Crash after writing (but not committing) more nodes, mid-record
+        store.extend(make_items(21, start=500))
+        for f in store._files:
+            f.flush()
+        with open(f"{path}.0", "ab") as f:
+            f.write(b"torn")
+        del store
+
+        with MerkleStore(path) as store:
+            assert len(store) == 100 and store.root() == MerkleTree(items).root()
+            store.extend(make_items(5, start=100))
+        with MerkleStore(path, readonly=True) as store:
+            assert store.root() == MerkleTree(make_items(105)).root()
+            with pytest.raises(ValueError):
+                store.append("x")
+
+    def test_reader_process(self, tmp_path):
+        """Test a reader in another process sees the last flush."""
+        path = tmp_path / "ledger.vsem"
+        items = make_items(1000)
+        with MerkleStore(path) as store:
+            store.extend(items)
+            store.flush()
+            store.extend(make_items(10, start=1000))  # not flushed yet
+            with multiprocessing.get_context("spawn").Pool(1) as pool:
+                root, size, verified = pool.apply(read_root, (path, 123, items[123]))
+        assert (root, size, verified) == (MerkleTree(items).root(), 1000, True)
+
+    def test_bad_files(self, tmp_path):
+        """Test missing and malformed stores."""
+        with pytest.raises(MerkleStoreError):
+            MerkleStore(tmp_path / "missing.vsem", readonly=True)
+        path = tmp_path / "bad.vsem"
+        path.write_bytes(b"not a store at all")
+        with pytest.raises(MerkleStoreError):
+            MerkleStore(path)
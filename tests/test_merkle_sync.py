@@ -0,0 +1,147 @@
+"""
+Test Suite for Merkle Sync
+Tests anti-entropy between trees in one process and across two.
+"""
+
+import multiprocessing
+import random
+
+import pytest
+
+from vse_core import Packet
+from vse_core.merkle_semantic import MerkleTree, diff_trees
+from vse_core.merkle_sync import (
+    LEAVES, SyncClient, SyncError, SyncServer, connection_exchange, serve,
+)
+
+
+def make_items(n):
+    return [f"entry-{i}" for i in range(n)]
+
+
+def diverge(items, changes, seed=0):
+    """Copy of items with changes entries rewritten."""
+    rng = random.Random(seed)
+    changed = list(items)
+    for index in rng.sample(range(len(items)), changes):
+        changed[index] = f"changed-{index}"
+    return changed
+
+
+def serve_items(conn, items):
+    """Sync server process."""
+    serve(conn, SyncServer(MerkleTree(items), items))
+
+
+class TestDiffTrees:
+    """Test local tree diffs."""
+
+    def test_ranges(self):
+        """Test scattered, adjacent and trailing differences."""
+        items = make_items(100)
+        changed = list(items)
+        for index in (3, 40, 41, 42, 99):
+            changed[index] = "x"
+        a, b = MerkleTree(items), MerkleTree(changed)
+        assert diff_trees(a, b) == [(3, 4), (40, 43), (99, 100)]
+        assert diff_trees(a, a) == []
+        b.extend(["y", "z"])
+        assert diff_trees(a, b) == [(3, 4), (40, 43), (99, 102)]
+        assert diff_trees(MerkleTree(items[:60]), b) == [(3, 4), (40, 43), (60, 102)]
+        assert diff_trees(MerkleTree(), b) == [(0, 102)]
+
+
+class TestSync:
+    """Test the sync protocol."""
+
+    @pytest.mark.parametrize("local, remote", [(0, 37), (37, 37), (20, 37), (1, 1)])
+    def test_sync_in_process(self, local, remote):
+        """Test a client reaches the server's root from edits and a shorter history."""
+        items = [Packet(intent=f"task_{i}") for i in range(remote)]
+        server = SyncServer(MerkleTree(items), items)
+        tree = MerkleTree(diverge(items, min(3, remote))[:local])
+        client = SyncClient(tree, server.handle)
+
+        fetched = {}
+        ranges = client.sync(apply=fetched.__setitem__)
+
+        assert ranges and tree.root() == server.tree.root()
+        assert sorted(fetched) == [i for start, stop in ranges for i in range(start, stop)]
+        assert all(fetched[i] == items[i].canonical_bytes() for i in fetched)
+        assert client.sync() == []
+
+    @pytest.mark.parametrize("local", [0, 20, 37])
+    def test_bad_leaves_leave_tree_unchanged(self, local):
+        """Test a server sending wrong leaves cannot corrupt the local tree."""
+        items = make_items(37)
+        server = SyncServer(MerkleTree(items), items)
+
+        def tampering(message):
+            response = server.handle(message)
+            if message[0] == LEAVES:
+                response = response[:-1] + b"!"
+            return response
+
+        local_items = diverge(items, 3)[:local]
+        tree = MerkleTree(local_items)
+        before = tree.root()
+        fetched = []
+        with pytest.raises(SyncError):
+            SyncClient(tree, tampering).sync(apply=lambda *leaf: fetched.append(leaf))
+
+        assert (len(tree), tree.root()) == (local, before)
+        assert fetched == []
+        # The restored tree still syncs and grows correctly
+        SyncClient(tree, server.handle).sync()
+        assert tree.root() == server.tree.root()
+
+    def test_local_tree_longer(self):
+        """Test a client refuses to sync to a shorter remote tree."""
+        items = make_items(8)
+        client = SyncClient(MerkleTree(items + ["extra"]), SyncServer(MerkleTree(items)).handle)
+        assert client.diff() == [(8, 9)]
+        with pytest.raises(ValueError):
+            client.sync()
+
+    def test_malformed(self):
+        """Test bad requests and responses raise SyncError."""
+        server = SyncServer(MerkleTree(make_items(4)))
+        for message in (b"", b"\x09", b"\x01\x00\x01\x04", b"\x01\x05\x01\x00", b"\x01\x00\x02",
+                        b"\x02\x01\x00\x01"):
+            with pytest.raises(SyncError):
+                server.handle(message)
+        with pytest.raises(SyncError):
+            SyncClient(MerkleTree(), lambda message: b"\x01").hello()
+
+    def test_two_processes(self):
+        """Test sync over a pipe; traffic grows with the differences, not the size."""
+        items = make_items(4096)
+        full = sum(len(item) for item in items)
+        traffic = {}
+        # spawn, so the server does not inherit (and hold open) our end
+        context = multiprocessing.get_context("spawn")
+        conn, child = context.Pipe()
+        process = context.Process(target=serve_items, args=(child, items))
+        process.start()
+        child.close()
+        try:
+            for changes in (1, 16):
+                replica = diverge(items, changes, seed=changes)
+                tree = MerkleTree(replica)
+                client = SyncClient(tree, connection_exchange(conn))
+
+                def apply(index, payload):
+                    replica[index] = payload.decode("utf-8")
+
+                ranges = client.sync(apply)
+                assert tree.root() == MerkleTree(items).root()
+                assert replica == items
+                assert sum(stop - start for start, stop in ranges) == changes
+                traffic[changes] = client.bytes_sent + client.bytes_received
+        finally:
+            conn.close()
+            process.join(10)
+        assert process.exitcode == 0
+        assert traffic[1] < full / 20
+        # Diff paths share their upper levels, so 16 changes cost less than 16x
+        assert traffic[16] < 16 * traffic[1]
@@ -0,0 +1,126 @@
+"""
+Test Suite for Parallel Validation
+Tests ordered results, error policies, and stats from validate_corpus.
+"""
+
+import io
+import json
+
+import pytest
+
+from vse_core import Packet, PacketWriter, BadLine, validate_corpus, CorpusStats
+from vse_core.validator import validate_packet
+
+
+def make_packets(n):
+    return [
+        Packet(intent=f"task_{i}", constraints=["3_sentences"] if i % 4 else [],
+               divergence=(i % 10) / 10,
+               c_tvm=["p", "c", -1] if i % 7 == 0 else None)
+        for i in range(n)
+    ]
+
+
+def summary(results):
+    return [(r.valid, r.errors, r.warnings, r.layer) for r in results]
+
+
+class TestValidateCorpus:
+    """Test validate_corpus on a process pool and in process."""
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_matches_validate_packet(self, tmp_path, workers):
+        """Test results equal sequential validation, in input order."""
+        packets = make_packets(250)
+        path = tmp_path / "corpus.jsonl.gz"
+        with PacketWriter(path) as writer:
+            writer.write_many(packets)
+
+        stats = CorpusStats()
+        results = list(validate_corpus(path, workers=workers, chunk_size=16,
+                                       max_pending=2, stats=stats))
+
+        assert summary(results) == summary(validate_packet(p) for p in packets)
+        assert stats.packets == 250
+        assert stats.invalid == sum(not r.valid for r in results)
+        assert stats.elapsed > 0
+        assert len(stats.worker_busy) >= 1
+
+    def test_iterable_of_packets(self):
+        """Test packets and JSON strings are accepted directly."""
+        packets = make_packets(10)
+        source = packets[:5] + [p.to_json() for p in packets[5:]]
+
+        results = list(validate_corpus(source, workers=0, chunk_size=3))
+
+        assert summary(results) == summary(validate_packet(p) for p in packets)
+
+    def test_invalid_values_are_reported_not_raised(self):
+        """Test values the constructor would reject become validation errors."""
+        line = json.dumps({"intent": "x", "divergence": 1.5})
+
+        [result] = validate_corpus(io.StringIO(line + "\n"), workers=0)
+
+        assert not result.valid
+        assert result.errors == ["Divergence must be in [0.0, 1.0], got 1.5"]
+
+    def test_bad_line_policies(self):
+        """Test raise, skip and collect for lines that are not packets."""
+        text = '{"intent": "a"}\nnot json\n\n{"intent": "b"}\n'
+
+        with pytest.raises(ValueError, match="line 2"):
+            list(validate_corpus(io.StringIO(text), workers=0))
+        assert len(list(validate_corpus(io.StringIO(text), workers=0, errors="skip"))) == 2
+
+        bad = []
+        stats = CorpusStats()
+        results = list(validate_corpus(io.StringIO(text), workers=0, errors="collect",
+                                       bad_lines=bad, stats=stats))
+        assert len(results) == 2
+        assert [b.lineno for b in bad] == [2]
+        assert isinstance(bad[0], BadLine)
+        assert stats.bad_lines == 1
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_numbered(self, workers):
+        """Test line numbers count blank and bad lines, across chunks."""
+        text = '{"intent": "a"}\n\nnot json\n{"intent": "b"}\n{"intent": "c"}\n'
+
+        results = list(validate_corpus(io.StringIO(text), workers=workers, chunk_size=2,
+                                       errors="skip", numbered=True))
+
+        assert [lineno for lineno, _ in results] == [1, 4, 5]
+        assert all(result.valid for _, result in results)
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_wrong_typed_field_is_a_bad_line(self, workers):
+        """Test a value the validator cannot check fails only its line."""
+        text = '{"intent": "a"}\n{"intent": "b", "divergence": "high"}\n{"intent": "c"}\n'
+
+        bad = []
+        results = list(validate_corpus(io.StringIO(text), workers=workers, errors="collect",
+                                       bad_lines=bad))
+
+        assert len(results) == 2
+        assert [b.lineno for b in bad] == [2]
+        with pytest.raises(ValueError, match="line 2"):
+            list(validate_corpus(io.StringIO(text), workers=workers))
+
+    def test_report(self):
+        """Test the summary is written when requested."""
+        out = io.StringIO()
+        list(validate_corpus(make_packets(5), workers=0, report=out))
+
+        assert "Processed 5 packets" in out.getvalue()
+        assert "busy" in out.getvalue()
+
+    def test_bad_arguments(self):
+        """Test argument checking."""
+        with pytest.raises(ValueError):
+            validate_corpus([], errors="ignore")
+        with pytest.raises(ValueError):
+            validate_corpus([], errors="collect")
+        with pytest.raises(ValueError):
+            validate_corpus([], chunk_size=0)
+        with pytest.raises(ValueError):
+            validate_corpus([], fmt="xml")
@@ -0,0 +1,189 @@
+"""
+Test Suite for the Validation Rule Registry
+Tests rule order, layer gates, enable/disable profiles, custom rules, and
+per-rule profiling.
+"""
+
+import pytest
+
+from vse_core import (
+    Packet, Rule, RuleProfiler, RuleRegistry, ValidationCode, Validator,
+    get_default_rules, set_default_rules,
+)
+from vse_core.validator import RULE_FIELDS
+
+
+def kinetic_packet():
+    return Packet(intent="tune", constraints=["c1"], divergence=0.9,
+                  kbm={"coherence_vector": [0.5, 0.52]}, foundation=["Other"])
+
+
+@pytest.fixture
+def rules():
+    """Install a copy of the default rules for the test."""
+    previous = get_default_rules()
+    registry = previous.copy()
+    set_default_rules(registry)
+    yield registry
+    set_default_rules(previous)
+
+
+class TestRuleRegistry:
+    """Test the built-in rules and registry operations."""
+
+    def test_builtin_rules(self):
+        """Test the built-in rules run in order with declared layers."""
+        registry = get_default_rules()
+        assert [rule.name for rule in registry] == list(RULE_FIELDS)
+        assert registry["kbm"].layer == "kinetic"
+        assert registry["evf"].layer == "gregarious"
+        assert registry["conflicts"].dependencies == {"divergence", "kbm", "gsn", "immune"}
+        assert registry["mu_loop"].dependencies == {"mu_loop", "kbm", "c_tvm", "foundation"}
+        codes = [code for rule in registry for code in rule.codes]
+        assert sorted(codes) == sorted(ValidationCode)
+
+    def test_disable_and_enable(self, rules):
+        """Test disabled rules report nothing until enabled again."""
+        packet = kinetic_packet()
+        before = Validator(packet).validate().codes
+
+        rules.disable("kbm", "conflicts")
+        codes = Validator(packet).validate().codes
+        assert ValidationCode.TIGHT_KBM not in codes
+        assert ValidationCode.DIVERGENCE_KBM_CONFLICT not in codes
+        assert not rules.is_enabled("kbm")
+
+        rules.enable("kbm", "conflicts")
+        assert Validator(packet).validate().codes == before
+
+    def test_copy_is_independent(self):
+        """Test changing a copy leaves the default rules alone."""
+        registry = get_default_rules().copy()
+        registry.disable("intent")
+
+        assert ValidationCode.EMPTY_INTENT not in \
+            Validator(Packet(intent=""), rules=registry).validate().codes
+        assert ValidationCode.EMPTY_INTENT in Validator(Packet(intent="")).validate().codes
+        assert get_default_rules().is_enabled("intent")
+
+    def test_unknown_names(self):
+        """Test misspelled rules, layers and fields are rejected."""
+        registry = RuleRegistry()
+        with pytest.raises(ValueError):
+            get_default_rules().copy().disable("kbn")
+        with pytest.raises(ValueError):
+            registry.use_profile("nightly")
+        with pytest.raises(ValueError):
+            Rule("x", lambda v: None, layer="kinetc")
+        with pytest.raises(ValueError):
+            Rule("x", lambda v: None, fields={"intnet"})
+
+
+class TestCustomRules:
+    """Test registering rules of one's own."""
+
+    def test_register_with_position_and_layer(self, rules):
+        """Test a kinetic rule runs where registered, only on kinetic packets."""
+        seen = []
+
+        def check(validator):
+            seen.append(validator.packet.intent)
+            validator.warnings.append("custom warning")
+
+        rules.register(Rule("custom", check, layer="kinetic", fields={"kbm"}), after="kbm")
+        with pytest.raises(ValueError):
+            rules.register(Rule("custom", check))
+
+        result = Validator(kinetic_packet()).validate()
+        Validator(Packet(intent="core only", constraints=["c1"])).validate()
+
+        assert seen == ["tune"]
+        assert result.warnings[1:3] == ["Very tight KBM range (0.02)", "custom warning"]
+
+        rules.unregister("custom")
+        assert "custom" not in rules
+
+    def test_revalidate_with_custom_findings(self, rules):
+        """Test findings from undeclared codes force a full revalidation."""
+        rules.register(Rule("long_tasks", lambda v: v.warnings.append("long"),
+                            fields={"intent"}), before="conflicts")
+        packet = kinetic_packet()
+        previous = Validator(packet).validate()
+
+        packet.divergence = 0.1
+        result = Validator(packet).revalidate(previous, ["divergence"])
+
+        assert result.warnings == Validator(packet).validate().warnings
+
+    def test_revalidate_with_new_custom_message(self, rules):
+        """Test a re-run rule's plain message is placed as validate() would."""
+        def check(validator):
+            if len(validator.packet.intent) > 10:
+                validator.warnings.append("long task")
+
+        rules.register(Rule("long_tasks", check, fields={"intent"}), after="intent")
+        packet = kinetic_packet()
+        previous = Validator(packet).validate()
+
+        packet.intent = "tune every parameter"
+        result = Validator(packet).revalidate(previous, ["intent"])
+
+        assert "long task" in result.warnings
+        assert result.warnings == Validator(packet).validate().warnings
+
+
+class TestProfiles:
+    """Test named enable/disable profiles."""
+
+    def test_core_profile(self, rules):
+        """Test the core profile keeps only v1.3 rules."""
+        rules.use_profile("core")
+
+        assert {rule.layer for rule in rules.enabled()} == {"v1.3"}
+        assert Validator(Packet(intent="x", constraints=["c"], c_tvm=["p", "c", -1])).validate()
+
+        rules.use_profile("all")
+        assert len(rules.enabled()) == len(rules)
+
+    def test_defined_profiles(self, rules):
+        """Test profiles by enabled list, disabled list and layer."""
+        rules.define_profile("ingest", enabled=["intent", "divergence", "kbm"],
+                             disabled=["kbm"])
+        rules.use_profile("ingest")
+        assert [rule.name for rule in rules.enabled()] == ["intent", "divergence"]
+        assert rules.profile == "ingest"
+
+        rules.define_profile("network", layers=["v1.3", "gregarious"])
+        rules.use_profile("network")
+        assert "gsn" in rules.rule_fields() and "kbm" not in rules.rule_fields()
+
+
+class TestRuleProfiler:
+    """Test opt-in per-rule timing."""
+
+    def test_counts_and_report(self, rules):
+        """Test calls are counted only for rules that ran."""
+        rules.profiler = profiler = RuleProfiler()
+        for _ in range(3):
+            Validator(kinetic_packet()).validate()
+        Validator(Packet(intent="core only")).validate()
+
+        stats = profiler.stats()
+        assert stats["intent"]["calls"] == 4
+        assert stats["kbm"]["calls"] == 3
+        assert "gsn" not in stats
+        assert sum(s["share"] for s in stats.values()) == pytest.approx(1.0)
+        assert "conflicts" in profiler.report()
+
+        profiler.reset()
+        assert profiler.stats() == {}
+
+    def test_profiled_results_match(self, rules):
+        """Test profiling does not change results."""
+        packet = kinetic_packet()
+        expected = Validator(packet).validate()
+
+        rules.profiler = RuleProfiler()
+        result = Validator(packet).validate()
+
+        assert (result.errors, result.warnings) == (expected.errors, expected.warnings)
@@ -0,0 +1,141 @@
+"""
+Test Suite for VSE Packet Streams
+Tests JSONL round trips, compression detection, and bad-line policies.
+"""
+
+import gzip
+import io
+import json
+import tracemalloc
+
+import pytest
+
+from vse_core import Packet, iter_packets, PacketWriter, BadLine
+
+
+def make_packets(n):
+    return [
+        Packet(intent=f"summarize_{i}", constraints=["3_sentences"],
+               divergence=(i % 10) / 10,
+               kbm={"coherence_vector": [0.8, 0.92]} if i % 2 else None,
+               immune=["naïve café"] if i % 3 == 0 else [])
+        for i in range(n)
+    ]
+
+
+class TestPacketStreams:
+    """Test iter_packets and PacketWriter."""
+
+    @pytest.mark.parametrize("suffix", [".jsonl", ".jsonl.gz", ".jsonl.bz2", ".jsonl.xz"])
+    def test_round_trip(self, tmp_path, suffix):
+        """Test writing and reading back, with and without compression."""
+        packets = make_packets(50)
+        path = tmp_path / f"corpus{suffix}"
+        with PacketWriter(path, buffer_size=7) as writer:
+            assert writer.write_many(packets) == 50
+
+        # Compression is detected from content, not from the file name
+        renamed = tmp_path / "corpus.data"
+        path.rename(renamed)
+        read = list(iter_packets(renamed))
+        assert [p.to_dict() for p in read] == [p.to_dict() for p in packets]
+
+    @pytest.mark.parametrize("suffix", [".jsonl.gz", ".jsonl.bz2", ".jsonl.xz"])
+    def test_compresslevel(self, tmp_path, suffix):
+        """Test compresslevel is accepted by every compressed format."""
+        packets = make_packets(20)
+        path = tmp_path / f"corpus{suffix}"
+        with PacketWriter(path, compresslevel=1) as writer:
+            writer.write_many(packets)
+
+        read = list(iter_packets(path))
+        assert [p.to_dict() for p in read] == [p.to_dict() for p in packets]
+
+    def test_file_objects(self):
+        """Test caller-supplied streams are used but not closed."""
+        packets = make_packets(5)
+        buf = io.BytesIO()
+        with PacketWriter(buf) as writer:
+            writer.write_many(packets)
+        assert not buf.closed
+
+        buf.seek(0)
+        assert len(list(iter_packets(buf))) == 5
+        assert not buf.closed
+
+        text = io.StringIO(buf.getvalue().decode("utf-8"))
+        assert len(list(iter_packets(text))) == 5
+        assert not text.closed
+
+    def test_error_policies(self):
+        """Test raise, skip, and collect handling of bad lines."""
+        good = json.dumps(make_packets(1)[0].to_dict())
+        lines = "\n".join([
+            good,
+            "{not json",
+            "",
+            json.dumps({"intent": "x", "divergence": 2.0}),
+            json.dumps({"intent": "x", "unknown_field": 1}),
+            good,
+        ])
+
+        with pytest.raises(ValueError, match="line 2"):
+            list(iter_packets(io.StringIO(lines)))
+
+        assert len(list(iter_packets(io.StringIO(lines), errors="skip"))) == 2
+
+        bad = []
+        packets = list(iter_packets(io.StringIO(lines), errors="collect", bad_lines=bad))
+        assert len(packets) == 2
+        assert [b.lineno for b in bad] == [2, 4, 5]
+        assert all(isinstance(b, BadLine) for b in bad)
+        assert bad[0].line == "{not json"
+
+        with pytest.raises(ValueError):
+            list(iter_packets(io.StringIO(lines), errors="collect"))
+
+    @pytest.mark.parametrize("gzipped", [False, True])
+    def test_invalid_utf8_line(self, tmp_path, gzipped):
+        """Test a line of undecodable bytes fails alone, around valid lines."""
+        data = b'{"intent": "a"}\n{"intent": "\xff\xfe"}\n{"intent": "caf\xc3\xa9"}\n'
+        path = tmp_path / "mixed.jsonl"
+        if gzipped:
+            data = gzip.compress(data)
+        path.write_bytes(data)
+
+        bad = []
+        packets = list(iter_packets(path, errors="collect", bad_lines=bad))
+
+        assert [p.intent for p in packets] == ["a", "café"]
+        assert [(b.lineno, b.error) for b in bad] == [(2, "line is not valid UTF-8")]
+        with pytest.raises(ValueError, match="line 2"):
+            list(iter_packets(path))
+
+    def test_vse_lines(self):
+        """Test VSE-syntax lines are detected and can be mixed with JSON."""
+        packets = make_packets(4)
+        text = "".join((p.to_vse() if i % 2 else json.dumps(p.to_dict())) + "\n"
+                       for i, p in enumerate(packets))
+
+        assert list(iter_packets(io.StringIO(text))) == packets
+        with pytest.raises(ValueError, match="line 1"):
+            list(iter_packets(io.StringIO(text), fmt="vse"))
+        with pytest.raises(ValueError):
+            iter_packets(io.StringIO(text), fmt="xml").__next__()
+
+    def test_bounded_memory(self):
+        """Test peak memory does not grow with the number of lines."""
+        def peak(n):
+            buf = io.BytesIO()
+            with PacketWriter(buf) as writer:
+                writer.write_many(make_packets(n))
+            buf.seek(0)
+            tracemalloc.start()
+            for _ in iter_packets(buf):
+                pass
+            result = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return result
+
+        small, large = peak(500), peak(5000)
+        assert large < small * 2
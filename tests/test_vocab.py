@@ -0,0 +1,116 @@
+"""
+Test Suite for the VSE Vocabulary Pool
+Tests interning, ids, bounds, statistics, and decoder integration.
+"""
+
+import json
+import sys
+import threading
+
+import pytest
+
+from vse_core import (
+    Packet, Vocabulary, get_default_vocabulary, set_default_vocabulary,
+)
+
+
+@pytest.fixture
+def pool():
+    """Install a fresh default vocabulary for the test."""
+    previous = get_default_vocabulary()
+    vocab = Vocabulary()
+    set_default_vocabulary(vocab)
+    yield vocab
+    set_default_vocabulary(previous)
+
+
+class TestVocabulary:
+    """Test the Vocabulary pool."""
+
+    def test_interning_and_ids(self):
+        """Test equal tokens share one instance and a stable id."""
+        vocab = Vocabulary()
+        a = vocab.intern_list(["formal_tone", "".join(["3_", "sentences"])])
+        b = vocab.intern_list(["".join(["formal", "_tone"]), "3_sentences"])
+
+        assert a == b
+        assert all(x is y for x, y in zip(a, b))
+        assert vocab.ids(["formal_tone", "3_sentences"]) == [0, 1]
+        assert vocab.token(1) == "3_sentences"
+        assert "formal_tone" in vocab and len(vocab) == 2
+
+    def test_bounds(self):
+        """Test full pools and long tokens pass strings through."""
+        vocab = Vocabulary(max_size=2, max_token_length=8)
+
+        items = vocab.intern_list(["a", "b", "c", "x" * 9, "a"])
+
+        assert items == ["a", "b", "c", "x" * 9, "a"]
+        assert len(vocab) == 2
+        assert vocab.token_id("c") == -1
+        assert vocab.stats()["rejected"] == 2
+
+    def test_stats(self):
+        """Test hit rate and saved-bytes reporting."""
+        vocab = Vocabulary()
+        for _ in range(4):
+            vocab.intern_list(["formal_tone", "Milieu"])
+
+        stats = vocab.stats()
+
+        assert stats["lookups"] == 8
+        assert stats["hits"] == 6
+        assert stats["hit_rate"] == pytest.approx(0.75)
+        assert stats["saved_bytes"] > 0
+
+    def test_concurrent_stats(self):
+        """Test counts from concurrent threads are not lost."""
+        vocab = Vocabulary()
+        tokens = [f"tok{i}" for i in range(20)]
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [
+                threading.Thread(target=lambda: [vocab.intern_list(tokens) for _ in range(200)])
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        stats = vocab.stats()
+
+        assert stats["lookups"] == 8 * 200 * 20
+        assert stats["hits"] == stats["lookups"] - 20
+
+
+class TestDecoderInterning:
+    """Test Packet decoders share tokens through the default pool."""
+
+    def test_decoders_share_tokens(self, pool):
+        """Test from_vse, from_json and from_buffer intern list fields."""
+        packet = Packet(intent="x", constraints=["formal_tone"], immune=["Atlas"],
+                        foundation=["Milieu"])
+        decoded = [
+            Packet.from_vse(packet.to_vse()),
+            Packet.from_json(packet.to_json()),
+            Packet.from_buffer(packet.to_bytes()),
+            Packet.bulk_load([json.loads(packet.to_json())])[0],
+        ]
+
+        for other in decoded:
+            assert other == packet
+            assert other.constraints[0] is pool.intern("formal_tone")
+            assert other.foundation[0] is pool.intern("Milieu")
+        assert pool.stats()["hits"] > 0
+
+    def test_disabled(self, pool):
+        """Test decoding works with interning switched off."""
+        set_default_vocabulary(None)
+
+        packet = Packet.from_json('{"intent": "x", "constraints": ["a"]}')
+
+        assert packet.constraints == ["a"]
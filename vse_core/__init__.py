@@ -5,17 +5,63 @@ Vector-Space Esperanto v1.4
 Core packet handling, validation, and utilities.
 """
 
-from .packet import Packet, parse_packet
-from .validator import Validator, ValidationResult
-from .migration import migrate_packet, v13_to_v14
+from .packet import Packet, parse_packet, parse_packets
+from .scanner import PacketScanner, PacketSyntaxError
+from .validator import (
+    Validator, ValidationResult, ValidationCode, ValidationCache, validate_batch,
+    get_default_rules, set_default_rules,
+)
+from .rules import Rule, RuleRegistry, RuleProfiler
+from .migration import (
+    migrate_packet, migrate_batch, v13_to_v14, get_network_id_strategy, set_network_id_strategy,
+)
+from .batch import PacketBatch
+from .codec import CodecError
+from .canonical import canonical_bytes, canonical_json
+from .archive import PacketArchive, ArchiveWriter, ArchiveError
+from .vocab import Vocabulary, get_default_vocabulary, set_default_vocabulary
+from .stream import iter_packets, PacketWriter, BadLine
+from .parallel import validate_corpus, migrate_corpus, CorpusStats
+from .aio import AsyncValidator
 
 __all__ = [
     'Packet',
     'parse_packet',
+    'parse_packets',
+    'PacketScanner',
+    'PacketSyntaxError',
     'Validator',
     'ValidationResult',
+    'ValidationCode',
+    'ValidationCache',
+    'validate_batch',
+    'Rule',
+    'RuleRegistry',
+    'RuleProfiler',
+    'get_default_rules',
+    'set_default_rules',
     'migrate_packet',
+    'migrate_batch',
     'v13_to_v14',
+    'get_network_id_strategy',
+    'set_network_id_strategy',
+    'PacketBatch',
+    'CodecError',
+    'canonical_bytes',
+    'canonical_json',
+    'PacketArchive',
+    'ArchiveWriter',
+    'ArchiveError',
+    'Vocabulary',
+    'get_default_vocabulary',
+    'set_default_vocabulary',
+    'iter_packets',
+    'PacketWriter',
+    'BadLine',
+    'validate_corpus',
+    'migrate_corpus',
+    'CorpusStats',
+    'AsyncValidator',
 ]
 
 __version__ = '1.4.0'
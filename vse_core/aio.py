@@ -0,0 +1,258 @@
+"""
+VSE Core: Async Validation
+Packet validation for asyncio applications without blocking the event loop.
+
+AsyncValidator coalesces concurrent validate() calls into micro-batches:
+requests made while the event loop is busy are queued, and the queue is
+flushed on the next loop iteration (or after max_delay). A micro-batch of
+at most inline_limit packets is validated right there on the loop, which
+costs microseconds per packet; larger batches, and bulk validate_many()
+calls, are sent to an executor. Per-request latencies are kept so the
+executor can be sized from their percentiles.
+
+A thread executor keeps the loop responsive but shares the GIL with it;
+a ProcessPoolExecutor adds throughput at the cost of pickling packets and
+results, and its workers apply their own default rules.
+"""
+
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+import asyncio
+import time
+
+import numpy as np
+
+from .packet import Packet
+from .validator import ValidationResult, Validator
+
+
+def _validate_all(packets: List[Packet], strict: bool) -> List[ValidationResult]:
+    """Validate a batch (runs in the executor)."""
+    return [Validator(packet, strict=strict).validate() for packet in packets]
+
+
+def _validate_each(packets: List[Packet], strict: bool
+                   ) -> List[Union[ValidationResult, Exception]]:
+    """
+    Validate queued requests (inline or in the executor); a packet that
+    cannot be validated gets its exception in place of a result, so it
+    fails only its own request.
+    """
+    outcomes: List[Union[ValidationResult, Exception]] = []
+    for packet in packets:
+        try:
+            outcomes.append(Validator(packet, strict=strict).validate())
+        except Exception as e:
+            outcomes.append(e)
+    return outcomes
+
+
+class AsyncValidator:
+    """
+    Validates packets for coroutines, micro-batching concurrent requests.
+
+    Usage:
+        async with AsyncValidator() as validator:
+            result = await validator.validate(packet)
+            results = await validator.validate_many(packets)
+            print(validator.latency_percentiles())
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, strict: bool = False,
+                 inline_limit: int = 64, max_batch: int = 1024,
+                 max_delay: float = 0.0, latency_window: int = 10000):
+        """
+        Initialize validator.
+
+        Args:
+            executor: Executor for large batches (default: a one-thread
+                pool owned and shut down by this object)
+            strict: If True, warnings become errors
+            inline_limit: Largest batch validated on the event loop
+            max_batch: Packets per executor batch; a micro-batch this large
+                is flushed without waiting for the next loop iteration
+            max_delay: Seconds to wait for more requests before flushing
+                (0: flush on the next loop iteration)
+            latency_window: Most recent request latencies kept
+        """
+        if inline_limit < 0 or max_batch < 1:
+            raise ValueError("inline_limit must be >= 0 and max_batch >= 1")
+        self._owns_executor = executor is None
+        self.executor = ThreadPoolExecutor(max_workers=1) if executor is None else executor
+        self.strict = strict
+        self.inline_limit = inline_limit
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: List[Tuple[Packet, asyncio.Future, float]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._in_flight: set = set()
+        self._in_flight_requests = 0
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._closed = False
+        self.requests = 0
+        self.packets = 0
+        self.inline_batches = 0
+        self.executor_batches = 0
+
+    async def validate(self, packet: Packet) -> ValidationResult:
+        """
+        Validate one packet, batched with concurrent requests.
+
+        Returns:
+            ValidationResult
+        """
+        self._check_open()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((packet, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            if self.max_delay > 0:
+                self._flush_handle = loop.call_later(self.max_delay, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+        return await future
+
+    async def validate_many(self, packets: Iterable[Packet]) -> List[ValidationResult]:
+        """
+        Validate a batch of packets, in order.
+
+        Batches of at most inline_limit packets are validated on the event
+        loop; larger ones are split into max_batch chunks for the executor.
+
+        Returns:
+            One ValidationResult per packet
+        """
+        self._check_open()
+        start = time.perf_counter()
+        packets = list(packets)
+        if len(packets) <= self.inline_limit:
+            results = _validate_all(packets, self.strict)
+            self.inline_batches += 1
+        else:
+            loop = asyncio.get_running_loop()
+            chunks = [packets[i:i + self.max_batch]
+                      for i in range(0, len(packets), self.max_batch)]
+            self.executor_batches += len(chunks)
+            done = await asyncio.gather(*(
+                loop.run_in_executor(self.executor, _validate_all, chunk, self.strict)
+                for chunk in chunks
+            ))
+            results = [result for chunk_results in done for result in chunk_results]
+        self.requests += 1
+        self.packets += len(packets)
+        self._latencies.append(time.perf_counter() - start)
+        return results
+
+    def _flush(self) -> None:
+        """Validate the queued requests, inline or on the executor."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        packets = [packet for packet, _, _ in batch]
+        if len(packets) <= self.inline_limit:
+            self.inline_batches += 1
+            self._deliver(batch, _validate_each(packets, self.strict))
+            return
+        self.executor_batches += 1
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(self.executor, _validate_each, packets, self.strict)
+        self._in_flight.add(task)
+        self._in_flight_requests += len(batch)
+        task.add_done_callback(lambda done: self._delivered(batch, done))
+
+    def _delivered(self, batch: list, done: asyncio.Future) -> None:
+        self._in_flight.discard(done)
+        self._in_flight_requests -= len(batch)
+        if done.cancelled():
+            for _, future, _ in batch:
+                future.cancel()
+        elif done.exception() is not None:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(done.exception())
+        else:
+            self._deliver(batch, done.result())
+
+    def _deliver(self, batch: list, outcomes: List[Union[ValidationResult, Exception]]
+                 ) -> None:
+        now = time.perf_counter()
+        latencies = self._latencies
+        for (_, future, start), outcome in zip(batch, outcomes):
+            # A caller may have been cancelled while waiting
+            if future.done():
+                pass
+            elif isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+            latencies.append(now - start)
+        self.requests += len(batch)
+        self.packets += len(batch)
+
+    def latency_percentiles(self, percentiles: Sequence[float] = (50, 90, 99)
+                            ) -> Dict[float, float]:
+        """
+        Request latency percentiles over the latency window.
+
+        Latency runs from the call to the result being ready, including
+        time queued for a micro-batch or the executor.
+
+        Returns:
+            Dictionary of percentile to seconds (empty before any request)
+        """
+        if not self._latencies:
+            return {}
+        values = np.percentile(np.fromiter(self._latencies, dtype=np.float64,
+                                           count=len(self._latencies)), percentiles)
+        return dict(zip(percentiles, values.tolist()))
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Counters and latencies.
+
+        Returns:
+            Dictionary with requests, packets, inline_batches,
+            executor_batches, mean_batch (packets per batch), pending
+            (queued or in-flight requests) and p50/p90/p99 latency in
+            seconds
+        """
+        batches = self.inline_batches + self.executor_batches
+        stats = {
+            "requests": self.requests,
+            "packets": self.packets,
+            "inline_batches": self.inline_batches,
+            "executor_batches": self.executor_batches,
+            "mean_batch": self.packets / batches if batches else 0.0,
+            "pending": len(self._pending) + self._in_flight_requests,
+        }
+        for p, seconds in self.latency_percentiles().items():
+            stats[f"p{p:g}"] = seconds
+        return stats
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise ValueError("validate on closed AsyncValidator")
+
+    async def aclose(self) -> None:
+        """Finish queued requests, then shut down an owned executor."""
+        if self._closed:
+            return
+        self._flush()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        self._closed = True
+        if self._owns_executor:
+            # Waiting for the workers would block the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+
+    async def __aenter__(self) -> 'AsyncValidator':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
@@ -0,0 +1,440 @@
+"""
+VSE Core: Packet Archive
+Append-only, memory-mapped packet archive with random access.
+
+An archive at PATH is a data file, an offsets file and an id index:
+
+    PATH          data      b"VSEA" + format byte, then binary packet
+                            records (see codec) back to back
+    PATH.idx      offsets   uint64 byte offset of each record, in append order
+    PATH.ids.<g>  id run    (key: 16 bytes, position: uint64) entries sorted
+                            by key; key = BLAKE2b-128 of the packet id
+    PATH.ids      manifest  b"VSEI" + format byte + 3 zero bytes, then
+                            (generation, entries) uint64 pairs, one per id
+                            run, oldest first
+
+Readers map the files read-only, so opening costs O(log n) whatever the
+archive size, and any number of processes can read concurrently. The
+writer streams records to the data file as its buffer fills; flush()
+then publishes them: it appends their offsets, writes their ids as a new
+run, merged with the newest runs while those are no larger (so there are
+O(log n) runs and each id is rewritten O(log n) times in all), and
+finally replaces the manifest atomically.
+
+The manifest is the commit point. Readers take the record count from it
+before mapping anything else, so they only see complete records, and
+reopening for writing cuts the offsets and data back to the records it
+covers, dropping anything written but not flushed before a crash. Runs
+never change once written; merged ones are deleted after the manifest
+moves on (readers that mapped them keep their view). There must be at
+most one writer at a time.
+
+Packet ids default to Packet.digest(); any string can be used instead.
+"""
+
+from typing import Iterator, List, Optional, Tuple, Union
+import hashlib
+import mmap
+import os
+
+import numpy as np
+
+from . import codec
+from .packet import Packet
+
+
+MAGIC = b"VSEA"
+FORMAT_VERSION = 1
+_HEADER_SIZE = len(MAGIC) + 1
+# Enough of a record to read its length (see codec.packet_size)
+_RECORD_HEADER_SIZE = 9
+
+_OFFSET_DTYPE = np.dtype("<u8")
+_ID_DTYPE = np.dtype([("key", "S16"), ("pos", "<u8")])
+_MANIFEST_MAGIC = b"VSEI" + bytes([FORMAT_VERSION]) + bytes(3)
+_RUN_DTYPE = np.dtype([("gen", "<u8"), ("size", "<u8")])
+# Times a reader rereads a manifest whose runs were merged away meanwhile
+_OPEN_ATTEMPTS = 10
+
+
+class ArchiveError(ValueError):
+    """Raised for missing or malformed archive files."""
+
+
+def id_key(packet_id: str) -> bytes:
+    """16-byte index key for a packet id."""
+    return hashlib.blake2b(packet_id.encode("utf-8"), digest_size=16).digest()
+
+
+def _map_array(path: str, dtype: np.dtype, count: Optional[int] = None) -> np.ndarray:
+    """
+    Read-only memmap of the first count entries of a file (default: all,
+    or none if it is missing).
+
+    Raises:
+        ArchiveError: If the file holds fewer than count entries
+        FileNotFoundError: If count entries are asked of a missing file
+    """
+    if count is None:
+        count = (os.path.getsize(path) if os.path.exists(path) else 0) // dtype.itemsize
+    elif count and os.path.getsize(path) < count * dtype.itemsize:
+        raise ArchiveError(f"{path} is truncated: expected {count} entries")
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+
+def _run_path(path: str, gen: int) -> str:
+    return f"{path}.ids.{gen}"
+
+
+def _read_manifest(path: str) -> List[Tuple[int, int]]:
+    """(generation, entries) of each id run, oldest first (none if missing)."""
+    try:
+        with open(path + ".ids", "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    body = data[len(_MANIFEST_MAGIC):]
+    if not data.startswith(_MANIFEST_MAGIC) or len(body) % _RUN_DTYPE.itemsize:
+        raise ArchiveError(f"{path}.ids is not a VSE archive id manifest")
+    return [(int(gen), int(size)) for gen, size in np.frombuffer(body, dtype=_RUN_DTYPE)]
+
+
+class ArchiveWriter:
+    """
+    Appends packets to an archive (created if missing).
+
+    Usage:
+        with ArchiveWriter("corpus.vsea") as writer:
+            for packet in packets:
+                writer.append(packet)
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"], flush_every: int = 4096):
+        """
+        Open archive for appending.
+
+        Args:
+            path: Archive data file path
+            flush_every: Records buffered before they are written to the
+                data file (they are published by flush())
+
+        Raises:
+            ArchiveError: If the file is not an archive, or its offsets
+                do not cover its id index
+        """
+        self.path = os.fspath(path)
+        self.flush_every = flush_every
+        self._data = open(self.path, "ab")
+        if self._data.tell() == 0:
+            self._data.write(MAGIC + bytes([FORMAT_VERSION]))
+            self._data.flush()
+        else:
+            with open(self.path, "rb") as f:
+                if f.read(_HEADER_SIZE) != MAGIC + bytes([FORMAT_VERSION]):
+                    self._data.close()
+                    raise ArchiveError(f"{self.path} is not a VSE archive")
+        try:
+            self._runs = _read_manifest(self.path)
+            self._count = self._repair()
+        except ArchiveError:
+            self._data.close()
+            raise
+        self._next_gen = self._runs[-1][0] + 1 if self._runs else 0
+        self._offsets = open(self.path + ".idx", "ab")
+        self._end = self._data.tell()
+        self._records: List[bytes] = []
+        self._new_offsets: List[int] = []
+        self._new_keys: List[bytes] = []
+        self._closed = False
+
+    def _repair(self) -> int:
+        """
+        Cut offsets and data back to the records the manifest covers, and
+        delete id runs it does not list.
+
+        Returns:
+            Number of committed records
+        """
+        listed = set()
+        for gen, size in self._runs:
+            run_path = _run_path(self.path, gen)
+            if not os.path.exists(run_path) or \
+                    os.path.getsize(run_path) != size * _ID_DTYPE.itemsize:
+                raise ArchiveError(f"{run_path} is missing or does not hold {size} ids")
+            listed.add(os.path.basename(run_path))
+        directory, name = os.path.split(self.path)
+        prefix = name + ".ids."
+        for entry in os.listdir(directory or "."):
+            # Runs written or merged away by a writer that crashed
+            if entry.startswith(prefix) and entry not in listed:
+                os.remove(os.path.join(directory, entry))
+        count = sum(size for _, size in self._runs)
+        idx_path = self.path + ".idx"
+        idx_size = os.path.getsize(idx_path) if os.path.exists(idx_path) else 0
+        if idx_size < count * _OFFSET_DTYPE.itemsize:
+            raise ArchiveError(f"{idx_path} has {idx_size} bytes, expected at least "
+                               f"{count * _OFFSET_DTYPE.itemsize}")
+        if idx_size > count * _OFFSET_DTYPE.itemsize:
+            os.truncate(idx_path, count * _OFFSET_DTYPE.itemsize)
+        end = _HEADER_SIZE
+        if count:
+            with open(idx_path, "rb") as f:
+                f.seek((count - 1) * _OFFSET_DTYPE.itemsize)
+                last = int(np.frombuffer(f.read(_OFFSET_DTYPE.itemsize), dtype=_OFFSET_DTYPE)[0])
+            with open(self.path, "rb") as f:
+                f.seek(last)
+                try:
+                    end = last + codec.packet_size(f.read(_RECORD_HEADER_SIZE))
+                except codec.CodecError as e:
+                    raise ArchiveError(f"{self.path}: bad record at offset {last}: {e}") from e
+        size = self._data.tell()
+        if size < end:
+            raise ArchiveError(f"{self.path} is truncated: {size} bytes, expected {end}")
+        if size > end:
+            self._data.truncate(end)
+            self._data.seek(end)
+        return count
+
+    def __len__(self) -> int:
+        return self._count + len(self._new_offsets)
+
+    def append(self, packet: Packet, packet_id: Optional[str] = None) -> int:
+        """
+        Append one packet.
+
+        Args:
+            packet: Packet to store
+            packet_id: Lookup id (default: packet.digest())
+
+        Returns:
+            Position of the packet in the archive
+        """
+        if self._closed:
+            raise ValueError("append to closed ArchiveWriter")
+        record = packet.to_bytes()
+        position = len(self)
+        self._records.append(record)
+        self._new_offsets.append(self._end)
+        self._end += len(record)
+        self._new_keys.append(id_key(packet.digest() if packet_id is None else packet_id))
+        if len(self._records) >= self.flush_every:
+            self._write_records()
+        return position
+
+    def extend(self, packets) -> int:
+        """Append many packets; returns how many were written."""
+        before = len(self)
+        for packet in packets:
+            self.append(packet)
+        return len(self) - before
+
+    def _write_records(self) -> None:
+        if not self._records:
+            return
+        self._data.write(b"".join(self._records))
+        self._records.clear()
+
+    def flush(self) -> None:
+        """Write buffered records and publish them (offsets and ids) to readers."""
+        self._write_records()
+        if not self._new_keys:
+            return
+        # Data, offsets and the id run, then the manifest: whatever the
+        # manifest covers is complete in every other file
+        self._data.flush()
+        self._offsets.write(np.array(self._new_offsets, dtype=_OFFSET_DTYPE).tobytes())
+        self._offsets.flush()
+        run = np.empty(len(self._new_keys), dtype=_ID_DTYPE)
+        run["key"] = self._new_keys
+        run["pos"] = np.arange(self._count, self._count + len(self._new_keys), dtype=np.uint64)
+        # Absorb the newest runs while they are no larger, like carries in a
+        # binary counter: each merge at least doubles the run an id is in
+        runs = list(self._runs)
+        merged: List[int] = []
+        while runs and runs[-1][1] <= len(run):
+            gen, _ = runs.pop()
+            merged.append(gen)
+            run = np.concatenate([np.fromfile(_run_path(self.path, gen), dtype=_ID_DTYPE), run])
+        # Stable, and older runs come first, so duplicate ids stay in append
+        # order (position returns the last)
+        run = run[np.argsort(run["key"], kind="stable")]
+        gen = self._next_gen
+        run.tofile(_run_path(self.path, gen))
+        runs.append((gen, len(run)))
+        tmp = self.path + ".ids.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_MANIFEST_MAGIC + np.array(runs, dtype=_RUN_DTYPE).tobytes())
+        os.replace(tmp, self.path + ".ids")
+        self._runs = runs
+        self._next_gen += 1
+        for gen in merged:
+            os.remove(_run_path(self.path, gen))
+        self._count += len(self._new_keys)
+        self._new_keys.clear()
+        self._new_offsets.clear()
+
+    def close(self) -> None:
+        """Flush and close the archive files."""
+        if self._closed:
+            return
+        self.flush()
+        self._data.close()
+        self._offsets.close()
+        self._closed = True
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class PacketArchive:
+    """
+    Read-only random access to an archive.
+
+    Usage:
+        with PacketArchive("corpus.vsea") as archive:
+            packet = archive[12_345_678]
+            same = archive.get(packet.digest())
+            for packet in archive.iter_range(1000, 2000):
+                ...
+
+    The reader sees the archive as it was when opened; reopen to pick up
+    packets appended later.
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]):
+        """
+        Map an archive for reading.
+
+        Raises:
+            ArchiveError: If the data file is missing or not an archive, or
+                the other files do not cover the manifest
+        """
+        self.path = os.fspath(path)
+        # The manifest first, then the files it covers, which only grow
+        # past it meanwhile. A writer may merge runs away before they are
+        # mapped; the manifest has then moved on, so read it again.
+        try:
+            for _ in range(_OPEN_ATTEMPTS):
+                runs = _read_manifest(self.path)
+                try:
+                    self._runs = [_map_array(_run_path(self.path, gen), _ID_DTYPE, size)
+                                  for gen, size in runs]
+                    break
+                except FileNotFoundError:
+                    continue
+            else:
+                raise ArchiveError(f"{self.path}.ids lists id runs that do not exist")
+            count = sum(size for _, size in runs)
+            self._offsets = _map_array(self.path + ".idx", _OFFSET_DTYPE, count)
+            with open(self.path, "rb") as f:
+                header = f.read(_HEADER_SIZE)
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ArchiveError:
+            raise
+        except (OSError, ValueError) as e:
+            raise ArchiveError(f"Cannot open archive {self.path}: {e}") from e
+        if header != MAGIC + bytes([FORMAT_VERSION]) or \
+                (count and int(self._offsets[-1]) >= len(self._mmap)):
+            self._mmap.close()
+            raise ArchiveError(f"{self.path} is not a VSE archive, or is truncated")
+        self._view = memoryview(self._mmap)
+        self._keys = [run["key"] for run in self._runs]
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def record(self, i: int) -> bytes:
+        """
+        Raw binary record of packet i.
+
+        Returns a copy, so the archive can be closed while it is in use.
+        """
+        offset = int(self._offsets[self._index(i)])
+        return self._view[offset:offset + codec.packet_size(self._view, offset)].tobytes()
+
+    def _index(self, i: int) -> int:
+        n = len(self._offsets)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(f"packet index {i} out of range for archive of {n}")
+        return i
+
+    def _decode(self, offset: int) -> Packet:
+        # Records were validated packets when appended
+        return Packet._trusted(codec.decode_fields(self._view, offset))
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Packet, List[Packet]]:
+        """Packet at a position (or a list of packets for a slice)."""
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+        return self._decode(int(self._offsets[self._index(key)]))
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Packet]:
+        """
+        Lazily decode packets in [start, stop).
+
+        Yields:
+            Packets in archive order, one at a time
+        """
+        n = len(self)
+        stop = n if stop is None else min(stop, n)
+        decode = self._decode
+        for offset in self._offsets[start:stop].tolist():
+            yield decode(offset)
+
+    def __iter__(self) -> Iterator[Packet]:
+        return self.iter_range()
+
+    def position(self, packet_id: str) -> int:
+        """
+        Position of the last packet appended with an id.
+
+        Raises:
+            KeyError: If no packet has that id
+        """
+        key = id_key(packet_id)
+        # numpy drops trailing NULs from "S16" scalars; keys are all 16
+        # bytes long, so comparing without them is still exact
+        stripped = key.rstrip(b"\0")
+        # Newer runs hold later positions, and equal keys within a run are
+        # in append order
+        for run, keys in zip(reversed(self._runs), reversed(self._keys)):
+            hi = int(np.searchsorted(keys, key, side="right"))
+            if hi and keys[hi - 1] == stripped:
+                return int(run["pos"][hi - 1])
+        raise KeyError(packet_id)
+
+    def get(self, packet_id: str, default: Optional[Packet] = None) -> Optional[Packet]:
+        """Packet with an id (see position), or default."""
+        try:
+            return self[self.position(packet_id)]
+        except KeyError:
+            return default
+
+    def __contains__(self, packet_id: str) -> bool:
+        try:
+            self.position(packet_id)
+        except KeyError:
+            return False
+        return True
+
+    def close(self) -> None:
+        """Unmap the archive files."""
+        self._view.release()
+        self._mmap.close()
+        self._offsets = self._runs = self._keys = None
+
+    def __enter__(self) -> 'PacketArchive':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"PacketArchive({self.path!r}, {len(self):,} packets)"
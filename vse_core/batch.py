@@ -0,0 +1,343 @@
+"""
+VSE Core: Columnar Packet Batches
+Struct-of-arrays storage for large packet corpora.
+
+A PacketBatch keeps one NumPy array per scalar field instead of one
+Packet object per packet:
+- divergence, KBM coherence bounds: float64 arrays
+- version layer: int8 codes (see LAYERS)
+- intent, constraints, immune, foundation: ids into an interned string table
+- variable-length lists: flat id arrays plus (n + 1) offset arrays
+- remaining nested fields (kbm, c_tvm, mu_loop, gsn, evf, metadata):
+  ids into an interned table of their JSON encodings
+
+Batches convert losslessly to and from Packet for JSON-compatible field
+values, and support vectorized filtering with boolean masks.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Union
+import json
+import sys
+
+import numpy as np
+
+from .packet import Packet
+
+
+# Layer codes used by PacketBatch.layer
+LAYERS = ("v1.3", "v1.4-kinetic", "v1.4-gregarious")
+_LAYER_CODES = {name: code for code, name in enumerate(LAYERS)}
+
+# Nested fields stored as interned JSON blobs (-1 = None)
+_BLOB_FIELDS = ("kbm", "c_tvm", "mu_loop", "gsn", "evf", "metadata")
+
+# Variable-length string list fields stored as (offsets, ids)
+_LIST_FIELDS = ("constraints", "immune", "foundation")
+
+
+class StringTable:
+    """
+    Append-only interned string table.
+
+    Each distinct string is stored once and addressed by a small integer id.
+    """
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, s: str) -> int:
+        """Return the id of s, adding it to the table if needed."""
+        sid = self._ids.get(s)
+        if sid is None:
+            sid = len(self.values)
+            self._ids[s] = sid
+            self.values.append(s)
+        return sid
+
+    def __getitem__(self, sid: int) -> str:
+        return self.values[sid]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the table (strings + index)."""
+        return (
+            sum(sys.getsizeof(s) for s in self.values)
+            + sys.getsizeof(self.values)
+            + sys.getsizeof(self._ids)
+        )
+
+
+def _take_ragged(offsets: np.ndarray, values: np.ndarray, idx: np.ndarray):
+    """Gather rows idx from a ragged (offsets, values) column."""
+    starts = offsets[idx]
+    lengths = offsets[idx + 1] - starts
+    new_offsets = np.zeros(len(idx) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    positions = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(
+        new_offsets[-1], dtype=np.int64
+    )
+    return new_offsets, values[positions]
+
+
+class PacketBatch:
+    """
+    Columnar container for many packets.
+
+    Usage:
+        batch = PacketBatch.from_packets(packets)
+        risky = batch[(batch.divergence > 0.5) & batch.layer_mask("v1.4-kinetic")]
+        for packet in risky:
+            ...
+
+    Attributes:
+        divergence (np.ndarray): float64 divergence per packet
+        kbm_min, kbm_max (np.ndarray): float64 coherence_vector bounds (NaN if absent)
+        layer (np.ndarray): int8 layer code per packet (index into LAYERS)
+        urp_enabled (np.ndarray): bool per packet
+        version, intent (np.ndarray): int32 ids into strings
+        strings (StringTable): interned versions, intents and list items
+        blobs (StringTable): interned JSON encodings of nested fields
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], strings: StringTable,
+                 blobs: StringTable):
+        """
+        Initialize from prepared columns (see from_packets).
+
+        Args:
+            columns: Column name -> array
+            strings: Interned string table
+            blobs: Interned JSON blob table
+        """
+        self._columns = columns
+        self.strings = strings
+        self.blobs = blobs
+        for name, array in columns.items():
+            setattr(self, name, array)
+
+    @classmethod
+    def from_packets(cls, packets: Iterable[Packet]) -> 'PacketBatch':
+        """
+        Build a batch from Packet objects.
+
+        Args:
+            packets: Iterable of packets
+
+        Returns:
+            PacketBatch holding the same data
+        """
+        strings = StringTable()
+        blobs = StringTable()
+        intern = strings.intern
+        intern_blob = blobs.intern
+
+        version: List[int] = []
+        intent: List[int] = []
+        divergence: List[float] = []
+        layer: List[int] = []
+        urp: List[bool] = []
+        kbm_min: List[float] = []
+        kbm_max: List[float] = []
+        foundation_present: List[bool] = []
+        lists: Dict[str, List[int]] = {name: [] for name in _LIST_FIELDS}
+        lengths: Dict[str, List[int]] = {name: [] for name in _LIST_FIELDS}
+        nested: Dict[str, List[int]] = {name: [] for name in _BLOB_FIELDS}
+        nan = float("nan")
+
+        for packet in packets:
+            version.append(intern(packet.version))
+            intent.append(intern(packet.intent))
+            divergence.append(packet.divergence)
+            layer.append(_LAYER_CODES[packet.get_version_layer()])
+            urp.append(bool(packet.urp_enabled))
+
+            lo = hi = nan
+            kbm = packet.kbm
+            if kbm and "coherence_vector" in kbm:
+                try:
+                    lo, hi = (float(v) for v in kbm["coherence_vector"])
+                except (TypeError, ValueError):
+                    lo = hi = nan
+            kbm_min.append(lo)
+            kbm_max.append(hi)
+
+            foundation_present.append(packet.foundation is not None)
+            for name in _LIST_FIELDS:
+                items = getattr(packet, name) or ()
+                lists[name].extend(intern(s) for s in items)
+                lengths[name].append(len(items))
+
+            for name in _BLOB_FIELDS:
+                value = getattr(packet, name)
+                nested[name].append(-1 if value is None else intern_blob(json.dumps(value)))
+
+        columns: Dict[str, np.ndarray] = {
+            "version": np.array(version, dtype=np.int32),
+            "intent": np.array(intent, dtype=np.int32),
+            "divergence": np.array(divergence, dtype=np.float64),
+            "layer": np.array(layer, dtype=np.int8),
+            "urp_enabled": np.array(urp, dtype=bool),
+            "kbm_min": np.array(kbm_min, dtype=np.float64),
+            "kbm_max": np.array(kbm_max, dtype=np.float64),
+            "foundation_present": np.array(foundation_present, dtype=bool),
+        }
+        for name in _LIST_FIELDS:
+            offsets = np.zeros(len(version) + 1, dtype=np.int64)
+            np.cumsum(np.array(lengths[name], dtype=np.int64), out=offsets[1:])
+            columns[f"{name}_offsets"] = offsets
+            columns[f"{name}_ids"] = np.array(lists[name], dtype=np.int32)
+        for name in _BLOB_FIELDS:
+            columns[f"{name}_blob"] = np.array(nested[name], dtype=np.int32)
+
+        return cls(columns, strings, blobs)
+
+    def __len__(self) -> int:
+        return len(self.divergence)
+
+    def _list_at(self, name: str, i: int) -> List[str]:
+        offsets = self._columns[f"{name}_offsets"]
+        ids = self._columns[f"{name}_ids"][offsets[i]:offsets[i + 1]]
+        values = self.strings.values
+        return [values[sid] for sid in ids.tolist()]
+
+    def _blob_at(self, name: str, i: int) -> Any:
+        code = int(self._columns[f"{name}_blob"][i])
+        return None if code < 0 else json.loads(self.blobs[code])
+
+    def packet(self, i: int) -> Packet:
+        """
+        Materialize packet i as a Packet object.
+
+        Args:
+            i: Row index (negative indices allowed)
+
+        Returns:
+            Packet equal to the one the row was built from
+        """
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(f"packet index {i} out of range for batch of {n}")
+
+        # Rows were built from validated packets, so skip re-validation
+        return Packet._trusted(self._record(i))
+
+    def _record(self, i: int) -> Dict[str, Any]:
+        values = self.strings.values
+        return {
+            "intent": values[self.intent[i]],
+            "constraints": self._list_at("constraints", i),
+            "divergence": float(self.divergence[i]),
+            "immune": self._list_at("immune", i),
+            "version": values[self.version[i]],
+            "kbm": self._blob_at("kbm", i),
+            "c_tvm": self._blob_at("c_tvm", i),
+            "foundation": self._list_at("foundation", i) if self.foundation_present[i] else None,
+            "mu_loop": self._blob_at("mu_loop", i),
+            "gsn": self._blob_at("gsn", i),
+            "evf": self._blob_at("evf", i),
+            "urp_enabled": bool(self.urp_enabled[i]),
+            "metadata": self._blob_at("metadata", i),
+        }
+
+    def to_packets(self) -> List[Packet]:
+        """Materialize every row as a Packet."""
+        return Packet.bulk_load(self._record(i) for i in range(len(self)))
+
+    def __iter__(self) -> Iterator[Packet]:
+        for i in range(len(self)):
+            yield self.packet(i)
+
+    def __getitem__(self, key: Union[int, slice, Sequence[int], np.ndarray]
+                    ) -> Union[Packet, 'PacketBatch']:
+        """
+        Index the batch.
+
+        An integer returns a Packet; a slice, boolean mask or index array
+        returns a new PacketBatch sharing this batch's string tables.
+        """
+        if isinstance(key, (int, np.integer)):
+            return self.packet(int(key))
+        return self.take(key)
+
+    def take(self, key: Union[slice, Sequence[int], np.ndarray]) -> 'PacketBatch':
+        """
+        Select rows by slice, boolean mask or integer indices.
+
+        Args:
+            key: Row selector
+
+        Returns:
+            New PacketBatch with the selected rows, in selector order
+        """
+        if isinstance(key, slice):
+            idx = np.arange(len(self), dtype=np.int64)[key]
+        else:
+            key = np.asarray(key)
+            if key.dtype == bool:
+                if len(key) != len(self):
+                    raise IndexError(
+                        f"boolean mask of length {len(key)} for batch of {len(self)}"
+                    )
+                idx = np.flatnonzero(key)
+            else:
+                idx = key.astype(np.int64, copy=False)
+                idx = np.where(idx < 0, idx + len(self), idx)
+
+        columns: Dict[str, np.ndarray] = {}
+        for name, array in self._columns.items():
+            if name.endswith("_ids"):
+                continue
+            if name.endswith("_offsets"):
+                field_name = name[:-len("_offsets")]
+                offsets, ids = _take_ragged(array, self._columns[f"{field_name}_ids"], idx)
+                columns[name] = offsets
+                columns[f"{field_name}_ids"] = ids
+            else:
+                columns[name] = array[idx]
+        return PacketBatch(columns, self.strings, self.blobs)
+
+    def filter(self, mask: np.ndarray) -> 'PacketBatch':
+        """Keep rows where mask is True."""
+        return self.take(np.asarray(mask, dtype=bool))
+
+    def layer_mask(self, layer: str) -> np.ndarray:
+        """
+        Boolean mask of rows on a given layer.
+
+        Args:
+            layer: "v1.3", "v1.4-kinetic", or "v1.4-gregarious"
+        """
+        return self.layer == _LAYER_CODES[layer]
+
+    def list_lengths(self, name: str) -> np.ndarray:
+        """Per-row length of a list field ("constraints", "immune", "foundation")."""
+        return np.diff(self._columns[f"{name}_offsets"])
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Bytes held by the batch.
+
+        Returns:
+            Dictionary with "arrays", "strings", "blobs" and "total" byte counts
+        """
+        arrays = sum(array.nbytes for array in self._columns.values())
+        strings = self.strings.nbytes()
+        blobs = self.blobs.nbytes()
+        return {
+            "arrays": arrays,
+            "strings": strings,
+            "blobs": blobs,
+            "total": arrays + strings + blobs,
+        }
+
+    def bytes_per_packet(self) -> float:
+        """Average memory per packet (string tables included)."""
+        return self.memory_usage()["total"] / max(1, len(self))
+
+    def __repr__(self) -> str:
+        return f"PacketBatch({len(self)} packets, {self.bytes_per_packet():.0f} B/packet)"
@@ -0,0 +1,85 @@
+"""
+VSE Core: Canonical Encoding
+Deterministic byte encoding for JSON-compatible values.
+
+The canonical form is compact UTF-8 JSON with:
+- object keys sorted by code point, no insignificant whitespace
+- non-ASCII characters written literally (no \\u escapes)
+- integral floats below 2**53 written as integers (1.0 -> 1, -0.0 -> 0),
+  so values that compare equal in Python encode identically
+- other floats in shortest round-trip form (float.__repr__)
+- tuples encoded as lists
+
+NaN, infinities and non-string object keys are rejected, since they have
+no portable JSON form. The encoding depends only on the value, never on
+insertion order, process, or Python version, so it is suitable for cache
+keys and content digests.
+"""
+
+from typing import Any
+import hashlib
+import json
+import operator
+
+
+_MAX_EXACT_FLOAT = 2.0 ** 53
+
+_encode = json.JSONEncoder(
+    sort_keys=True,
+    separators=(",", ":"),
+    ensure_ascii=False,
+    allow_nan=False,
+    check_circular=True,
+).encode
+
+
+def _normalize(value: Any) -> Any:
+    """Return value with numbers in canonical form (unchanged objects are reused)."""
+    kind = type(value)
+    if isinstance(value, float):
+        if value.is_integer() and -_MAX_EXACT_FLOAT < value < _MAX_EXACT_FLOAT:
+            return int(value)
+        return value
+    if isinstance(value, (list, tuple)):
+        items = [_normalize(item) for item in value]
+        if kind is list and all(map(operator.is_, items, value)):
+            return value
+        return items
+    if isinstance(value, dict):
+        result = {}
+        changed = kind is not dict
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError(f"Canonical objects need str keys, got {type(key).__name__}")
+            normalized = _normalize(item)
+            changed = changed or normalized is not item
+            result[key] = normalized
+        return result if changed else value
+    return value
+
+
+def canonical_json(value: Any) -> str:
+    """
+    Encode a JSON-compatible value in canonical form.
+
+    Args:
+        value: None, bool, int, float, str, list/tuple or dict with str keys
+
+    Returns:
+        Canonical JSON text
+
+    Raises:
+        ValueError: For NaN or infinite floats
+        TypeError: For unsupported types or non-string keys
+    """
+    return _encode(_normalize(value))
+
+
+def canonical_bytes(value: Any) -> bytes:
+    """Canonical JSON of value as UTF-8 bytes."""
+    return canonical_json(value).encode("utf-8", "surrogatepass")
+
+
+def digest(value: Any) -> str:
+    """SHA-256 hex digest of the canonical bytes of value."""
+    return hashlib.sha256(canonical_bytes(value)).hexdigest()
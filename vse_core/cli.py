@@ -0,0 +1,238 @@
+"""
+VSE Core: Command Line Tools
+Streaming vse-validate and vse-migrate entry points.
+
+Both tools read packets from files or stdin, one per line in JSON or VSE
+syntax (detected per line unless --format is given; compressed files are
+detected too), process them on a pool of worker processes, and write
+results in input order as they are produced.
+
+Exit status is 0 when every packet is valid, 1 when some packet is
+invalid or some line is not a packet, and 2 for usage or input errors.
+"""
+
+from typing import Callable, Counter, Iterator, List, Optional, Sequence, TextIO
+import argparse
+import collections
+import json
+import lzma
+import os
+import sys
+
+from .parallel import CorpusStats, migrate_corpus, validate_corpus
+from .stream import FORMATS, BadLine
+from .validator import ValidationResult
+
+
+def _count_type(minimum: int) -> Callable[[str], int]:
+    """argparse type for an integer of at least minimum."""
+    def count(text: str) -> int:
+        value = int(text)
+        if value < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {value}")
+        return value
+    count.__name__ = "integer"  # named in argparse's "invalid integer value" message
+    return count
+
+
+def _parser(prog: str, description: str) -> argparse.ArgumentParser:
+    """Options shared by both tools."""
+    parser = argparse.ArgumentParser(prog=prog, description=description)
+    parser.add_argument("files", nargs="*", default=["-"],
+                        help="input files (default: stdin; '-' also means stdin)")
+    parser.add_argument("-j", "--jobs", type=_count_type(0), default=os.cpu_count() or 1,
+                        help="worker processes (default: CPU count; 0 runs in process)")
+    parser.add_argument("--strict", action="store_true",
+                        help="treat warnings as errors")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="stop at the first invalid packet or bad line")
+    parser.add_argument("--stats", action="store_true",
+                        help="print throughput and finding-code histograms to stderr")
+    parser.add_argument("--format", choices=FORMATS, default="auto",
+                        help="input line format (default: auto)")
+    parser.add_argument("--chunk-size", type=_count_type(1), default=1000,
+                        help="packets sent to a worker at a time (default: 1000)")
+    return parser
+
+
+# Errors reading an input, besides OSError
+_INPUT_ERRORS = (EOFError, lzma.LZMAError, ValueError, TypeError)
+
+
+class _Run:
+    """State shared by one tool invocation: counters, histograms, diagnostics."""
+
+    def __init__(self, prog: str, args: argparse.Namespace, err: TextIO):
+        self.prog = prog
+        self.args = args
+        self.err = err
+        self.stats = CorpusStats()
+        self.error_codes: Counter[str] = collections.Counter()
+        self.warning_codes: Counter[str] = collections.Counter()
+        self.failed = False
+
+    def sources(self) -> Iterator[tuple]:
+        """(display name, path or binary stream) for each input."""
+        for name in self.args.files:
+            if name == "-":
+                yield "<stdin>", sys.stdin.buffer
+            else:
+                yield name, name
+
+    def count(self, result: ValidationResult) -> None:
+        """Add a result's findings to the histograms."""
+        for code in _codes(result.error_findings):
+            self.error_codes[code] += 1
+        for code in _codes(result.warning_findings):
+            self.warning_codes[code] += 1
+
+    def bad_line(self, name: str, bad: BadLine) -> None:
+        self.failed = True
+        print(f"{name}:{bad.lineno}: not a packet: {bad.error}", file=self.err)
+
+    def run(self, process: Callable[[str, object, List[BadLine]], Iterator[bool]]) -> int:
+        """
+        Process every input; process yields True for each invalid packet.
+
+        Returns:
+            Exit status
+        """
+        fail_fast = self.args.fail_fast
+        name = "<input>"
+        try:
+            for name, source in self.sources():
+                bad_lines: List[BadLine] = []
+                reported = 0
+                for invalid in process(name, source, bad_lines):
+                    while reported < len(bad_lines):
+                        self.bad_line(name, bad_lines[reported])
+                        reported += 1
+                    if invalid:
+                        self.failed = True
+                    if self.failed and fail_fast:
+                        return self.finish(1)
+                for bad in bad_lines[reported:]:
+                    self.bad_line(name, bad)
+                if self.failed and fail_fast:
+                    return self.finish(1)
+        except BrokenPipeError:
+            raise
+        except OSError as e:
+            print(f"{self.prog}: error: {e}", file=self.err)
+            return self.finish(2)
+        except _INPUT_ERRORS as e:
+            # Corrupt compressed input, or a failure no line was blamed for
+            print(f"{self.prog}: error: {name}: {e}", file=self.err)
+            return self.finish(2)
+        return self.finish(1 if self.failed else 0)
+
+    def finish(self, status: int) -> int:
+        if self.args.stats:
+            print(self.stats, file=self.err)
+            for title, counts in (("Error codes", self.error_codes),
+                                  ("Warning codes", self.warning_codes)):
+                if counts:
+                    print(f"{title}:", file=self.err)
+                    for code, n in counts.most_common():
+                        print(f"  {code:<28} {n:>10,}", file=self.err)
+        return status
+
+    def corpus_options(self, bad_lines: List[BadLine]) -> dict:
+        """Keyword arguments for validate_corpus / migrate_corpus."""
+        return dict(
+            workers=self.args.jobs,
+            chunk_size=self.args.chunk_size,
+            strict=self.args.strict,
+            errors="collect",
+            bad_lines=bad_lines,
+            stats=self.stats,
+            fmt=self.args.format,
+        )
+
+
+def _codes(findings) -> Iterator[str]:
+    for finding in findings:
+        yield finding if isinstance(finding, str) else finding[0].name
+
+
+def validate_cli(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    vse-validate: validate packets, writing one JSON result per line.
+
+    Each output line has source, line (the packet's 1-based line number
+    in its input), valid, layer, errors and warnings.
+
+    Args:
+        argv: Arguments (default: sys.argv[1:])
+
+    Returns:
+        Exit status
+    """
+    parser = _parser("vse-validate", "Validate VSE packets.")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="write no per-packet results, only the exit status")
+    args = parser.parse_args(argv)
+    run = _Run(parser.prog, args, sys.stderr)
+    out = sys.stdout
+    dumps = json.dumps
+
+    def process(name: str, source, bad_lines: List[BadLine]) -> Iterator[bool]:
+        results = validate_corpus(source, numbered=True, **run.corpus_options(bad_lines))
+        for lineno, result in results:
+            run.count(result)
+            if not args.quiet:
+                out.write(dumps({
+                    "source": name, "line": lineno, "valid": result.valid, "layer": result.layer,
+                    "errors": result.errors, "warnings": result.warnings,
+                }) + "\n")
+            yield not result.valid
+
+    return _main(run, process)
+
+
+def migrate_cli(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    vse-migrate: migrate packets, writing one migrated packet per line.
+
+    Migrated packets are validated; failures are reported on stderr (the
+    packet is still written) and make the exit status 1.
+
+    Args:
+        argv: Arguments (default: sys.argv[1:])
+
+    Returns:
+        Exit status
+    """
+    parser = _parser("vse-migrate", "Migrate VSE packets between versions.")
+    parser.add_argument("--to", dest="target", choices=("1.3", "1.4"), default="1.4",
+                        help="target version (default: 1.4)")
+    parser.add_argument("--output-format", choices=("jsonl", "vse"), default="jsonl",
+                        help="output line format (default: jsonl)")
+    args = parser.parse_args(argv)
+    run = _Run(parser.prog, args, sys.stderr)
+    out = sys.stdout
+    encoding = "json" if args.output_format == "jsonl" else "vse"
+
+    def process(name: str, source, bad_lines: List[BadLine]) -> Iterator[bool]:
+        migrated = migrate_corpus(source, args.target, encoding=encoding, numbered=True,
+                                  **run.corpus_options(bad_lines))
+        for lineno, (line, result) in migrated:
+            run.count(result)
+            out.write(line + "\n")
+            if not result.valid:
+                print(f"{name}:{lineno}: invalid after migration: "
+                      + "; ".join(result.errors), file=run.err)
+            yield not result.valid
+
+    return _main(run, process)
+
+
+def _main(run: _Run, process) -> int:
+    try:
+        status = run.run(process)
+        sys.stdout.flush()
+        return status
+    except BrokenPipeError:
+        # Downstream closed early (e.g. piped into head): silence the final flush
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
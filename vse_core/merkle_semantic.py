@@ -1,7 +1,13 @@
 # vse_core/merkle_semantic.py
 
 import hashlib
-from typing import Iterable, List, Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .canonical import canonical_bytes
+from .codec import _read_varint, _write_varint
 
 
 def _sha256(data: bytes) -> bytes:
@@ -10,14 +16,19 @@ def _sha256(data: bytes) -> bytes:
 
 def _normalize_leaf(x: Any) -> bytes:
     """
-    Normalize arbitrary semantic objects into a stable byte representation.
-    This should be replaced with a canonical encoder if you have one.
+    Normalize semantic objects into a stable byte representation.
+    Bytes and str are used as-is; packets (anything with canonical_bytes())
+    and JSON-compatible values use the canonical encoding, so a packet's
+    leaf hash equals bytes.fromhex(packet.digest()).
     """
     if isinstance(x, bytes):
         return x
     if isinstance(x, str):
         return x.encode("utf-8")
-    return repr(x).encode("utf-8")
+    encode = getattr(x, "canonical_bytes", None)
+    if encode is not None:
+        return encode()
+    return canonical_bytes(x)
 
 
 def merkle_root(items: Iterable[Any]) -> str:
@@ -31,13 +42,485 @@ def merkle_root(items: Iterable[Any]) -> str:
         # Convention: root of empty set is SHA256 of empty string
         return hashlib.sha256(b"").hexdigest()
 
-    level = leaves
-    while len(level) > 1:
-        nxt: List[bytes] = []
-        for i in range(0, len(level), 2):
+    return _reduce(leaves)[0].hex()
+
+
+def _reduce(level: List[bytes], levels: int = -1) -> List[bytes]:
+    """
+    Hash a level of nodes up levels times (-1: to a single node).
+
+    An odd node at the end of a level is paired with itself. The list
+    passed in may be extended.
+    """
+    sha256 = hashlib.sha256
+    while levels and (len(level) > 1 or levels > 0):
+        if len(level) & 1:
+            level.append(level[-1])
+        pairs = iter(level)
+        level = [sha256(left + right).digest() for left, right in zip(pairs, pairs)]
+        levels -= 1
+    return level
+
+
+def _subtree_root(items: List[Any], start: int, stop: int, levels: int) -> bytes:
+    """Hash items[start:stop] and reduce them levels levels, to one node."""
+    sha256 = hashlib.sha256
+    leaves = [sha256(_normalize_leaf(x)).digest() for x in items[start:stop]]
+    return _reduce(leaves, levels)[0]
+
+
+def merkle_root_parallel(items: Iterable[Any], workers: Optional[int] = None,
+                         chunk_size: int = 1 << 14) -> str:
+    """
+    Compute merkle_root(items) with leaf hashing spread over a thread pool.
+
+    Items are split into aligned runs of chunk_size leaves; each thread
+    hashes a run's leaves and reduces them to that subtree's root, and
+    the chunk roots are then reduced to the root. hashlib releases the GIL
+    only while hashing buffers of 2 KiB or more, so threads speed up large
+    payload leaves; small leaves and the 64-byte internal nodes hash at
+    single-core speed.
+
+    Args:
+        items: Items to hash (see merkle_root)
+        workers: Threads (default: CPU count)
+        chunk_size: Leaves per task, a power of two
+
+    Returns:
+        Hex root, equal to merkle_root(items)
+
+    Raises:
+        ValueError: If chunk_size is not a power of two
+    """
+    if chunk_size < 1 or chunk_size & (chunk_size - 1):
+        raise ValueError(f"chunk_size must be a power of two, got {chunk_size}")
+    items = items if isinstance(items, list) else list(items)
+    n = len(items)
+    if not n:
+        return merkle_root([])
+    if n <= chunk_size:
+        return _subtree_root(items, 0, n, -1).hex()
+    levels = chunk_size.bit_length() - 1
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        roots = list(pool.map(
+            lambda start: _subtree_root(items, start, min(start + chunk_size, n), levels),
+            range(0, n, chunk_size)))
+    return _reduce(roots)[0].hex()
+
+
+def _leaf_hash(x: Any) -> bytes:
+    return _sha256(_normalize_leaf(x))
+
+
+class MerkleTree:
+    """
+    Merkle tree that keeps its internal nodes, for roots over growing lists.
+
+    root() equals merkle_root() over the same items: an odd node at the end
+    of a level is paired with itself, and the empty tree's root is the
+    SHA256 of the empty string. append() and update() re-hash only the
+    path from the leaf to the root, so each costs O(log n) hashes; extend()
+    re-hashes each level once from the first new leaf.
+    """
+
+    def __init__(self, items: Iterable[Any] = ()):
+        # _levels[0] holds the leaf hashes, _levels[-1] the root
+        self._levels: List[List[bytes]] = [[]]
+        self.extend(items)
+
+    def __len__(self) -> int:
+        return len(self._levels[0])
+
+    def root(self) -> str:
+        """Merkle root as a hex string (see merkle_root)."""
+        if not self._levels[0]:
+            return hashlib.sha256(b"").hexdigest()
+        return self._levels[-1][0].hex()
+
+    def leaf(self, index: int) -> bytes:
+        """Leaf hash of the item at index."""
+        return self._levels[0][index]
+
+    def node(self, level: int, index: int) -> bytes:
+        """Hash of node index at level (0: leaves); see _level_size."""
+        return self._levels[level][index]
+
+    def append(self, item: Any) -> None:
+        """Add an item at the end."""
+        self._levels[0].append(_leaf_hash(item))
+        self._rehash_tail(len(self._levels[0]) - 1)
+
+    def extend(self, items: Iterable[Any]) -> None:
+        """Add items at the end."""
+        leaves = self._levels[0]
+        start = len(leaves)
+        leaves.extend(_leaf_hash(x) for x in items)
+        if len(leaves) > start:
+            self._rehash_tail(start)
+
+    def update(self, index: int, item: Any) -> None:
+        """
+        Replace the item at index.
+
+        Raises:
+            IndexError: If index is out of range
+        """
+        levels = self._levels
+        n = len(levels[0])
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("MerkleTree index out of range")
+        self._set_leaf(index, _leaf_hash(item))
+
+    def _set_leaf(self, index: int, leaf: bytes) -> None:
+        """Replace a leaf hash and re-hash the path above it."""
+        levels = self._levels
+        levels[0][index] = leaf
+        for level, parents in zip(levels, levels[1:]):
+            i = index & ~1
             left = level[i]
             right = level[i + 1] if i + 1 < len(level) else left
-            nxt.append(_sha256(left + right))
-        level = nxt
+            index >>= 1
+            parents[index] = _sha256(left + right)
+
+    def inclusion_proof(self, index: int) -> 'InclusionProof':
+        """
+        Proof that the item at index is in the tree with the current root.
+
+        Raises:
+            IndexError: If index is out of range
+        """
+        return _inclusion_proof(self, index)
+
+    def consistency_proof(self, old_size: int) -> 'ConsistencyProof':
+        """
+        Proof that the tree of the first old_size items is a prefix of this one.
+
+        Raises:
+            ValueError: If old_size is negative or larger than the tree
+        """
+        return _consistency_proof(self, old_size)
+
+    def _truncate(self, size: int) -> None:
+        """Drop the leaves from size on (undoes appends)."""
+        levels = self._levels
+        del levels[0][size:]
+        if size:
+            self._rehash_tail(size - 1)
+        top = next(k for k, level in enumerate(levels) if len(level) <= 1)
+        del levels[top + 1:]
+
+    def _rehash_tail(self, start: int) -> None:
+        """Recompute every node above leaves start and later."""
+        levels = self._levels
+        k = 0
+        while len(levels[k]) > 1:
+            if k + 1 == len(levels):
+                levels.append([])
+            level, parents = levels[k], levels[k + 1]
+            n = len(level)
+            start >>= 1
+            del parents[start:]
+            for i in range(start * 2, n, 2):
+                left = level[i]
+                parents.append(_sha256(left + (level[i + 1] if i + 1 < n else left)))
+            k += 1
+
+
+def _level_size(size: int, level: int) -> int:
+    """Number of nodes at level of a tree of size leaves."""
+    return ((size - 1) >> level) + 1 if size else 0
+
+
+def _diff_walk(tree: Any, other_size: int,
+               fetch: Callable[[int, List[int]], List[bytes]]) -> List[Tuple[int, int]]:
+    """
+    Differing leaf ranges between tree and a tree of other_size leaves.
+
+    Walks down from the level where the smaller tree has a single node,
+    descending only into nodes that differ; fetch(level, indexes) returns
+    the other tree's hashes for a level's nodes. Leaves past the smaller
+    tree's end are one range. Costs O(k log n) nodes for k differences.
+    """
+    common = min(len(tree), other_size)
+    differ: List[int] = []
+    if common:
+        level = (common - 1).bit_length()
+        frontier = [0]
+        while frontier:
+            node = tree.node
+            differ = [j for j, h in zip(frontier, fetch(level, frontier))
+                      if node(level, j) != h]
+            if not level:
+                break
+            level -= 1
+            # Both trees have every node whose leaves start before common
+            limit = _level_size(common, level)
+            frontier = [c for j in differ for c in (2 * j, 2 * j + 1) if c < limit]
+            differ = []
+    ranges: List[Tuple[int, int]] = []
+    for j in differ:
+        if ranges and ranges[-1][1] == j:
+            ranges[-1] = (ranges[-1][0], j + 1)
+        else:
+            ranges.append((j, j + 1))
+    if len(tree) != other_size:
+        if ranges and ranges[-1][1] == common:
+            ranges[-1] = (ranges[-1][0], max(len(tree), other_size))
+        else:
+            ranges.append((common, max(len(tree), other_size)))
+    return ranges
+
+
+def diff_trees(a: Any, b: Any) -> List[Tuple[int, int]]:
+    """
+    Leaf ranges where two trees differ, in O(k log n) hashes compared.
+
+    Either tree may be a MerkleTree or anything with the same __len__ and
+    node() (such as a MerkleStore).
+
+    Returns:
+        Sorted, non-adjacent (start, stop) ranges of leaf indexes whose
+        items differ, including any leaves only the longer tree has
+    """
+    return _diff_walk(a, len(b), lambda level, indexes: [b.node(level, j) for j in indexes])
+
+
+# ----------------------------------------------------------------------
+# Proofs
+# ----------------------------------------------------------------------
+#
+# A proof lists the node hashes a verifier cannot compute itself, in the
+# order _fold asks for them. Given the tree size, both sides know which
+# nodes those are, so a proof is just its sizes and hashes:
+#
+#     kind byte (1: inclusion, 2: consistency)
+#     varint leaf index (inclusion) or old size (consistency)
+#     varint tree size
+#     32-byte hashes, back to back
+#
+# Because odd nodes are paired with themselves, the right edge of an old
+# tree is generally not a node of the grown tree. A consistency proof
+# therefore carries the old tree's peaks (its maximal complete subtrees,
+# shared by both trees) and the verifier folds them into both roots.
+
+_INCLUSION = 1
+_CONSISTENCY = 2
+_HASH_SIZE = 32
+
+
+class ProofError(ValueError):
+    """Raised when bytes are not a valid encoded proof."""
+
+
+class _ShortProof(Exception):
+    pass
+
+
+def _fold(size: int, known: Dict[int, Dict[int, bytes]],
+          fetch: Callable[[int, int], bytes]) -> bytes:
+    """
+    Root of a tree of size leaves from some of its nodes.
+
+    known maps level to {index: hash}; each missing child of a node being
+    computed is asked of fetch(level, index), left to right and bottom up.
+    Costs O(log size) hashes for the node sets proofs use.
+    """
+    level = 0
+    current = dict(known.get(0, ()))
+    while size > 1:
+        parents = dict(known.get(level + 1, ()))
+        for j in sorted(current):
+            p = j >> 1
+            if p in parents:
+                continue
+            i = p << 1
+            left = current.get(i)
+            if left is None:
+                left = fetch(level, i)
+            if i + 1 < size:
+                right = current.get(i + 1)
+                if right is None:
+                    right = fetch(level, i + 1)
+            else:
+                right = left
+            parents[p] = _sha256(left + right)
+        current = parents
+        size = (size + 1) >> 1
+        level += 1
+    return current[0]
+
+
+def _recorder(nodes: Any, out: List[bytes]) -> Callable[[int, int], bytes]:
+    """fetch for _fold that reads nodes.node() and records what it hands out."""
+    def fetch(level: int, index: int) -> bytes:
+        node = nodes.node(level, index)
+        out.append(node)
+        return node
+    return fetch
+
+
+def _inclusion_proof(nodes: Any, index: int) -> 'InclusionProof':
+    """Inclusion proof from any tree with __len__ and node() (see MerkleTree)."""
+    n = len(nodes)
+    if not 0 <= index < n:
+        raise IndexError(f"leaf index {index} out of range for tree of {n}")
+    hashes: List[bytes] = []
+    _fold(n, {0: {index: nodes.node(0, index)}}, _recorder(nodes, hashes))
+    return InclusionProof(index, n, tuple(hashes))
+
+
+def _consistency_proof(nodes: Any, old_size: int) -> 'ConsistencyProof':
+    """Consistency proof from any tree with __len__ and node() (see MerkleTree)."""
+    n = len(nodes)
+    if not 0 <= old_size <= n:
+        raise ValueError(f"old_size must be between 0 and {n}, got {old_size}")
+    if old_size in (0, n):
+        return ConsistencyProof(old_size, n, ())
+    peaks = _peaks(old_size)
+    peak_hashes = [nodes.node(k, j) for k, j in peaks]
+    # A single peak is the old root itself, which the verifier has
+    hashes = list(peak_hashes) if len(peaks) > 1 else []
+    _fold(n, _known(peaks, peak_hashes), _recorder(nodes, hashes))
+    return ConsistencyProof(old_size, n, tuple(hashes))
+
+
+def _peaks(size: int) -> List[Tuple[int, int]]:
+    """(level, index) of the complete subtrees covering size leaves, left to right."""
+    peaks = []
+    covered = 0
+    for k in reversed(range(size.bit_length())):
+        if size >> k & 1:
+            peaks.append((k, covered >> k))
+            covered += 1 << k
+    return peaks
+
+
+def _known(nodes: List[Tuple[int, int]], hashes: List[bytes]) -> Dict[int, Dict[int, bytes]]:
+    known: Dict[int, Dict[int, bytes]] = {}
+    for (level, index), node in zip(nodes, hashes):
+        known.setdefault(level, {})[index] = node
+    return known
+
+
+def _reader(hashes: Tuple[bytes, ...]) -> Tuple[Callable[[int, int], bytes], Callable[[], bool]]:
+    """fetch for _fold that reads proof hashes, and a check they were all used."""
+    it = iter(hashes)
+
+    def fetch(level: int, index: int) -> bytes:
+        node = next(it, None)
+        if node is None:
+            raise _ShortProof
+        return node
+    return fetch, lambda: next(it, None) is None
+
+
+def _encode_proof(kind: int, a: int, size: int, hashes: Tuple[bytes, ...]) -> bytes:
+    out = bytearray([kind])
+    _write_varint(out, a)
+    _write_varint(out, size)
+    for node in hashes:
+        out += node
+    return bytes(out)
+
+
+def _decode_proof(kind: int, data: bytes) -> Tuple[int, int, Tuple[bytes, ...]]:
+    mv = memoryview(data)
+    try:
+        if mv[0] != kind:
+            raise ProofError(f"not a {'consistency' if kind == _CONSISTENCY else 'inclusion'} proof")
+        a, pos = _read_varint(mv, 1)
+        size, pos = _read_varint(mv, pos)
+    except IndexError:
+        raise ProofError("truncated proof") from None
+    if (len(mv) - pos) % _HASH_SIZE:
+        raise ProofError("proof hashes are not 32 bytes each")
+    hashes = tuple(bytes(mv[i:i + _HASH_SIZE]) for i in range(pos, len(mv), _HASH_SIZE))
+    return a, size, hashes
+
+
+@dataclass(frozen=True)
+class InclusionProof:
+    """Proof that an item is leaf index of a tree of size leaves."""
+    index: int
+    size: int
+    hashes: Tuple[bytes, ...]
+
+    def verify(self, item: Any, root: str) -> bool:
+        """
+        Check the proof against an item and a hex root, in O(log size) hashes.
+
+        The item is hashed as a leaf (see merkle_root).
+        """
+        if not 0 <= self.index < self.size:
+            return False
+        fetch, used_all = _reader(self.hashes)
+        try:
+            computed = _fold(self.size, {0: {self.index: _leaf_hash(item)}}, fetch)
+        except _ShortProof:
+            return False
+        return used_all() and computed.hex() == root
+
+    def to_bytes(self) -> bytes:
+        """Compact encoding (see from_bytes)."""
+        return _encode_proof(_INCLUSION, self.index, self.size, self.hashes)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'InclusionProof':
+        """
+        Decode to_bytes() output.
+
+        Raises:
+            ProofError: If data is not an encoded inclusion proof
+        """
+        return cls(*_decode_proof(_INCLUSION, data))
+
+
+@dataclass(frozen=True)
+class ConsistencyProof:
+    """Proof that a tree of old_size leaves is a prefix of one of size leaves."""
+    old_size: int
+    size: int
+    hashes: Tuple[bytes, ...]
+
+    def verify(self, old_root: str, root: str) -> bool:
+        """
+        Check the proof against the old and new hex roots, in O(log size) hashes.
+        """
+        m, n = self.old_size, self.size
+        if not 0 <= m <= n:
+            return False
+        if m == 0:
+            return not self.hashes and old_root == merkle_root([])
+        if m == n:
+            return not self.hashes and old_root == root
+        peaks = _peaks(m)
+        fetch, used_all = _reader(self.hashes)
+        try:
+            if len(peaks) == 1:
+                peak_hashes = [bytes.fromhex(old_root)]
+            else:
+                peak_hashes = [fetch(k, j) for k, j in peaks]
+            known = _known(peaks, peak_hashes)
+            # The peaks alone determine the old root
+            if _fold(m, known, fetch).hex() != old_root:
+                return False
+            computed = _fold(n, known, fetch)
+        except (_ShortProof, ValueError):
+            return False
+        return used_all() and computed.hex() == root
+
+    def to_bytes(self) -> bytes:
+        """Compact encoding (see from_bytes)."""
+        return _encode_proof(_CONSISTENCY, self.old_size, self.size, self.hashes)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'ConsistencyProof':
+        """
+        Decode to_bytes() output.
 
-    return level[0].hex()
+        Raises:
+            ProofError: If data is not an encoded consistency proof
+        """
+        return cls(*_decode_proof(_CONSISTENCY, data))
@@ -0,0 +1,303 @@
+"""
+VSE Core: Merkle Store
+File-backed Merkle tree for histories too large to keep in memory.
+
+A store at PATH is a header file and one file per tree level:
+
+    PATH        header   b"VSEM" + format byte + 3 zero bytes, then the
+                         committed leaf count (uint64, little-endian)
+    PATH.0      leaves   32-byte leaf hashes, in append order
+    PATH.<k>    level k  32-byte hashes of the complete nodes of level k
+                         (those over 2**k leaves), left to right
+
+Complete nodes never change once written, so every level file is
+append-only and is read through a read-only memory map. The only nodes
+that change as leaves are appended lie on the right edge of the tree;
+they are derived from the tree's peaks (its maximal complete subtrees,
+at most one per level) and kept in memory. Memory use is O(log n) and
+node reads go through the page cache, whatever the size of the tree.
+
+flush() writes buffered nodes, then the leaf count: the header is the
+commit point. Opening a store for writing truncates each level file to
+the length the committed count implies, discarding anything appended
+but not flushed before a crash, and reads back the peaks; nothing is
+rebuilt. Readers see the store as of the last flush before they opened
+it, while a writer keeps appending.
+
+Roots, proofs and diffs equal those of a MerkleTree over the same items.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import hashlib
+import mmap
+import os
+import struct
+
+from .merkle_semantic import (
+    ConsistencyProof, InclusionProof, _consistency_proof, _inclusion_proof, _leaf_hash,
+    _level_size, _peaks, _sha256,
+)
+
+
+MAGIC = b"VSEM"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sB3xQ")
+_NODE_SIZE = 32
+
+
+class MerkleStoreError(ValueError):
+    """Raised for missing or malformed Merkle store files."""
+
+
+class MerkleStore:
+    """
+    Merkle tree kept in memory-mapped level files.
+
+    Usage:
+        with MerkleStore("ledger.vsem") as store:
+            for entry in entries:
+                store.append(entry)
+            root = store.root()
+            proof = store.inclusion_proof(12_345_678)
+
+        with MerkleStore("ledger.vsem", readonly=True) as store:
+            proof = store.consistency_proof(old_size)
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"], readonly: bool = False,
+                 flush_every: int = 65536, durable: bool = False):
+        """
+        Open a store (created if missing, unless readonly).
+
+        Args:
+            path: Header file path; level files are named PATH.<level>
+            readonly: Open for reading only
+            flush_every: Appends between automatic flushes
+            durable: fsync level files before committing each flush, and
+                the header after, so flushed appends survive power loss
+                as well as process crashes
+
+        Raises:
+            MerkleStoreError: If the store is missing (readonly) or its
+                files are malformed
+        """
+        self.path = os.fspath(path)
+        self.readonly = readonly
+        self.flush_every = flush_every
+        self.durable = durable
+        self._files: List = []
+        self._maps: List[Optional[mmap.mmap]] = []
+        self._header_fd: Optional[int] = None
+        self._closed = False
+        if not readonly and not os.path.exists(self.path):
+            with open(self.path, "xb") as f:
+                f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(_HEADER.size)
+        except OSError as e:
+            raise MerkleStoreError(f"Cannot open Merkle store {self.path}: {e}") from e
+        if len(header) != _HEADER.size or header[:5] != MAGIC + bytes([FORMAT_VERSION]):
+            raise MerkleStoreError(f"{self.path} is not a VSE Merkle store")
+        self._size = self._committed = _HEADER.unpack(header)[2]
+        if not readonly:
+            self._repair()
+            self._header_fd = os.open(self.path, os.O_WRONLY)
+        # Peaks as a stack of (level, hash), highest level first
+        self._peaks: List[Tuple[int, bytes]] = [
+            (k, self._read(k, j)) for k, j in _peaks(self._size)
+        ]
+        self._edge: Optional[Dict[int, bytes]] = None
+        self._pending = 0
+
+    def _level_path(self, level: int) -> str:
+        return f"{self.path}.{level}"
+
+    def _repair(self) -> None:
+        """Cut level files back to the committed size (drops unflushed appends)."""
+        n = self._committed
+        level = 0
+        while True:
+            path = self._level_path(level)
+            expected = (n >> level) * _NODE_SIZE
+            if not os.path.exists(path):
+                if expected:
+                    raise MerkleStoreError(f"{path} is missing")
+                break
+            size = os.path.getsize(path)
+            if size < expected:
+                raise MerkleStoreError(f"{path} has {size} bytes, expected {expected}")
+            if size > expected:
+                os.truncate(path, expected)
+            level += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _read(self, level: int, index: int) -> bytes:
+        """A complete node, from the level's map (remapped as the file grows)."""
+        offset = index * _NODE_SIZE
+        maps = self._maps
+        if level >= len(maps):
+            maps.extend([None] * (level + 1 - len(maps)))
+        m = maps[level]
+        if m is None or offset + _NODE_SIZE > len(m):
+            if level < len(self._files):
+                self._files[level].flush()
+            try:
+                with open(self._level_path(level), "rb") as f:
+                    new = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as e:
+                raise MerkleStoreError(f"Cannot map {self._level_path(level)}: {e}") from e
+            if m is not None:
+                m.close()
+            maps[level] = m = new
+            if offset + _NODE_SIZE > len(m):
+                raise MerkleStoreError(f"{self._level_path(level)} is truncated")
+        return m[offset:offset + _NODE_SIZE]
+
+    def _edge_nodes(self) -> Dict[int, bytes]:
+        """
+        Right-edge nodes that cover a partial run of leaves, by level.
+
+        Folds the peaks from the bottom up: the edge node one level above
+        pairs that level's peak with the edge node below it, or pairs
+        whichever of the two exists with itself.
+        """
+        if self._edge is None:
+            peaks = dict(self._peaks)
+            edge: Dict[int, bytes] = {}
+            carry = None
+            for k in range((self._size - 1).bit_length()):
+                peak = peaks.get(k)
+                if carry is not None:
+                    carry = _sha256((peak or carry) + carry)
+                elif peak is not None:
+                    carry = _sha256(peak + peak)
+                if carry is not None:
+                    edge[k + 1] = carry
+            self._edge = edge
+        return self._edge
+
+    def node(self, level: int, index: int) -> bytes:
+        """
+        Hash of node index at level (0: leaves), as in MerkleTree.node.
+
+        Raises:
+            IndexError: If there is no such node
+        """
+        n = self._size
+        if index < 0 or index >= _level_size(n, level) or (n and level > (n - 1).bit_length()):
+            raise IndexError(f"no node {index} at level {level} of a tree of {n}")
+        if (index + 1) << level <= n:
+            return self._read(level, index)
+        return self._edge_nodes()[level]
+
+    def leaf(self, index: int) -> bytes:
+        """Leaf hash of the item at index."""
+        return self.node(0, index)
+
+    def root(self) -> str:
+        """Merkle root as a hex string (see merkle_root)."""
+        n = self._size
+        if not n:
+            return hashlib.sha256(b"").hexdigest()
+        top = (n - 1).bit_length()
+        edge = self._edge_nodes()
+        # A power-of-two tree is a single complete peak
+        return (edge[top] if top in edge else self._peaks[0][1]).hex()
+
+    def append(self, item: Any) -> int:
+        """
+        Add an item at the end.
+
+        Returns:
+            The item's leaf index
+        """
+        if self.readonly or self._closed:
+            raise ValueError("append to closed or read-only MerkleStore")
+        node = _leaf_hash(item)
+        self._write(0, node)
+        peaks = self._peaks
+        level = 0
+        # Like binary addition: equal-level peaks combine into a complete node
+        while peaks and peaks[-1][0] == level:
+            node = _sha256(peaks.pop()[1] + node)
+            level += 1
+            self._write(level, node)
+        peaks.append((level, node))
+        self._edge = None
+        self._size += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+        return self._size - 1
+
+    def extend(self, items: Iterable[Any]) -> int:
+        """Append many items; returns how many were written."""
+        before = self._size
+        for item in items:
+            self.append(item)
+        return self._size - before
+
+    def _write(self, level: int, node: bytes) -> None:
+        files = self._files
+        while level >= len(files):
+            files.append(open(self._level_path(len(files)), "ab", buffering=1 << 16))
+        files[level].write(node)
+
+    def flush(self) -> None:
+        """Write buffered nodes, then commit the leaf count."""
+        if self.readonly or self._closed or self._size == self._committed:
+            return
+        for f in self._files:
+            f.flush()
+            if self.durable:
+                os.fsync(f.fileno())
+        os.pwrite(self._header_fd, _HEADER.pack(MAGIC, FORMAT_VERSION, self._size), 0)
+        if self.durable:
+            os.fsync(self._header_fd)
+        self._committed = self._size
+        self._pending = 0
+
+    def inclusion_proof(self, index: int) -> InclusionProof:
+        """
+        Proof that the item at index is in the tree (see MerkleTree).
+
+        Raises:
+            IndexError: If index is out of range
+        """
+        return _inclusion_proof(self, index)
+
+    def consistency_proof(self, old_size: int) -> ConsistencyProof:
+        """
+        Proof that the first old_size items' tree is a prefix of this one.
+
+        Raises:
+            ValueError: If old_size is negative or larger than the tree
+        """
+        return _consistency_proof(self, old_size)
+
+    def close(self) -> None:
+        """Flush, close the files and unmap the levels."""
+        if self._closed:
+            return
+        self.flush()
+        for f in self._files:
+            f.close()
+        for m in self._maps:
+            if m is not None:
+                m.close()
+        if self._header_fd is not None:
+            os.close(self._header_fd)
+        self._files, self._maps = [], []
+        self._closed = True
+
+    def __enter__(self) -> 'MerkleStore':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"MerkleStore({self.path!r}, {len(self):,} leaves)"
@@ -0,0 +1,273 @@
+"""
+VSE Core: Merkle Sync
+Anti-entropy between replicas of a Merkle-hashed history.
+
+A SyncClient brings its MerkleTree up to date with a SyncServer's by
+walking both trees top-down, one level per round trip, and fetching only
+the leaves under nodes that differ (see diff_trees). Traffic is
+O(k log n) hashes for k differing leaves, plus the differing leaves.
+
+Messages are bytes, exchanged as request/response pairs over any
+transport (exchange(request) -> response); all integers are LEB128
+varints (see codec):
+
+    hello    request  0
+             response 0, tree size, 32-byte root
+    nodes    request  1, level, count, node indexes (delta-encoded)
+             response 1, the nodes' 32-byte hashes
+    leaves   request  2, count, (start, length) per range (starts
+                      delta-encoded from the previous range's end)
+             response 2, length + bytes of each leaf payload, in order
+
+Leaf payloads are the items' normalized bytes (see merkle_root), so a
+client storing them gets the server's leaf hashes.
+"""
+
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from .codec import _read_varint, _write_varint
+from .merkle_semantic import MerkleTree, _diff_walk, _level_size, _normalize_leaf
+
+
+HELLO = 0
+NODES = 1
+LEAVES = 2
+_HASH_SIZE = 32
+
+Exchange = Callable[[bytes], bytes]
+
+
+class SyncError(ValueError):
+    """Raised for malformed or unexpected sync messages."""
+
+
+def _read(mv: memoryview, pos: int) -> Tuple[int, int]:
+    try:
+        return _read_varint(mv, pos)
+    except IndexError:
+        raise SyncError("truncated sync message") from None
+
+
+class SyncServer:
+    """Answers sync requests for a tree and the items it was built from."""
+
+    def __init__(self, tree: MerkleTree, items: Optional[Sequence[Any]] = None):
+        """
+        Initialize server.
+
+        Args:
+            tree: Tree to serve
+            items: The tree's items, for leaf requests (None: hashes only)
+        """
+        self.tree = tree
+        self.items = items
+
+    def handle(self, message: bytes) -> bytes:
+        """
+        Answer one request.
+
+        Raises:
+            SyncError: If the request is malformed or out of range
+        """
+        mv = memoryview(message)
+        if not mv:
+            raise SyncError("empty sync message")
+        kind = mv[0]
+        tree = self.tree
+        out = bytearray([kind])
+        if kind == HELLO:
+            _write_varint(out, len(tree))
+            out += bytes.fromhex(tree.root())
+        elif kind == NODES:
+            level, pos = _read(mv, 1)
+            count, pos = _read(mv, pos)
+            height = (len(tree) - 1).bit_length() if len(tree) else -1
+            size = _level_size(len(tree), level) if level <= height else 0
+            index = 0
+            for _ in range(count):
+                delta, pos = _read(mv, pos)
+                index += delta
+                if index >= size:
+                    raise SyncError(f"no node {index} at level {level}")
+                out += tree.node(level, index)
+        elif kind == LEAVES:
+            if self.items is None:
+                raise SyncError("this server does not serve leaves")
+            count, pos = _read(mv, 1)
+            stop = 0
+            for _ in range(count):
+                delta, pos = _read(mv, pos)
+                length, pos = _read(mv, pos)
+                start, stop = stop + delta, stop + delta + length
+                if stop > len(self.items):
+                    raise SyncError(f"no leaves {start}-{stop}")
+                for item in self.items[start:stop]:
+                    data = _normalize_leaf(item)
+                    _write_varint(out, len(data))
+                    out += data
+        else:
+            raise SyncError(f"unknown sync message type {kind}")
+        return bytes(out)
+
+
+class SyncClient:
+    """
+    Finds and fetches a remote tree's differences.
+
+    Usage:
+        client = SyncClient(tree, exchange)
+        ranges = client.sync(apply=save_leaf)   # tree now has the server's root;
+                                                # save_leaf(index, payload) got the leaves
+        print(client.bytes_sent, client.bytes_received)
+    """
+
+    def __init__(self, tree: MerkleTree, exchange: Exchange):
+        """
+        Initialize client.
+
+        Args:
+            tree: Local tree
+            exchange: Sends a request to the server and returns its response
+        """
+        self.tree = tree
+        self._exchange = exchange
+        self.remote_size: Optional[int] = None
+        self.remote_root: Optional[str] = None
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def _request(self, message: bytes, kind: int) -> memoryview:
+        response = self._exchange(message)
+        self.round_trips += 1
+        self.bytes_sent += len(message)
+        self.bytes_received += len(response)
+        if not response or response[0] != kind:
+            raise SyncError(f"expected a type {kind} response")
+        return memoryview(response)
+
+    def hello(self) -> Tuple[int, str]:
+        """
+        Fetch the remote tree's size and hex root.
+        """
+        mv = self._request(bytes([HELLO]), HELLO)
+        size, pos = _read(mv, 1)
+        if len(mv) - pos != _HASH_SIZE:
+            raise SyncError("malformed hello response")
+        self.remote_size, self.remote_root = size, mv[pos:].hex()
+        return self.remote_size, self.remote_root
+
+    def _nodes(self, level: int, indexes: List[int]) -> List[bytes]:
+        out = bytearray([NODES])
+        _write_varint(out, level)
+        _write_varint(out, len(indexes))
+        previous = 0
+        for index in indexes:
+            _write_varint(out, index - previous)
+            previous = index
+        mv = self._request(bytes(out), NODES)
+        if len(mv) != 1 + _HASH_SIZE * len(indexes):
+            raise SyncError("malformed nodes response")
+        return [bytes(mv[i:i + _HASH_SIZE]) for i in range(1, len(mv), _HASH_SIZE)]
+
+    def diff(self) -> List[Tuple[int, int]]:
+        """
+        Leaf ranges where the local and remote trees differ (see diff_trees).
+        """
+        self.hello()
+        return self._diff()
+
+    def _diff(self) -> List[Tuple[int, int]]:
+        if self.remote_size == len(self.tree) and self.remote_root == self.tree.root():
+            return []
+        return _diff_walk(self.tree, self.remote_size, self._nodes)
+
+    def leaves(self, ranges: List[Tuple[int, int]]) -> List[bytes]:
+        """
+        Fetch the remote leaf payloads in sorted (start, stop) ranges.
+        """
+        out = bytearray([LEAVES])
+        _write_varint(out, len(ranges))
+        previous = 0
+        for start, stop in ranges:
+            _write_varint(out, start - previous)
+            _write_varint(out, stop - start)
+            previous = stop
+        mv = self._request(bytes(out), LEAVES)
+        payloads = []
+        pos = 1
+        for _ in range(sum(stop - start for start, stop in ranges)):
+            length, pos = _read(mv, pos)
+            if pos + length > len(mv):
+                raise SyncError("truncated leaves response")
+            payloads.append(bytes(mv[pos:pos + length]))
+            pos += length
+        return payloads
+
+    def sync(self, apply: Optional[Callable[[int, bytes], None]] = None
+             ) -> List[Tuple[int, int]]:
+        """
+        Update the local tree to the remote one.
+
+        The tree only holds hashes; a replica keeping the items themselves
+        passes apply, which gets each fetched leaf once the new root has
+        been checked. If the check fails, the tree is put back as it was.
+
+        Args:
+            apply: Called as apply(index, payload) for each fetched leaf,
+                in index order (indexes past the old end are appends)
+
+        Returns:
+            The leaf ranges that were fetched
+
+        Raises:
+            ValueError: If the local tree is longer than the remote one
+                (trees only grow)
+            SyncError: If the server misbehaves (the local tree is left
+                unchanged)
+        """
+        self.hello()
+        if self.remote_size < len(self.tree):
+            raise ValueError(f"local tree has {len(self.tree)} leaves, "
+                             f"remote only {self.remote_size}")
+        ranges = self._diff()
+        if not ranges:
+            return ranges
+        payloads = self.leaves(ranges)
+        indexes = [index for start, stop in ranges for index in range(start, stop)]
+        tree = self.tree
+        size = len(tree)
+        # The leaves replaced, so a bad update can be undone in O(k log n)
+        saved = [(index, tree.leaf(index)) for index in indexes if index < size]
+        for index, payload in zip(indexes, payloads):
+            if index < size:
+                tree.update(index, payload)
+            else:
+                tree.append(payload)
+        if tree.root() != self.remote_root:
+            tree._truncate(size)
+            for index, leaf in saved:
+                tree._set_leaf(index, leaf)
+            raise SyncError("root mismatch after sync")
+        if apply is not None:
+            for index, payload in zip(indexes, payloads):
+                apply(index, payload)
+        return ranges
+
+
+def connection_exchange(conn) -> Exchange:
+    """exchange for a multiprocessing Connection to a process running serve()."""
+    def exchange(message: bytes) -> bytes:
+        conn.send_bytes(message)
+        return conn.recv_bytes()
+    return exchange
+
+
+def serve(conn, server: SyncServer) -> None:
+    """Answer requests on a multiprocessing Connection until it is closed."""
+    while True:
+        try:
+            message = conn.recv_bytes()
+        except EOFError:
+            return
+        conn.send_bytes(server.handle(message))
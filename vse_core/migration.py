@@ -3,17 +3,98 @@ VSE Migration Tools
 Convert packets between v1.3 and v1.4 formats.
 """
 
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import gc
+import os
+import zlib
+
 from .packet import Packet
 
 
-def v13_to_v14(packet: Packet, layer: str = "kinetic") -> Packet:
+# Foundation anchors, in the order they are reported, and the keywords in
+# an intent or its constraints that suggest each one
+FOUNDATION_KEYWORDS: Dict[str, tuple] = {
+    # Milieu: environmental, contextual, spatial
+    "Milieu": ('context', 'environment', 'setting', 'background', 'atmosphere'),
+    # Gravitas: tone, weight, authority
+    "Gravitas": ('formal', 'authoritative', 'serious', 'professional', 'academic'),
+    # Fulcrum: core argument, pivot point
+    "Fulcrum": ('argument', 'thesis', 'main', 'core', 'central', 'key'),
+    # Ambience: mood, feeling, sensory
+    "Ambience": ('mood', 'feeling', 'sensory', 'emotional', 'atmospheric'),
+}
+
+
+def _keyword_table(keywords: Dict[str, tuple]):
+    """
+    (keyword, anchor bitmask) pairs, and the anchor list for each bitmask.
+    
+    Bit i stands for the i-th anchor; a keyword listed under several
+    anchors sets all of their bits.
+    """
+    bits: Dict[str, int] = {}
+    for i, words in enumerate(keywords.values()):
+        for word in words:
+            bits[word] = bits.get(word, 0) | 1 << i
+    anchors = list(keywords)
+    lists = tuple(
+        tuple(anchor for i, anchor in enumerate(anchors) if mask >> i & 1)
+        for mask in range(1 << len(anchors))
+    )
+    return tuple(bits.items()), lists
+
+
+_KEYWORD_BITS, _ANCHOR_LISTS = _keyword_table(FOUNDATION_KEYWORDS)
+
+
+# Computes the gsn network_id given to a packet on its way to the
+# gregarious layer
+NetworkIdStrategy = Callable[[Packet], str]
+
+
+def digest_network_id(packet: Packet) -> str:
+    """
+    Default network id: "auto-NNNN" from a CRC-32 of the packet's intent.
+    
+    Unlike hash(), CRC-32 does not depend on PYTHONHASHSEED, so a packet
+    gets the same id in every process and run.
+    """
+    return f"auto-{zlib.crc32(packet.intent.encode('utf-8')) % 10000}"
+
+
+_network_id_strategy: NetworkIdStrategy = digest_network_id
+
+
+def get_network_id_strategy() -> NetworkIdStrategy:
+    """The strategy migration uses to assign network ids by default."""
+    return _network_id_strategy
+
+
+def set_network_id_strategy(strategy: NetworkIdStrategy) -> None:
+    """
+    Replace the strategy migration uses to assign network ids by default.
+    
+    The strategy must be deterministic for migrated output to be cacheable.
+    Worker processes do not see this setting; migrate_batch passes its
+    strategy to them explicitly, so it must be picklable (a module-level
+    function).
+    """
+    global _network_id_strategy
+    _network_id_strategy = strategy
+
+
+def v13_to_v14(packet: Packet, layer: str = "kinetic",
+               network_id: Optional[NetworkIdStrategy] = None) -> Packet:
     """
     Upgrade v1.3 packet to v1.4.
     
     Args:
         packet: v1.3 packet
         layer: Target layer - "kinetic" or "gregarious"
+        network_id: Strategy for the gsn network_id (default: see
+            set_network_id_strategy)
         
     Returns:
         v1.4 packet with inferred kinetic/gregarious fields
@@ -21,14 +102,14 @@ def v13_to_v14(packet: Packet, layer: str = "kinetic") -> Packet:
     if packet.version != "1.3" and packet.get_version_layer() != "v1.3":
         return packet  # Already v1.4
     
-    # Create base v1.4 packet
-    v14_packet = Packet(
-        intent=packet.intent,
-        constraints=packet.constraints.copy(),
-        divergence=packet.divergence,
-        immune=packet.immune.copy(),
-        version="1.4"
-    )
+    # Base v1.4 fields (they come from a validated packet)
+    record = {
+        "intent": packet.intent,
+        "constraints": packet.constraints.copy(),
+        "divergence": packet.divergence,
+        "immune": packet.immune.copy(),
+        "version": "1.4",
+    }
     
     if layer == "kinetic":
         # Infer KBM from divergence
@@ -43,17 +124,17 @@ def v13_to_v14(packet: Packet, layer: str = "kinetic") -> Packet:
             coherence_min = 0.60
             coherence_max = 0.85
         
-        v14_packet.kbm = {
+        record["kbm"] = {
             "coherence_vector": [coherence_min, coherence_max]
         }
         
         # Infer Foundation from intent keywords
         foundation = infer_foundation(packet.intent, packet.constraints)
         if foundation:
-            v14_packet.foundation = foundation
+            record["foundation"] = foundation
         
         # Add μ-Loop with default settings
-        v14_packet.mu_loop = {
+        record["mu_loop"] = {
             "window_size": 10,
             "threshold": packet.divergence
         }
@@ -64,11 +145,13 @@ def v13_to_v14(packet: Packet, layer: str = "kinetic") -> Packet:
         
         # Add gregarious fields with conservative defaults
         v14_packet.gsn = {
-            "network_id": f"auto-{hash(packet.intent) % 10000}",
+            "network_id": (network_id or _network_id_strategy)(packet),
             "curiosity_factor": min(0.5, packet.divergence)
         }
+        return v14_packet
     
-    return v14_packet
+    # Build the packet in one step rather than field by field
+    return Packet._trusted(record)
 
 
 def infer_foundation(intent: str, constraints: List[str]) -> Optional[List[str]]:
@@ -80,48 +163,29 @@ def infer_foundation(intent: str, constraints: List[str]) -> Optional[List[str]]
         constraints: List of constraints
         
     Returns:
-        List of inferred foundation anchors
+        List of inferred foundation anchors (see FOUNDATION_KEYWORDS)
     """
-    intent_lower = intent.lower()
-    constraints_text = ' '.join(constraints).lower()
-    all_text = intent_lower + ' ' + constraints_text
-    
-    foundation = []
-    
-    # Milieu: environmental, contextual, spatial
-    if any(keyword in all_text for keyword in [
-        'context', 'environment', 'setting', 'background', 'atmosphere'
-    ]):
-        foundation.append("Milieu")
-    
-    # Gravitas: tone, weight, authority
-    if any(keyword in all_text for keyword in [
-        'formal', 'authoritative', 'serious', 'professional', 'academic'
-    ]):
-        foundation.append("Gravitas")
+    all_text = intent.lower() + ' ' + ' '.join(constraints).lower()
     
-    # Fulcrum: core argument, pivot point
-    if any(keyword in all_text for keyword in [
-        'argument', 'thesis', 'main', 'core', 'central', 'key'
-    ]):
-        foundation.append("Fulcrum")
+    # One pass over the precompiled keyword table, collecting anchor bits
+    found = 0
+    for keyword, bits in _KEYWORD_BITS:
+        if keyword in all_text:
+            found |= bits
     
-    # Ambience: mood, feeling, sensory
-    if any(keyword in all_text for keyword in [
-        'mood', 'feeling', 'sensory', 'emotional', 'atmospheric'
-    ]):
-        foundation.append("Ambience")
-    
-    return foundation if foundation else None
+    return list(_ANCHOR_LISTS[found]) if found else None
 
 
-def migrate_packet(packet: Packet, target_version: str = "1.4") -> Packet:
+def migrate_packet(packet: Packet, target_version: str = "1.4",
+                   network_id: Optional[NetworkIdStrategy] = None) -> Packet:
     """
     General migration function.
     
     Args:
         packet: Source packet
         target_version: Target VSE version
+        network_id: Strategy for the gsn network_id (default: see
+            set_network_id_strategy)
         
     Returns:
         Migrated packet
@@ -134,24 +198,100 @@ def migrate_packet(packet: Packet, target_version: str = "1.4") -> Packet:
         elif current_layer == "v1.4-kinetic":
             # Add gregarious layer
             packet.gsn = {
-                "network_id": f"auto-{hash(packet.intent) % 10000}",
+                "network_id": (network_id or _network_id_strategy)(packet),
                 "curiosity_factor": min(0.5, packet.divergence)
             }
             return packet
     
     elif target_version == "1.3":
         # Downgrade: strip v1.4 fields
-        return Packet(
-            intent=packet.intent,
-            constraints=packet.constraints.copy(),
-            divergence=packet.divergence,
-            immune=packet.immune.copy(),
-            version="1.3"
-        )
+        return Packet._trusted({
+            "intent": packet.intent,
+            "constraints": packet.constraints.copy(),
+            "divergence": packet.divergence,
+            "immune": packet.immune.copy(),
+            "version": "1.3",
+        })
     
     return packet
 
 
+def _migrate_chunk(packets: List[Packet], target_version: str,
+                   network_id: NetworkIdStrategy) -> List[Packet]:
+    """Migrate a list of packets."""
+    # Migrated packets hold no reference cycles (see Packet.bulk_load)
+    paused = gc.isenabled()
+    gc.disable()
+    try:
+        return [migrate_packet(packet, target_version, network_id) for packet in packets]
+    finally:
+        if paused:
+            gc.enable()
+
+
+def _migrate_rows(rows: List[tuple], target_version: str,
+                  network_id: NetworkIdStrategy) -> List[tuple]:
+    """Migrate packets sent as field rows (runs in a worker process)."""
+    packets = _migrate_chunk(list(map(Packet._from_row, rows)), target_version, network_id)
+    return [packet._row() for packet in packets]
+
+
+def migrate_batch(packets: Iterable[Packet], target_version: str = "1.4",
+                  workers: Optional[int] = None, chunk_size: int = 10000,
+                  network_id: Optional[NetworkIdStrategy] = None) -> List[Packet]:
+    """
+    Migrate many packets, on a process pool.
+    
+    Results equal migrate_packet's for each packet, but unlike
+    migrate_packet this never modifies the input: every result is a new
+    Packet (already v1.4 Kinetic packets are upgraded on copies, shallow
+    ones when migrated in this process). Packets travel to and from workers as tuples of field values, which
+    pickle several times faster than Packet objects; even so, moving a
+    packet costs about half as much as migrating it, so the pool only
+    pays off with several idle cores. For validation alongside migration,
+    or for corpora that do not fit in memory, use migrate_corpus.
+    
+    Args:
+        packets: Packets to migrate
+        target_version: Version to migrate to (see migrate_packet)
+        workers: Worker processes (default: CPU count; 0 migrates in
+            this process)
+        chunk_size: Packets sent to a worker at a time
+        network_id: Strategy for gsn network_ids, sent to the workers
+            (default: the one set with set_network_id_strategy)
+        
+    Returns:
+        Migrated packets, in input order
+        
+    Raises:
+        ValueError: If chunk_size is less than 1
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    packets = list(packets)
+    network_id = network_id or _network_id_strategy
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 0 or len(packets) <= chunk_size:
+        copies = [Packet._from_row(packet._row()) for packet in packets]
+        return _migrate_chunk(copies, target_version, network_id)
+    chunks = [[packet._row() for packet in packets[i:i + chunk_size]]
+              for i in range(0, len(packets), chunk_size)]
+    migrated: List[Packet] = []
+    from_row = Packet._from_row
+    paused = gc.isenabled()
+    gc.disable()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for rows in pool.map(_migrate_rows, chunks, repeat(target_version),
+                                 repeat(network_id)):
+                migrated.extend(map(from_row, rows))
+    finally:
+        if paused:
+            gc.enable()
+    return migrated
+
+
 def analyze_migration(packet: Packet) -> Dict[str, any]:
     """
     Analyze what would happen during migration.
@@ -8,11 +8,78 @@ This module implements the core VSE packet structure supporting:
 - v1.4 Gregarious: GSN, EVF, URP
 """
 
-from typing import List, Dict, Optional, Union, Any
-from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Union, Any, Iterable, Iterator
+from dataclasses import MISSING, dataclass, field, fields
+from itertools import chain
+import gc
+import hashlib
 import json
+import operator
+import os
 import re
 
+from .scanner import PacketScanner
+from . import canonical, codec
+from . import vocab as _vocab
+
+
+# Characters that force a constraint to be quoted in VSE syntax
+_UNSAFE_BARE = re.compile(r'[,\[\]|"\']|^\s|\s$|^$')
+# Intents that would not read back verbatim unquoted
+_UNSAFE_TEXT = re.compile(r'\||^["\s]|\s$')
+
+_scanner = PacketScanner()
+
+# Ends each container's run of items in a contents snapshot
+_END = (object(),)
+
+
+def _sources(values: Iterable[Any], found: Optional[List[Any]] = None) -> List[Any]:
+    """
+    Live iterables over every container inside values, at any depth.
+    
+    Each list, tuple or dict contributes itself (a dict also its values
+    view) and _END. Chained together they give the current items of every
+    container; two such snapshots match item by item by identity exactly
+    when no container was edited in between.
+    """
+    if found is None:
+        found = []
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            found.append(value)
+            found.append(_END)
+            _sources(value, found)
+        elif isinstance(value, dict):
+            found.append(value)
+            found.append(value.values())
+            found.append(_END)
+            _sources(value.values(), found)
+    return found
+
+
+# List fields whose items are interned through the shared vocabulary
+_VOCAB_FIELDS = ("constraints", "immune", "foundation")
+
+
+def _intern_vocab(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Share recurring list tokens via the default vocabulary (updates data)."""
+    vocab = _vocab.default_vocabulary
+    if vocab is not None:
+        intern_list = vocab.intern_list
+        for name in _VOCAB_FIELDS:
+            items = data.get(name)
+            if items and type(items) is list:
+                data[name] = intern_list(items)
+    return data
+
+
+# Validators re-run when a lazily scanned field is first decoded
+_LAZY_VALIDATORS = {
+    "kbm": lambda packet: packet._validate_kbm(),
+    "gsn": lambda packet: packet._validate_gsn(),
+}
+
 
 @dataclass
 class Packet:
@@ -61,12 +128,85 @@ class Packet:
     # Internal tracking
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    # Debug switch: validate records passed to bulk_load as the constructor
+    # would (also enabled by the VSE_VERIFY_TRUSTED environment variable)
+    verify_trusted = os.environ.get("VSE_VERIFY_TRUSTED", "") not in ("", "0")
+    
     def __post_init__(self):
         """Validate packet on initialization."""
         self._validate_divergence()
         self._validate_kbm()
         self._validate_gsn()
     
+    def __getattr__(self, name: str) -> Any:
+        """Decode, validate and cache a field left raw by a lazy parse."""
+        lazy = self.__dict__.get("_lazy")
+        if lazy is None or name not in lazy:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        value = _scanner.decode_value(lazy[name])
+        self.__dict__[name] = value
+        validate = _LAZY_VALIDATORS.get(name)
+        if validate is not None:
+            try:
+                validate(self)
+            except ValueError:
+                del self.__dict__[name]
+                raise
+        return value
+    
+    def _defer(self, raw: Dict[str, str]) -> None:
+        """Hold raw source slices in place of decoded field values."""
+        fields = self.__dict__
+        for name in raw:
+            fields.pop(name, None)
+        fields["_lazy"] = raw
+    
+    def _is_set(self, name: str) -> bool:
+        """Truthiness of a field, without decoding non-empty raw containers."""
+        if name not in self.__dict__:
+            raw = self.__dict__["_lazy"][name]
+            if raw[0] in "[{" and raw[1:-1].strip():
+                return True
+        return bool(getattr(self, name))
+    
+    def _serial_cache(self) -> Dict[Any, Any]:
+        """
+        Serialization cache, emptied if any field changed since it was filled.
+        
+        Filling the cache snapshots the field values and the items of every
+        container under them (see _sources). Reassignment shows up as a
+        field that is no longer the same object, in-place edits at any
+        depth as a container whose items are not the same objects as before.
+        Field objects are left exactly as the caller supplied them.
+        """
+        items = list(_field_values(self))
+        fields_ = self.__dict__
+        cache = fields_.get("_cache")
+        if cache is None:
+            cache = fields_["_cache"] = {}
+        else:
+            snapshot = cache.get(_SNAPSHOT)
+            if snapshot is not None:
+                sources, before = snapshot
+                items.extend(chain.from_iterable(sources))
+                if len(items) == len(before) and all(map(operator.is_, items, before)):
+                    return cache
+                del items[len(_FIELD_NAMES):]
+            cache.clear()
+        sources = _sources(items)
+        items.extend(chain.from_iterable(sources))
+        cache[_SNAPSHOT] = (sources, items)
+        return cache
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle fields only, without the serialization cache."""
+        state = dict(self.__dict__)
+        state.pop("_cache", None)
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+    
     def _validate_divergence(self):
         """Ensure divergence is in valid range."""
         if not 0.0 <= self.divergence <= 1.0:
@@ -92,23 +232,39 @@ class Packet:
         """
         Convert packet to VSE syntax string.
         
+        The result is cached until a field is reassigned or edited in place.
+        
         Args:
             compact: If True, minimize whitespace
             
         Returns:
             VSE-formatted string
         """
+        cache = self._serial_cache()
+        key = ("vse", compact)
+        result = cache.get(key)
+        if result is None:
+            result = cache[key] = self._render_vse(compact)
+        return result
+    
+    def _render_vse(self, compact: bool) -> str:
         parts = [f"VSE v{self.version}"]
-        parts.append(f"intent: {self.intent}")
+        if _UNSAFE_TEXT.search(self.intent):
+            parts.append(f"intent: {json.dumps(self.intent, ensure_ascii=False)}")
+        else:
+            parts.append(f"intent: {self.intent}")
         
         if self.constraints:
-            constraints_str = ", ".join(self.constraints)
+            constraints_str = ", ".join([
+                json.dumps(c, ensure_ascii=False) if _UNSAFE_BARE.search(c) else c
+                for c in self.constraints
+            ])
             parts.append(f"constraints: [{constraints_str}]")
         
         parts.append(f"divergence: {self.divergence:.2f}")
         
         if self.immune:
-            immune_str = ", ".join([f'"{s}"' for s in self.immune])
+            immune_str = ", ".join([json.dumps(s, ensure_ascii=False) for s in self.immune])
             parts.append(f"immune: [{immune_str}]")
         
         # v1.4 Kinetic fields
@@ -116,10 +272,10 @@ class Packet:
             parts.append(f"kbm: {json.dumps(self.kbm)}")
         
         if self.c_tvm:
-            parts.append(f"c_tvm: {self.c_tvm}")
+            parts.append(f"c_tvm: {json.dumps(self.c_tvm)}")
         
         if self.foundation:
-            parts.append(f"foundation: {self.foundation}")
+            parts.append(f"foundation: {json.dumps(self.foundation)}")
         
         if self.mu_loop:
             parts.append(f"mu_loop: {json.dumps(self.mu_loop)}")
@@ -129,7 +285,7 @@ class Packet:
             parts.append(f"gsn: {json.dumps(self.gsn)}")
         
         if self.evf:
-            parts.append(f"evf: {self.evf}")
+            parts.append(f"evf: {json.dumps(self.evf)}")
         
         if self.urp_enabled:
             parts.append("urp: enabled")
@@ -138,7 +294,19 @@ class Packet:
         return f"<{separator.join(parts)}>"
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert packet to dictionary representation."""
+        """
+        Convert packet to dictionary representation.
+        
+        Returns a new dict each call; its values are the packet's own field
+        objects, as before. Built once and cached until a field changes.
+        """
+        cache = self._serial_cache()
+        result = cache.get("dict")
+        if result is None:
+            result = cache["dict"] = self._render_dict()
+        return dict(result)
+    
+    def _render_dict(self) -> Dict[str, Any]:
         result = {
             "version": self.version,
             "intent": self.intent,
@@ -175,13 +343,122 @@ class Packet:
         return result
     
     def to_json(self, indent: int = 2) -> str:
-        """Convert packet to JSON string."""
-        return json.dumps(self.to_dict(), indent=indent)
+        """Convert packet to JSON string (cached until a field changes)."""
+        cache = self._serial_cache()
+        key = ("json", indent)
+        result = cache.get(key)
+        if result is None:
+            result = cache[key] = json.dumps(self.to_dict(), indent=indent)
+        return result
+    
+    def canonical_bytes(self, include_metadata: bool = False) -> bytes:
+        """
+        Canonical encoding of the packet (see canonical), cached like to_dict.
+        
+        Fields are taken from to_dict, so unset and empty optional fields
+        encode the same way. Metadata is excluded by default, since it is
+        bookkeeping rather than packet content.
+        
+        Args:
+            include_metadata: Include the metadata field
+            
+        Returns:
+            UTF-8 canonical JSON bytes
+        """
+        cache = self._serial_cache()
+        key = ("canonical", include_metadata)
+        result = cache.get(key)
+        if result is None:
+            data = self.to_dict()
+            if not include_metadata:
+                data.pop("metadata", None)
+            result = cache[key] = canonical.canonical_bytes(data)
+        return result
+    
+    def digest(self, include_metadata: bool = False) -> str:
+        """
+        Stable content digest: SHA-256 hex of canonical_bytes().
+        
+        Equal across processes and Python versions for equal content, and
+        equal to the leaf hash merkle_root uses for this packet.
+        """
+        cache = self._serial_cache()
+        key = ("digest", include_metadata)
+        result = cache.get(key)
+        if result is None:
+            result = cache[key] = hashlib.sha256(self.canonical_bytes(include_metadata)).hexdigest()
+        return result
+    
+    def to_bytes(self) -> bytes:
+        """Encode packet in the compact binary wire format (see codec)."""
+        return codec.encode_packet(self)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Packet':
         """Create packet from dictionary."""
-        return cls(**data)
+        return cls(**_intern_vocab(dict(data)))
+    
+    @classmethod
+    def bulk_load(cls, records: Iterable[Dict[str, Any]]) -> List['Packet']:
+        """
+        Build packets from trusted, already-validated field dictionaries.
+        
+        Skips __post_init__ validation, so use it only for data that passed
+        validation before (e.g. records from our own store or to_dict()).
+        The cyclic garbage collector is paused while the list is built,
+        since the new packets hold no reference cycles. Set
+        Packet.verify_trusted (or VSE_VERIFY_TRUSTED=1) to route every
+        record through the validating constructor instead.
+        
+        Args:
+            records: Iterable of dictionaries shaped like from_dict input
+            
+        Returns:
+            List of packets, in input order
+            
+        Raises:
+            TypeError: If a record has a missing intent or an unknown key
+        """
+        paused = gc.isenabled()
+        gc.disable()
+        try:
+            return list(map(cls._trusted, records))
+        finally:
+            if paused:
+                gc.enable()
+    
+    @classmethod
+    def _trusted(cls, record: Dict[str, Any]) -> 'Packet':
+        """Build one packet from a trusted record without validation."""
+        if cls.verify_trusted:
+            return cls(**record)
+        fields_ = _TRUSTED_DEFAULTS.copy()
+        fields_.update(record)
+        _intern_vocab(fields_)
+        if len(fields_) != len(_TRUSTED_DEFAULTS) or fields_["intent"] is None:
+            unknown = sorted(set(record) - set(_TRUSTED_DEFAULTS))
+            raise TypeError(f"Bad trusted packet record: unknown keys {unknown} "
+                            f"or missing intent")
+        if fields_["constraints"] is None:
+            fields_["constraints"] = []
+        if fields_["immune"] is None:
+            fields_["immune"] = []
+        if fields_["metadata"] is None:
+            fields_["metadata"] = {}
+        packet = object.__new__(cls)
+        packet.__dict__ = fields_
+        return packet
+    
+    def _row(self) -> tuple:
+        """Field values in field order (cheap to pickle)."""
+        return _field_values(self)
+    
+    @classmethod
+    def _from_row(cls, row: tuple) -> 'Packet':
+        """Rebuild a packet from _row() output without validation."""
+        packet = object.__new__(cls)
+        packet.__dict__ = dict(zip(_FIELD_NAMES, row))
+        return packet
     
     @classmethod
     def from_json(cls, json_str: str) -> 'Packet':
@@ -190,58 +467,46 @@ class Packet:
         return cls.from_dict(data)
     
     @classmethod
-    def from_vse(cls, vse_str: str) -> 'Packet':
+    def from_buffer(cls, buf: Union[bytes, bytearray, memoryview], offset: int = 0) -> 'Packet':
         """
-        Parse VSE syntax string into Packet object.
+        Decode a packet from the binary wire format.
         
         Args:
-            vse_str: VSE-formatted string (e.g., "<VSE v1.4 | intent: ... >")
+            buf: Buffer holding the encoded packet; read in place, not copied
+            offset: Start of the packet within buf
             
         Returns:
             Packet object
+            
+        Raises:
+            CodecError: If the buffer is truncated or malformed
         """
-        # Remove angle brackets
-        content = vse_str.strip().strip('<>')
-        
-        # Split by pipe separator
-        parts = [p.strip() for p in content.split('|')]
-        
-        # Parse version
-        version_match = re.match(r'VSE\s+v([\d.]+)', parts[0])
-        version = version_match.group(1) if version_match else "1.4"
-        
-        # Parse remaining fields
-        packet_data = {"version": version}
+        return cls(**_intern_vocab(codec.decode_fields(buf, offset)))
+    
+    @classmethod
+    def from_vse(cls, vse_str: str, lazy: bool = False) -> 'Packet':
+        """
+        Parse VSE syntax string into Packet object.
         
-        for part in parts[1:]:
-            if ':' not in part:
-                continue
+        Args:
+            vse_str: VSE-formatted string (e.g., "<VSE v1.4 | intent: ... >")
+            lazy: Keep kbm, c_tvm, mu_loop, gsn and evf as raw text until
+                first access; they are then decoded, validated and cached,
+                and a malformed value raises at that point instead
             
-            key, value = part.split(':', 1)
-            key = key.strip()
-            value = value.strip()
+        Returns:
+            Packet object
             
-            # Parse different field types
-            if key == "intent":
-                packet_data["intent"] = value
-            elif key == "divergence":
-                packet_data["divergence"] = float(value)
-            elif key == "constraints":
-                # Parse list: [item1, item2]
-                packet_data["constraints"] = cls._parse_list(value)
-            elif key == "immune":
-                # Parse quoted list: ["str1", "str2"]
-                packet_data["immune"] = cls._parse_quoted_list(value)
-            elif key in ["kbm", "gsn", "mu_loop"]:
-                # Parse JSON dict
-                packet_data[key] = json.loads(value)
-            elif key in ["c_tvm", "evf", "foundation"]:
-                # Parse list/array
-                packet_data[key] = json.loads(value)
-            elif key == "urp":
-                packet_data["urp_enabled"] = (value.lower() == "enabled")
-        
-        return cls(**packet_data)
+        Raises:
+            PacketSyntaxError: If a structured value is malformed
+        """
+        if not lazy:
+            return cls(**_intern_vocab(_scanner.scan(vse_str)))
+        raw: Dict[str, str] = {}
+        packet = cls(**_intern_vocab(_scanner.scan(vse_str, raw)))
+        if raw:
+            packet._defer(raw)
+        return packet
     
     @staticmethod
     def _parse_list(s: str) -> List[str]:
@@ -264,6 +529,13 @@ class Packet:
         Returns:
             "v1.3", "v1.4-kinetic", or "v1.4-gregarious"
         """
+        if "_lazy" in self.__dict__:
+            is_set = self._is_set
+            if is_set("gsn") or is_set("evf") or self.urp_enabled:
+                return "v1.4-gregarious"
+            elif is_set("kbm") or is_set("c_tvm") or self.foundation or is_set("mu_loop"):
+                return "v1.4-kinetic"
+            return "v1.3"
         if self.gsn or self.evf or self.urp_enabled:
             return "v1.4-gregarious"
         elif self.kbm or self.c_tvm or self.foundation or self.mu_loop:
@@ -276,7 +548,48 @@ class Packet:
         return self.to_vse(compact=True)
 
 
+_FIELD_NAMES = tuple(f.name for f in fields(Packet))
+_field_values = operator.attrgetter(*_FIELD_NAMES)
+_SNAPSHOT = "fields"
+
+# Field defaults used by Packet._trusted. Every field gets a slot; intent
+# and the list/dict fields hold None until filled, so mutable defaults are
+# created per packet and never shared.
+_TRUSTED_DEFAULTS = {f.name: None if f.default is MISSING else f.default
+                     for f in fields(Packet)}
+
+# Lazily parsed fields must resolve through Packet.__getattr__, so they
+# cannot also be class attributes (the dataclass keeps their defaults)
+for _name in ("kbm", "c_tvm", "mu_loop", "gsn", "evf"):
+    delattr(Packet, _name)
+del _name
+
+
 # Convenience function
 def parse_packet(vse_str: str) -> Packet:
     """Parse VSE string into Packet object."""
     return Packet.from_vse(vse_str)
+
+
+def parse_packets(vse_strs: Iterable[str], lazy: bool = False) -> Iterator[Packet]:
+    """
+    Parse many VSE strings with one shared scanner.
+    
+    Blank entries are skipped, so an open file can be passed directly.
+    
+    Args:
+        vse_strs: Iterable of VSE-formatted strings
+        lazy: Defer decoding of nested fields (see Packet.from_vse)
+        
+    Yields:
+        Packet objects, in input order
+    """
+    if lazy:
+        for vse_str in vse_strs:
+            if vse_str.strip():
+                yield Packet.from_vse(vse_str, lazy=True)
+        return
+    scan = _scanner.scan
+    for vse_str in vse_strs:
+        if vse_str.strip():
+            yield Packet(**_intern_vocab(scan(vse_str)))
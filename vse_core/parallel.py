@@ -0,0 +1,338 @@
+"""
+VSE Core: Parallel Validation
+Corpus validation and migration fanned out over a process pool.
+
+validate_corpus reads packets as JSON or VSE lines, sends them to worker
+processes in chunks and yields one ValidationResult per packet, in input
+order. migrate_corpus does the same for migration, validating each
+migrated packet on the way. At most max_pending chunks are in flight at
+once, so memory stays bounded however large the corpus is: reading
+pauses until the oldest chunk has been consumed.
+
+Workers decode records without the constructor's checks, so malformed
+values are reported by the validator instead of failing the line; values
+of a type the validator cannot compare (e.g. a string divergence) make
+the line a bad line.
+"""
+
+from typing import (
+    IO, Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union,
+)
+from collections import deque
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import gc
+import json
+import os
+import time
+
+from .packet import Packet
+from .migration import NetworkIdStrategy, get_network_id_strategy, migrate_packet
+from .stream import ERROR_POLICIES, BadLine, PathOrFile, _TextSource, line_decoder
+from .validator import ValidationResult, Validator
+
+
+# One chunk of work: (line number, packet text) pairs
+_Chunk = List[Tuple[int, str]]
+
+Source = Union[PathOrFile, Iterable[Union[Packet, str]]]
+
+# Encodings migrate_corpus can return migrated packets in
+ENCODINGS = ("json", "vse")
+
+
+@dataclass
+class CorpusStats:
+    """
+    Counters filled in by validate_corpus and migrate_corpus.
+
+    Counters and times accumulate when one object is passed to several
+    calls (e.g. one per input file).
+    """
+
+    packets: int = 0
+    invalid: int = 0
+    bad_lines: int = 0
+    elapsed: float = 0.0
+    worker_busy: Dict[int, float] = field(default_factory=dict)  # pid -> CPU seconds
+
+    @property
+    def throughput(self) -> float:
+        """Packets handled per second of wall time."""
+        return self.packets / self.elapsed if self.elapsed else 0.0
+
+    def utilization(self) -> Dict[int, float]:
+        """CPU time each worker spent, as a fraction of wall time."""
+        if not self.elapsed:
+            return {pid: 0.0 for pid in self.worker_busy}
+        return {pid: busy / self.elapsed for pid, busy in self.worker_busy.items()}
+
+    def __str__(self) -> str:
+        """Human-readable summary."""
+        lines = [
+            f"Processed {self.packets:,} packets in {self.elapsed:.2f}s "
+            f"({self.throughput:,.0f} packets/s), {self.invalid:,} invalid, "
+            f"{self.bad_lines:,} bad lines"
+        ]
+        for n, (pid, share) in enumerate(sorted(self.utilization().items()), 1):
+            lines.append(f"  worker {n} (pid {pid}): {share:6.1%} busy")
+        return "\n".join(lines)
+
+
+def _run_chunk(chunk: _Chunk, fmt: str, handle: Callable[[Packet], Any]
+               ) -> Tuple[int, float, List[Any]]:
+    """
+    Decode and handle one chunk (runs in a worker process).
+
+    Returns:
+        (worker pid, CPU seconds spent, one output or BadLine per line)
+    """
+    start = time.process_time()
+    decode = line_decoder(fmt, trusted=True)
+    outputs: List[Any] = []
+    # Decoded packets hold no reference cycles (see Packet.bulk_load)
+    paused = gc.isenabled()
+    gc.disable()
+    try:
+        for lineno, line in chunk:
+            try:
+                outputs.append(handle(decode(line)))
+            except (ValueError, TypeError, AttributeError) as e:
+                outputs.append(BadLine(lineno, line.rstrip("\n"), str(e)))
+    finally:
+        if paused:
+            gc.enable()
+    return os.getpid(), time.process_time() - start, outputs
+
+
+def _validate_chunk(chunk: _Chunk, fmt: str, strict: bool):
+    return _run_chunk(chunk, fmt, lambda packet: Validator(packet, strict=strict).validate())
+
+
+def _encode(packet: Packet, encoding: Optional[str]) -> Union[Packet, str]:
+    if encoding == "json":
+        return json.dumps(packet.to_dict(), separators=(",", ":"), ensure_ascii=False)
+    if encoding == "vse":
+        return packet.to_vse()
+    return packet
+
+
+def _migrate_chunk(chunk: _Chunk, fmt: str, target_version: str, strict: bool,
+                   encoding: Optional[str], network_id: NetworkIdStrategy):
+    def handle(packet: Packet) -> Tuple[Union[Packet, str], ValidationResult]:
+        migrated = migrate_packet(packet, target_version, network_id)
+        return _encode(migrated, encoding), Validator(migrated, strict=strict).validate()
+    return _run_chunk(chunk, fmt, handle)
+
+
+def _numbered_lines(source: Source) -> Iterator[Tuple[int, str]]:
+    """(line number, packet text) for each non-blank record of a source."""
+    if isinstance(source, (str, os.PathLike)) or hasattr(source, "read"):
+        text = _TextSource(source)
+        try:
+            for lineno, line in enumerate(text.stream, 1):
+                if line.strip():
+                    yield lineno, line
+        finally:
+            text.close()
+        return
+    for lineno, item in enumerate(source, 1):
+        if isinstance(item, Packet):
+            yield lineno, item.to_json(indent=None)
+        elif item.strip():
+            yield lineno, item
+
+
+def _chunks(lines: Iterator[Tuple[int, str]], size: int) -> Iterator[_Chunk]:
+    chunk: _Chunk = []
+    for item in lines:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _ordered(pool: ProcessPoolExecutor, work: Callable, chunks: Iterator[_Chunk],
+             args: tuple, max_pending: int):
+    """Chunk results in submission order, with at most max_pending in flight."""
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(work, chunk, *args))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _fan_out(work: Callable, args: tuple, source: Source, workers: Optional[int],
+             chunk_size: int, max_pending: Optional[int], errors: str,
+             bad_lines: Optional[List[BadLine]], stats: Optional[CorpusStats],
+             report: Optional[IO[str]], numbered: bool) -> Iterator[Any]:
+    """Check arguments, then run work over chunks of source (see _stream)."""
+    if errors not in ERROR_POLICIES:
+        raise ValueError(f"errors must be one of {ERROR_POLICIES}, got {errors!r}")
+    if errors == "collect" and bad_lines is None:
+        raise ValueError('errors="collect" requires a bad_lines list')
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * max(workers, 1)
+    if stats is None:
+        stats = CorpusStats()
+    return _stream(work, args, source, workers, chunk_size, max_pending, errors,
+                   bad_lines, stats, report, numbered)
+
+
+def _stream(work: Callable, args: tuple, source: Source, workers: int, chunk_size: int,
+            max_pending: int, errors: str, bad_lines: Optional[List[BadLine]],
+            stats: CorpusStats, report: Optional[IO[str]], numbered: bool) -> Iterator[Any]:
+    start = time.perf_counter()
+    chunks = _chunks(_numbered_lines(source), chunk_size)
+    linenos: Optional[Deque[List[int]]] = None
+    if numbered:
+        # Chunk results come back in submission order
+        linenos = deque()
+        chunks = _recording_linenos(chunks, linenos)
+    try:
+        if workers == 0:
+            done = (work(chunk, *args) for chunk in chunks)
+            yield from _collect(done, errors, bad_lines, stats, linenos)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                yield from _collect(_ordered(pool, work, chunks, args, max_pending),
+                                    errors, bad_lines, stats, linenos)
+    finally:
+        stats.elapsed += time.perf_counter() - start
+    if report is not None:
+        print(stats, file=report)
+
+
+def _recording_linenos(chunks: Iterator[_Chunk], linenos: Deque[List[int]]
+                       ) -> Iterator[_Chunk]:
+    for chunk in chunks:
+        linenos.append([lineno for lineno, _ in chunk])
+        yield chunk
+
+
+def _collect(done, errors: str, bad_lines: Optional[List[BadLine]],
+             stats: CorpusStats, linenos: Optional[Deque[List[int]]] = None
+             ) -> Iterator[Any]:
+    """
+    Apply the error policy to chunk outputs and update stats.
+
+    With linenos (the line numbers of each chunk, in order), outputs are
+    yielded as (line number, output) pairs.
+    """
+    busy = stats.worker_busy
+    for pid, seconds, outputs in done:
+        busy[pid] = busy.get(pid, 0.0) + seconds
+        numbers = repeat(None) if linenos is None else linenos.popleft()
+        for lineno, output in zip(numbers, outputs):
+            if isinstance(output, BadLine):
+                stats.bad_lines += 1
+                if errors == "raise":
+                    raise ValueError(f"line {output.lineno}: {output.error}")
+                if errors == "collect":
+                    bad_lines.append(output)
+                continue
+            stats.packets += 1
+            result = output if isinstance(output, ValidationResult) else output[1]
+            if not result.valid:
+                stats.invalid += 1
+            yield output if linenos is None else (lineno, output)
+
+
+def validate_corpus(source: Source, workers: Optional[int] = None, chunk_size: int = 1000,
+                    strict: bool = False, max_pending: Optional[int] = None,
+                    errors: str = "raise", bad_lines: Optional[List[BadLine]] = None,
+                    stats: Optional[CorpusStats] = None,
+                    report: Optional[IO[str]] = None,
+                    fmt: str = "auto", numbered: bool = False) -> Iterator[ValidationResult]:
+    """
+    Validate a corpus on a process pool, yielding results in input order.
+
+    Args:
+        source: Path or file object of JSON or VSE lines (compressed
+            files are detected), or an iterable of packets or packet strings
+        workers: Worker processes (default: CPU count; 0 validates in
+            this process)
+        chunk_size: Packets sent to a worker at a time
+        strict: If True, warnings become errors
+        max_pending: Chunks in flight at once (default: 2 per worker)
+        errors: Policy for lines that are not packets, as in iter_packets:
+            "raise", "skip", or "collect" into bad_lines
+        bad_lines: List that receives BadLine records when errors="collect"
+        stats: CorpusStats to fill in (counts, timing, worker utilization)
+        report: Stream the stats summary is written to when done
+        fmt: Line format, "jsonl", "vse", or "auto" (decided per line)
+        numbered: Yield (line number, result) pairs; line numbers count
+            from 1 and include blank and bad lines (for an iterable
+            source, they are item positions)
+
+    Yields:
+        One ValidationResult per packet; with "skip" or "collect", bad
+        lines yield nothing
+
+    Raises:
+        ValueError: On bad arguments, or on a bad line with errors="raise"
+    """
+    line_decoder(fmt)  # rejects unknown formats now rather than in the workers
+    return _fan_out(_validate_chunk, (fmt, strict), source, workers, chunk_size,
+                    max_pending, errors, bad_lines, stats, report, numbered)
+
+
+def migrate_corpus(source: Source, target_version: str = "1.4",
+                   workers: Optional[int] = None, chunk_size: int = 1000,
+                   strict: bool = False, encoding: Optional[str] = None,
+                   max_pending: Optional[int] = None, errors: str = "raise",
+                   bad_lines: Optional[List[BadLine]] = None,
+                   stats: Optional[CorpusStats] = None,
+                   report: Optional[IO[str]] = None,
+                   fmt: str = "auto",
+                   network_id: Optional[NetworkIdStrategy] = None,
+                   numbered: bool = False
+                   ) -> Iterator[Tuple[Union[Packet, str], ValidationResult]]:
+    """
+    Migrate a corpus on a process pool, yielding results in input order.
+
+    Each migrated packet is validated in the worker; stats.invalid counts
+    migrated packets that fail validation.
+
+    Args:
+        source: As for validate_corpus
+        target_version: Version to migrate to (see migrate_packet)
+        workers: Worker processes (default: CPU count; 0 migrates in
+            this process)
+        chunk_size: Packets sent to a worker at a time
+        strict: Validate migrated packets in strict mode
+        encoding: Return migrated packets as Packet objects (None), or
+            serialized in the worker as compact "json" or "vse" lines
+        max_pending, errors, bad_lines, stats, report, fmt: As for
+            validate_corpus
+        network_id: Strategy for gsn network_ids, sent to the workers
+            (default: see set_network_id_strategy)
+        numbered: Yield (line number, (migrated packet, result)) pairs,
+            as for validate_corpus
+
+    Yields:
+        (migrated packet, ValidationResult) per input packet
+
+    Raises:
+        ValueError: On bad arguments, or on a bad line with errors="raise"
+    """
+    line_decoder(fmt)
+    if encoding is not None and encoding not in ENCODINGS:
+        raise ValueError(f"encoding must be None or one of {ENCODINGS}, got {encoding!r}")
+    network_id = network_id or get_network_id_strategy()
+    return _fan_out(_migrate_chunk, (fmt, target_version, strict, encoding, network_id),
+                    source, workers, chunk_size, max_pending, errors, bad_lines, stats, report,
+                    numbered)
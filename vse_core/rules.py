@@ -0,0 +1,370 @@
+"""
+VSE Core: Validation Rules
+Rule registry with layer gates, enable/disable profiles and timing.
+
+A rule is a check function that reads validator.packet and appends
+messages to validator.errors and validator.warnings, or (code, params)
+findings to validator.error_findings and validator.warning_findings like
+the built-in Validator._validate_* methods. Each rule declares:
+
+    layer   "v1.3" rules run on every packet, "kinetic" rules on packets
+            with KBM, C-TVM or Foundation fields, "gregarious" rules on
+            packets with GSN or EVF fields
+    fields  packet fields the check reads (Validator.revalidate re-runs a
+            rule when one of them, or a field of its layer gate, changes)
+    codes   ValidationCodes the check reports
+
+A RuleRegistry keeps rules in the order they run. Rules can be disabled
+one at a time or through named profiles, and new rules can be registered
+before or after the built-in ones (see validator.default_rules). Setting
+registry.profiler to a RuleProfiler records call counts and time per rule
+for every validator using the registry.
+"""
+
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, fields
+import time
+
+from .packet import Packet
+
+
+# Layers a rule can apply to, and the fields that switch each one on
+LAYERS = ("v1.3", "kinetic", "gregarious")
+CORE, KINETIC, GREGARIOUS = range(len(LAYERS))  # layer indexes in compiled steps
+LAYER_GATES: Dict[str, FrozenSet[str]] = {
+    "v1.3": frozenset(),
+    "kinetic": frozenset({"kbm", "c_tvm", "foundation"}),
+    "gregarious": frozenset({"gsn", "evf"}),
+}
+
+_PACKET_FIELDS = frozenset(f.name for f in fields(Packet))
+
+# Fields Packet.get_version_layer() reads
+_VERSION_LAYER_FIELDS = frozenset({
+    "kbm", "c_tvm", "foundation", "mu_loop", "gsn", "evf", "urp_enabled",
+})
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One validation rule.
+
+    Usage:
+        def no_tabs(validator):
+            if "\\t" in validator.packet.intent:
+                validator.warnings.append("Intent contains a tab")
+
+        default_rules.register(Rule("no_tabs", no_tabs, fields={"intent"}))
+    """
+
+    name: str
+    check: Callable[[Any], None]  # called with the Validator
+    layer: str = "v1.3"
+    fields: FrozenSet[str] = frozenset()
+    codes: Tuple[int, ...] = ()  # ValidationCodes
+
+    def __post_init__(self):
+        if self.layer not in LAYERS:
+            raise ValueError(f"layer must be one of {LAYERS}, got {self.layer!r}")
+        unknown = set(self.fields) - _PACKET_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown packet field(s): {', '.join(sorted(unknown))}")
+        object.__setattr__(self, "fields", frozenset(self.fields))
+        object.__setattr__(self, "codes", tuple(self.codes))
+
+    @property
+    def dependencies(self) -> FrozenSet[str]:
+        """Fields whose change can change this rule's findings."""
+        return self.fields | LAYER_GATES[self.layer]
+
+
+class RuleProfiler:
+    """
+    Call counts and cumulative time per rule.
+
+    Usage:
+        default_rules.profiler = profiler = RuleProfiler()
+        ...  # validate as usual
+        print(profiler.report())
+        default_rules.profiler = None
+
+    Timing adds two clock reads per rule call. Counters are not locked;
+    use one profiler per thread when validating from several threads.
+    """
+
+    def __init__(self):
+        self.calls: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add one call of a rule."""
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-rule statistics, costliest first.
+
+        Returns:
+            Dictionary of rule name to calls, seconds, mean_us (per call)
+            and share (of the time spent in all rules)
+        """
+        total = sum(self.seconds.values())
+        return {
+            name: {
+                "calls": self.calls[name],
+                "seconds": seconds,
+                "mean_us": seconds / self.calls[name] * 1e6,
+                "share": seconds / total if total else 0.0,
+            }
+            for name, seconds in sorted(self.seconds.items(), key=lambda item: -item[1])
+        }
+
+    def report(self) -> str:
+        """Human-readable table of stats()."""
+        lines = [f"{'rule':<16} {'calls':>10} {'total ms':>10} {'mean us':>9} {'share':>7}"]
+        for name, s in self.stats().items():
+            lines.append(f"{name:<16} {s['calls']:>10,} {s['seconds'] * 1e3:>10.1f} "
+                         f"{s['mean_us']:>9.2f} {s['share']:>7.1%}")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """Forget everything recorded."""
+        self.calls.clear()
+        self.seconds.clear()
+
+
+# A profile: (rules enabled, or None for all; rules disabled; layers enabled)
+_Profile = Tuple[Optional[FrozenSet[str]], FrozenSet[str], FrozenSet[str]]
+
+
+class RuleRegistry:
+    """
+    Ordered set of validation rules, each enabled or disabled.
+
+    Usage:
+        rules = default_rules.copy()
+        rules.disable("conflicts")
+        rules.define_profile("ingest", disabled=["foundation", "gsn"])
+        rules.use_profile("ingest")
+        result = Validator(packet, rules=rules).validate()
+
+    Built-in profiles: "all" enables every rule, "core" only the v1.3
+    rules. validate_batch always applies the built-in rules, and results
+    held by a ValidationCache do not notice rule changes (clear it after
+    changing the default rules).
+    """
+
+    def __init__(self, rules: Iterable[Rule] = ()):
+        """
+        Initialize registry.
+
+        Args:
+            rules: Rules to register, in the order they run (all enabled)
+        """
+        self._rules: List[Rule] = []
+        self._disabled: set = set()
+        self.profiles: Dict[str, _Profile] = {}
+        self.profile = "all"
+        self.profiler: Optional[RuleProfiler] = None
+        for rule in rules:
+            self._rules.append(rule)
+        self.define_profile("all")
+        self.define_profile("core", layers=["v1.3"])
+        self._changed()
+
+    def _changed(self) -> None:
+        """Recompile what validators read after any change."""
+        names = [rule.name for rule in self._rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Rule names must be unique")
+        enabled = [rule for rule in self._rules if rule.name not in self._disabled]
+        # (layer index, check, name) per enabled rule, in order
+        self._steps = tuple((LAYERS.index(rule.layer), rule.check, rule.name)
+                            for rule in enabled)
+        self._enabled = tuple(enabled)
+        # Runs of consecutive enabled rules with the same layer:
+        # (layer index, checks), so each layer gate is tested once per run
+        groups: List[Tuple[int, list]] = []
+        for layer, check, _ in self._steps:
+            if groups and groups[-1][0] == layer:
+                groups[-1][1].append(check)
+            else:
+                groups.append((layer, [check]))
+        self._groups = tuple((layer, tuple(checks)) for layer, checks in groups)
+        # Position of the rule reporting each code, for ordering findings
+        self._order = {code: i for i, rule in enumerate(enabled) for code in rule.codes}
+        self._plans: Dict[tuple, Tuple[tuple, FrozenSet[int], bool]] = {}
+
+    def register(self, rule: Rule, before: Optional[str] = None,
+                 after: Optional[str] = None) -> Rule:
+        """
+        Add a rule (enabled), at the end or next to another rule.
+
+        Raises:
+            ValueError: If a rule with that name exists, or before/after
+                name no rule
+        """
+        if rule.name in self:
+            raise ValueError(f"Rule {rule.name!r} is already registered")
+        if before is not None and after is not None:
+            raise ValueError("Give before or after, not both")
+        if before is not None:
+            position = self._position(before)
+        elif after is not None:
+            position = self._position(after) + 1
+        else:
+            position = len(self._rules)
+        self._rules.insert(position, rule)
+        self._changed()
+        return rule
+
+    def unregister(self, name: str) -> Rule:
+        """Remove a rule and return it."""
+        rule = self._rules.pop(self._position(name))
+        self._disabled.discard(name)
+        self._changed()
+        return rule
+
+    def _position(self, name: str) -> int:
+        for i, rule in enumerate(self._rules):
+            if rule.name == name:
+                return i
+        raise ValueError(f"No rule named {name!r}")
+
+    def __getitem__(self, name: str) -> Rule:
+        return self._rules[self._position(name)]
+
+    def __contains__(self, name: str) -> bool:
+        return any(rule.name == name for rule in self._rules)
+
+    def __iter__(self) -> Iterator[Rule]:
+        """Every rule, enabled or not, in the order rules run."""
+        return iter(list(self._rules))
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def enabled(self) -> List[Rule]:
+        """Enabled rules, in the order they run."""
+        return list(self._enabled)
+
+    def is_enabled(self, name: str) -> bool:
+        self._position(name)
+        return name not in self._disabled
+
+    def enable(self, *names: str) -> None:
+        """Enable rules by name."""
+        for name in names:
+            self._position(name)
+        self._disabled.difference_update(names)
+        self._changed()
+
+    def disable(self, *names: str) -> None:
+        """Disable rules by name."""
+        for name in names:
+            self._position(name)
+        self._disabled.update(names)
+        self._changed()
+
+    def define_profile(self, name: str, enabled: Optional[Iterable[str]] = None,
+                       disabled: Iterable[str] = (),
+                       layers: Optional[Iterable[str]] = None) -> None:
+        """
+        Define (or redefine) a named profile.
+
+        Args:
+            name: Profile name
+            enabled: Only these rules are enabled (default: every rule,
+                including rules registered later)
+            disabled: Rules disabled on top of that
+            layers: Only rules of these layers are enabled (default: all)
+
+        Raises:
+            ValueError: For unknown layers
+        """
+        layers = LAYERS if layers is None else tuple(layers)
+        for layer in layers:
+            if layer not in LAYERS:
+                raise ValueError(f"layer must be one of {LAYERS}, got {layer!r}")
+        self.profiles[name] = (None if enabled is None else frozenset(enabled),
+                               frozenset(disabled), frozenset(layers))
+
+    def use_profile(self, name: str) -> None:
+        """
+        Enable and disable rules as a profile says.
+
+        Raises:
+            ValueError: If no profile has that name
+        """
+        if name not in self.profiles:
+            raise ValueError(f"No profile named {name!r}")
+        enabled, disabled, layers = self.profiles[name]
+        self._disabled = {
+            rule.name for rule in self._rules
+            if rule.name in disabled or rule.layer not in layers
+            or (enabled is not None and rule.name not in enabled)
+        }
+        self.profile = name
+        self._changed()
+
+    def copy(self) -> 'RuleRegistry':
+        """Independent registry with the same rules, profiles and state."""
+        other = RuleRegistry(self._rules)
+        other._disabled = set(self._disabled)
+        other.profiles = dict(self.profiles)
+        other.profile = self.profile
+        other._changed()
+        return other
+
+    def rule_fields(self) -> Dict[str, FrozenSet[str]]:
+        """Dependencies of each enabled rule (see Rule.dependencies)."""
+        return {rule.name: rule.dependencies for rule in self._enabled}
+
+    def _revalidation_plan(self, changed_fields: tuple) -> Tuple[tuple, FrozenSet[int], bool]:
+        """
+        Steps to re-run for a change, the codes those rules report, and
+        whether the packet's layer may have changed.
+
+        Raises:
+            ValueError: If a changed field is not a packet field
+        """
+        plan = self._plans.get(changed_fields)
+        if plan is None:
+            changed = {name.split(".", 1)[0] for name in changed_fields}
+            unknown = changed - _PACKET_FIELDS
+            if unknown:
+                raise ValueError(f"Unknown packet field(s): {', '.join(sorted(unknown))}")
+            rerun = [(step, rule) for step, rule in zip(self._steps, self._enabled)
+                     if not rule.dependencies.isdisjoint(changed)]
+            plan = (tuple(step for step, _ in rerun),
+                    frozenset(code for _, rule in rerun for code in rule.codes),
+                    not _VERSION_LAYER_FIELDS.isdisjoint(changed))
+            # Controllers repeat the same few changes; bound the cache anyway
+            if len(self._plans) < 4096:
+                self._plans[changed_fields] = plan
+        return plan
+
+    def __repr__(self) -> str:
+        return (f"RuleRegistry({len(self._enabled)} of {len(self._rules)} rules enabled, "
+                f"profile {self.profile!r})")
+
+
+def _run_steps(validator: Any, steps: tuple, profiler: Optional[RuleProfiler]) -> None:
+    """Run compiled steps (see RuleRegistry) whose layer applies to the packet."""
+    packet = validator.packet
+    active = (True, bool(packet.kbm or packet.c_tvm or packet.foundation),
+              bool(packet.gsn or packet.evf))
+    if profiler is None:
+        for layer, check, _ in steps:
+            if active[layer]:
+                check(validator)
+        return
+    clock = time.perf_counter
+    record = profiler.record
+    for layer, check, name in steps:
+        if active[layer]:
+            start = clock()
+            check(validator)
+            record(name, clock() - start)
@@ -0,0 +1,379 @@
+"""
+VSE Core: Packet Scanner
+Single-pass tokenizer for VSE packet syntax.
+
+The scanner walks a VSE string once, left to right, and dispatches on each
+field key to a value reader. Structured values (kbm, gsn, c_tvm, ...) are
+read with the C-accelerated JSON decoder where possible, so separators such
+as ``|`` and ``:`` inside quoted or nested values are handled correctly.
+A permissive fallback reader accepts Python-style literals (single quotes,
+True/False/None) and bare words, as produced by older ``to_vse`` output.
+
+In lazy mode the values of LAZY_FIELDS are not decoded: the scanner skips
+to the next unquoted ``|`` with one regex match and hands back the raw
+source slice, which decode_value turns into a value on first use.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import re
+
+
+_HEADER_RE = re.compile(r'\s*<?\s*VSE\s+v([\d.]+)\s*')
+# One "key: value" field. Group 2 captures a plain value (free text or a
+# flat, unquoted list); quoted and nested values leave it short, and are
+# read from m.start(2) by the JSON scanner or the slow-path readers.
+_FIELD = r'([A-Za-z_]\w*)\s*:\s*(\[[^\[\]"\'|]*\]|[^|"\[{\']*)'
+_FIRST_FIELD_RE = re.compile(r'\s*<?\s*' + _FIELD)
+_NEXT_FIELD_RE = re.compile(r'\s*\|\s*' + _FIELD)
+_WS_RE = re.compile(r'\s*')
+_NUMBER_RE = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.])')
+_SQ_STRING_RE = re.compile(r"'((?:[^'\\]|\\.)*)'")
+_ITEM_RE = re.compile(r'[^,\]|]*')
+_BARE_RE = re.compile(r'[^,\[\]{}|:]*')
+# A structured value up to the next unquoted '|'
+_RAW_VALUE_RE = re.compile(
+    r'''[^|"']*(?:(?:"[^"\\]*(?:\\.[^"\\]*)*"|'[^'\\]*(?:\\.[^'\\]*)*')[^|"']*)*'''
+)
+
+_LITERALS = {
+    "true": True, "false": False, "null": None,
+    "True": True, "False": False, "None": None,
+}
+
+# Keys whose values are JSON (or JSON-like) structures
+STRUCTURED_FIELDS = ("kbm", "c_tvm", "foundation", "mu_loop", "gsn", "evf")
+
+# Structured keys that lazy scans leave undecoded
+LAZY_FIELDS = frozenset(("kbm", "c_tvm", "mu_loop", "gsn", "evf"))
+
+# Value kinds, dispatched on in PacketScanner.scan
+_TEXT, _FLOAT, _LIST, _VALUE, _URP = range(5)
+_FIELD_KINDS = {
+    "intent": _TEXT,
+    "divergence": _FLOAT,
+    "constraints": _LIST,
+    "immune": _LIST,
+    "urp": _URP,
+}
+_FIELD_KINDS.update((key, _VALUE) for key in STRUCTURED_FIELDS)
+
+
+class PacketSyntaxError(ValueError):
+    """Raised when a VSE string cannot be tokenized."""
+
+    def __init__(self, message: str, text: str, pos: int):
+        super().__init__(f"{message} at position {pos}: {text[pos:pos + 20]!r}")
+        self.pos = pos
+
+
+class PacketScanner:
+    """
+    Reusable single-pass scanner for VSE packet strings.
+
+    A scanner holds its compiled patterns and JSON decoder, so one instance
+    can be reused across many packets (see parse_packets).
+
+    Usage:
+        scanner = PacketScanner()
+        fields = scanner.scan('<VSE v1.4 | intent: summarize | divergence: 0.20>')
+        packet = Packet(**fields)
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._scan_once = self._decoder.scan_once
+
+    def scan(self, text: str, raw: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Tokenize a VSE string into Packet constructor arguments.
+
+        Args:
+            text: VSE-formatted string (e.g., "<VSE v1.4 | intent: ... >")
+            raw: If given, LAZY_FIELDS values are stored here as undecoded
+                source slices (see decode_value) instead of in the result
+
+        Returns:
+            Dictionary of keyword arguments for Packet
+
+        Raises:
+            PacketSyntaxError: If a value is malformed
+        """
+        end = len(text.rstrip())
+        if end and text[end - 1] == '>':
+            end -= 1
+
+        next_field = _NEXT_FIELD_RE.match
+        m = _HEADER_RE.match(text, 0, end)
+        if m:
+            data: Dict[str, Any] = {"version": m.group(1)}
+            pos = m.end()
+            m = next_field(text, pos, end)
+        else:
+            data = {"version": "1.4"}
+            pos = 0
+            m = _FIRST_FIELD_RE.match(text, 0, end)
+            if m is None:
+                pos = self._skip_segment(text, 0, end, after_value=False)
+                m = next_field(text, pos, end)
+
+        kinds = _FIELD_KINDS
+        scan_once = self._scan_once
+        while pos < end:
+            if m is None:
+                pos = self._skip_segment(text, pos, end, after_value=True)
+                m = next_field(text, pos, end)
+                continue
+            key, value = m.group(1, 2)
+            pos = m.end()
+            kind = kinds.get(key)
+
+            if kind is _VALUE:
+                start = m.start(2)
+                if raw is not None and key in LAZY_FIELDS:
+                    pos = text.find('|', start, end)
+                    if pos < 0:
+                        pos = end
+                    value = text[start:pos]
+                    # An even number of plain double quotes means the '|'
+                    # is outside any string; otherwise match properly
+                    if value.count('"') & 1 or "'" in value or '\\' in value:
+                        pos = _RAW_VALUE_RE.match(text, start, end).end()
+                        value = text[start:pos]
+                    value = value.rstrip()
+                    if not value:
+                        raise PacketSyntaxError("Unexpected token", text, start)
+                    raw[key] = value
+                    data.pop(key, None)
+                    m = next_field(text, pos, end)
+                    continue
+                try:
+                    data[key], pos = scan_once(text, start)
+                except (StopIteration, ValueError):
+                    data[key], pos = self._read_loose(text, start, end)
+                if pos > end:
+                    raise PacketSyntaxError("Value runs past end of packet", text, end)
+            elif kind is _LIST:
+                if value[:1] == '[':
+                    value = value[1:-1]
+                    data[key] = [item.strip() for item in value.split(',')] \
+                        if value.strip() else []
+                else:
+                    data[key], pos = self._read_list(text, m.start(2), end)
+            elif pos < end and text[pos] != '|' and kind is _TEXT and text[m.start(2)] == '"':
+                data[key], pos = self._read_text(text, m.start(2), end)
+            else:
+                if pos < end and text[pos] != '|':
+                    # Value holds quotes or brackets: re-read it from its start
+                    value, pos = self._read_irregular(text, m.start(2), end, kind is None)
+                if kind is _TEXT:
+                    data[key] = value.rstrip()
+                elif kind is _FLOAT:
+                    try:
+                        data[key] = float(value)
+                    except ValueError:
+                        raise PacketSyntaxError("Expected a number", text, m.start(2)) from None
+                elif kind is _URP:
+                    data["urp_enabled"] = value.strip().lower() == "enabled"
+
+            m = next_field(text, pos, end)
+
+        return data
+
+    def decode_value(self, raw: str) -> Any:
+        """
+        Decode a raw structured value captured by a lazy scan.
+
+        Raises:
+            PacketSyntaxError: If raw is not exactly one value
+        """
+        end = len(raw)
+        value, pos = self._read_value(raw, 0, end)
+        if pos < end and raw[pos:].strip():
+            raise PacketSyntaxError("Unexpected trailing text", raw, pos)
+        return value
+
+    @staticmethod
+    def _skip_segment(text: str, pos: int, end: int, after_value: bool) -> int:
+        """
+        Skip a segment that has no "key:" prefix, as the original parser did.
+
+        Returns the index of the '|' that ends the segment (or end).
+        """
+        stop = text.find('|', pos, end)
+        if stop < 0:
+            stop = end
+        if after_value:
+            if text[pos:stop].strip():
+                raise PacketSyntaxError("Expected '|' after value", text, pos)
+            if stop < end:
+                stop = text.find('|', stop + 1, end)
+                if stop < 0:
+                    stop = end
+        return stop
+
+    def _read_text(self, text: str, pos: int, end: int) -> Tuple[str, int]:
+        """
+        Read a text value that starts with a double quote.
+
+        A single JSON string is unquoted. Anything else (text after the
+        closing quote, or no closing quote) is kept verbatim up to the
+        next '|', as the original parser read it.
+        """
+        try:
+            value, stop = self._scan_once(text, pos)
+        except (StopIteration, ValueError):
+            pass
+        else:
+            after = _WS_RE.match(text, stop, end).end()
+            if after == end or text[after] == '|':
+                return value, stop
+        value, stop = self._read_irregular(text, pos, end, False)
+        return value.rstrip(), stop
+
+    def _read_irregular(self, text: str, pos: int, end: int, unknown: bool) -> Tuple[str, int]:
+        """Read a scalar value containing quotes or brackets (or skip an unknown one)."""
+        if unknown and text[pos] in '[{"\'':
+            _, stop = self._read_value(text, pos, end)
+            return "", stop
+        stop = text.find('|', pos, end)
+        if stop < 0:
+            stop = end
+        return text[pos:stop], stop
+
+    # ------------------------------------------------------------------
+    # Slow-path readers: each takes (text, pos, end) and returns (value, pos)
+    # ------------------------------------------------------------------
+
+    def _read_list(self, text: str, pos: int, end: int) -> Tuple[List[str], int]:
+        """Read a list of strings; items may be bare words or quoted."""
+        if pos >= end or text[pos] != '[':
+            raise PacketSyntaxError("Expected '['", text, pos)
+        items: List[str] = []
+        pos = _WS_RE.match(text, pos + 1).end()
+        if pos < end and text[pos] == ']':
+            return items, pos + 1
+        while pos < end:
+            ch = text[pos]
+            if ch == '"':
+                item, pos = self._scan_once(text, pos)
+            elif ch == "'":
+                item, pos = self._read_single_quoted(text, pos)
+            else:
+                m = _ITEM_RE.match(text, pos, end)
+                item, pos = m.group().rstrip(), m.end()
+            items.append(item)
+            pos = _WS_RE.match(text, pos).end()
+            if pos >= end:
+                break
+            ch = text[pos]
+            if ch == ']':
+                return items, pos + 1
+            if ch != ',':
+                raise PacketSyntaxError("Expected ',' or ']'", text, pos)
+            pos = _WS_RE.match(text, pos + 1).end()
+        raise PacketSyntaxError("Unterminated list", text, pos)
+
+    def _read_value(self, text: str, pos: int, end: int) -> Tuple[Any, int]:
+        """Read a structured value: JSON first, permissive literal second."""
+        try:
+            value, stop = self._scan_once(text, pos)
+        except (StopIteration, ValueError):
+            return self._read_loose(text, pos, end)
+        if stop > end:
+            raise PacketSyntaxError("Value runs past end of packet", text, pos)
+        return value, stop
+
+    # ------------------------------------------------------------------
+    # Permissive literal reader (Python repr, bare words)
+    # ------------------------------------------------------------------
+
+    def _read_loose(self, text: str, pos: int, end: int) -> Tuple[Any, int]:
+        """Read one Python-style literal (or bare word) starting at pos."""
+        if pos >= end:
+            raise PacketSyntaxError("Unexpected end of packet", text, pos)
+        ch = text[pos]
+        if ch == '[':
+            return self._read_loose_list(text, pos, end)
+        if ch == '{':
+            return self._read_loose_dict(text, pos, end)
+        if ch == '"':
+            return self._scan_once(text, pos)
+        if ch == "'":
+            return self._read_single_quoted(text, pos)
+
+        m = _NUMBER_RE.match(text, pos, end)
+        if m:
+            token = m.group()
+            if '.' in token or 'e' in token or 'E' in token:
+                return float(token), m.end()
+            return int(token), m.end()
+
+        m = _BARE_RE.match(text, pos, end)
+        token = m.group().strip()
+        if not token:
+            raise PacketSyntaxError("Unexpected token", text, pos)
+        return _LITERALS.get(token, token), m.end()
+
+    def _read_single_quoted(self, text: str, pos: int) -> Tuple[str, int]:
+        """Read a single-quoted Python string."""
+        m = _SQ_STRING_RE.match(text, pos)
+        if m is None:
+            raise PacketSyntaxError("Unterminated string", text, pos)
+        value = m.group(1)
+        if '\\' in value:
+            value = value.encode('latin-1', 'backslashreplace').decode('unicode_escape')
+        return value, m.end()
+
+    def _read_loose_list(self, text: str, pos: int, end: int) -> Tuple[List[Any], int]:
+        """Read a bracketed list."""
+        items: List[Any] = []
+        pos = _WS_RE.match(text, pos + 1).end()
+        if pos < end and text[pos] == ']':
+            return items, pos + 1
+        while pos < end:
+            value, pos = self._read_loose(text, pos, end)
+            items.append(value)
+            pos = _WS_RE.match(text, pos).end()
+            if pos >= end:
+                break
+            ch = text[pos]
+            if ch == ']':
+                return items, pos + 1
+            if ch != ',':
+                raise PacketSyntaxError("Expected ',' or ']'", text, pos)
+            pos = _WS_RE.match(text, pos + 1).end()
+        raise PacketSyntaxError("Unterminated list", text, pos)
+
+    def _read_loose_dict(self, text: str, pos: int, end: int) -> Tuple[Dict[str, Any], int]:
+        """Read a braced mapping with quoted or bare keys."""
+        result: Dict[str, Any] = {}
+        pos = _WS_RE.match(text, pos + 1).end()
+        if pos < end and text[pos] == '}':
+            return result, pos + 1
+        while pos < end:
+            ch = text[pos]
+            if ch == '"':
+                key, pos = self._scan_once(text, pos)
+            elif ch == "'":
+                key, pos = self._read_single_quoted(text, pos)
+            else:
+                m = _BARE_RE.match(text, pos, end)
+                key, pos = m.group().strip(), m.end()
+                if not key:
+                    raise PacketSyntaxError("Expected key", text, pos)
+            pos = _WS_RE.match(text, pos).end()
+            if pos >= end or text[pos] != ':':
+                raise PacketSyntaxError("Expected ':'", text, pos)
+            pos = _WS_RE.match(text, pos + 1).end()
+            result[key], pos = self._read_loose(text, pos, end)
+            pos = _WS_RE.match(text, pos).end()
+            if pos >= end:
+                break
+            ch = text[pos]
+            if ch == '}':
+                return result, pos + 1
+            if ch != ',':
+                raise PacketSyntaxError("Expected ',' or '}'", text, pos)
+            pos = _WS_RE.match(text, pos + 1).end()
+        raise PacketSyntaxError("Unterminated mapping", text, pos)
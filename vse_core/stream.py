@@ -0,0 +1,277 @@
+"""
+VSE Core: Packet Streams
+Bounded-memory reading and writing of JSON Lines packet corpora.
+
+iter_packets reads one line at a time, so memory use depends on the
+longest line, not on the file size. Files compressed with gzip, bz2 or
+xz are detected from their leading magic bytes and decompressed on the
+fly. Lines may also hold packets in VSE syntax ("<VSE v1.4 | ...>"),
+which is told apart from JSON by the leading "<". PacketWriter writes
+one compact JSON object per line and buffers lines, flushing them in
+batches.
+"""
+
+from typing import IO, Callable, Iterator, List, NamedTuple, Optional, Union
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+
+from .packet import Packet
+from .scanner import PacketScanner
+
+
+PathOrFile = Union[str, "os.PathLike[str]", IO]
+
+# Leading bytes of each supported compressed format
+_MAGIC = (
+    (b"\x1f\x8b", gzip.open),
+    (b"BZh", bz2.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+)
+_SUFFIXES = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+ERROR_POLICIES = ("raise", "skip", "collect")
+FORMATS = ("auto", "jsonl", "vse")
+
+
+class BadLine(NamedTuple):
+    """A line that could not be turned into a Packet."""
+    lineno: int
+    line: str
+    error: str
+
+
+def _decompressor_for(head: bytes):
+    for magic, opener in _MAGIC:
+        if head.startswith(magic):
+            return opener
+    return None
+
+
+class _TextSource:
+    """
+    UTF-8 line stream over a path or file object; closes only what it opened.
+
+    Bytes that are not UTF-8 are decoded as lone surrogates (see
+    _require_utf8), so they fail only their own line.
+    """
+
+    def __init__(self, source: PathOrFile):
+        self._layers: List[IO] = []
+        self._caller: Optional[IO] = None
+        if isinstance(source, io.TextIOBase):
+            self.stream = source
+            return
+        if isinstance(source, (str, os.PathLike)):
+            raw = open(source, "rb")
+            self._layers.append(raw)
+        else:
+            raw = self._caller = source
+        if not hasattr(raw, "peek"):
+            raw = io.BufferedReader(raw)
+            self._layers.append(raw)
+        opener = _decompressor_for(raw.peek(6)[:6])
+        if opener is not None:
+            raw = opener(raw, "rb")
+            self._layers.append(raw)
+        self.stream = io.TextIOWrapper(raw, encoding="utf-8", errors="surrogateescape")
+        self._layers.append(self.stream)
+
+    def close(self) -> None:
+        """Release the layers this object created, leaving the caller's file open."""
+        for layer in reversed(self._layers):
+            # Plain wrappers would close the caller's file along with
+            # themselves; decompressors never close their fileobj
+            if self._caller is not None and isinstance(layer, (io.TextIOWrapper, io.BufferedReader)):
+                layer.detach()
+            else:
+                layer.close()
+        self._layers.clear()
+
+
+def _require_utf8(line: str) -> str:
+    """The line, unless it holds bytes _TextSource could not decode."""
+    if not line.isascii():
+        try:
+            line.encode("utf-8")
+        except UnicodeEncodeError:
+            raise ValueError("line is not valid UTF-8") from None
+    return line
+
+
+def line_decoder(fmt: str = "auto", trusted: bool = False) -> Callable[[str], Packet]:
+    """
+    Function that turns one line of a corpus into a Packet.
+
+    Args:
+        fmt: "jsonl", "vse", or "auto" to pick per line ("<" means VSE)
+        trusted: Build packets with Packet._trusted, leaving value checks
+            to a Validator (for validation pipelines)
+
+    Returns:
+        Callable raising ValueError or TypeError for lines that are not packets
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {FORMATS}, got {fmt!r}")
+    make = Packet._trusted if trusted else Packet.from_dict
+    loads = json.loads
+    scan = PacketScanner().scan
+    utf8 = _require_utf8
+    if fmt == "jsonl":
+        return lambda line: make(loads(utf8(line)))
+    if fmt == "vse":
+        return lambda line: make(scan(utf8(line)))
+
+    def decode(line: str) -> Packet:
+        line = utf8(line)
+        return make(scan(line) if line.lstrip().startswith("<") else loads(line))
+    return decode
+
+
+def iter_packets(source: PathOrFile, errors: str = "raise",
+                 bad_lines: Optional[List[BadLine]] = None,
+                 fmt: str = "auto") -> Iterator[Packet]:
+    """
+    Stream packets from a JSON Lines (or VSE lines) file.
+
+    Blank lines are ignored. Memory use is bounded by the longest line.
+
+    Args:
+        source: Path or file object (compressed files are detected)
+        errors: What to do with a line that fails to parse or validate:
+            "raise" re-raises the error, "skip" drops the line, and
+            "collect" drops it and appends a BadLine to bad_lines
+        bad_lines: List that receives BadLine records when errors="collect"
+        fmt: Line format, "jsonl", "vse", or "auto" (decided per line)
+
+    Yields:
+        Packet objects, in file order
+
+    Raises:
+        ValueError: On an unknown policy or format, or on a bad line with
+            errors="raise"
+    """
+    if errors not in ERROR_POLICIES:
+        raise ValueError(f"errors must be one of {ERROR_POLICIES}, got {errors!r}")
+    if errors == "collect" and bad_lines is None:
+        raise ValueError('errors="collect" requires a bad_lines list')
+    decode = line_decoder(fmt)
+
+    source = _TextSource(source)
+    try:
+        for lineno, line in enumerate(source.stream, 1):
+            if not line.strip():
+                continue
+            try:
+                packet = decode(line)
+            except (ValueError, TypeError) as e:
+                if errors == "raise":
+                    raise ValueError(f"line {lineno}: {e}") from e
+                if errors == "collect":
+                    bad_lines.append(BadLine(lineno, line.rstrip("\n"), str(e)))
+                continue
+            yield packet
+    finally:
+        source.close()
+
+
+class PacketWriter:
+    """
+    Buffered JSON Lines writer.
+
+    Lines are accumulated and written in batches of buffer_size packets.
+    Paths ending in .gz, .bz2 or .xz are compressed accordingly.
+
+    Usage:
+        with PacketWriter("corpus.jsonl.gz") as writer:
+            for packet in packets:
+                writer.write(packet)
+    """
+
+    def __init__(self, target: PathOrFile, buffer_size: int = 1024,
+                 compresslevel: Optional[int] = None):
+        """
+        Initialize writer.
+
+        Args:
+            target: Output path, or a text or binary file object
+            buffer_size: Packets held in memory between writes
+            compresslevel: Compression level for compressed paths (the
+                preset, for .xz)
+        """
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._buffer: List[str] = []
+        self._encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+        self._wrapped = False
+        if isinstance(target, (str, os.PathLike)):
+            opener = _SUFFIXES.get(os.path.splitext(os.fspath(target))[1].lower())
+            if opener is None:
+                self._file = open(target, "w", encoding="utf-8")
+            elif compresslevel is None:
+                self._file = opener(target, "wt", encoding="utf-8")
+            elif opener is lzma.open:
+                self._file = opener(target, "wt", preset=compresslevel, encoding="utf-8")
+            else:
+                self._file = opener(target, "wt", compresslevel=compresslevel, encoding="utf-8")
+            self._owned = True
+        elif isinstance(target, io.TextIOBase):
+            self._file = target
+            self._owned = False
+        else:
+            self._file = io.TextIOWrapper(target, encoding="utf-8", write_through=True)
+            self._owned = False
+            self._wrapped = True
+        self._closed = False
+
+    def write(self, packet: Packet) -> None:
+        """Queue one packet, flushing when the buffer is full."""
+        if self._closed:
+            raise ValueError("write to closed PacketWriter")
+        self._buffer.append(self._encode(packet.to_dict()))
+        self.count += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_many(self, packets) -> int:
+        """
+        Write every packet from an iterable.
+
+        Returns:
+            Number of packets written
+        """
+        before = self.count
+        for packet in packets:
+            self.write(packet)
+        return self.count - before
+
+    def flush(self) -> None:
+        """Write buffered lines to the underlying file."""
+        if self._buffer:
+            self._buffer.append("")
+            self._file.write("\n".join(self._buffer))
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close (files passed in by the caller are only flushed)."""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        if self._owned:
+            self._file.close()
+        elif self._wrapped:
+            self._file.detach()
+
+    def __enter__(self) -> 'PacketWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -3,20 +3,225 @@ VSE Core: Packet Validator
 Validates VSE packets for syntactic and semantic correctness.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, FrozenSet, Iterable, Tuple, Union
+from collections import OrderedDict
+from collections.abc import MutableSequence
 from dataclasses import dataclass
+from enum import IntEnum
+from itertools import chain
+import hashlib
+import json
+import operator
+import threading
+
+import numpy as np
+
 from .packet import Packet
+from .batch import PacketBatch
+from .rules import GREGARIOUS, KINETIC, Rule, RuleRegistry, _run_steps
+
+
+class ValidationCode(IntEnum):
+    """
+    Machine-readable validation finding.
+    
+    Values are stable identifiers; new codes are appended at the end.
+    """
+    
+    EMPTY_INTENT = 1
+    LONG_INTENT = 2
+    DIVERGENCE_RANGE = 3
+    HIGH_DIVERGENCE = 4
+    NO_CONSTRAINTS = 5
+    EMPTY_CONSTRAINT = 6
+    EMPTY_IMMUNE = 7
+    LONG_IMMUNE = 8
+    COHERENCE_SHAPE = 9
+    COHERENCE_ORDER = 10
+    COHERENCE_RANGE = 11
+    TIGHT_KBM = 12
+    C_TVM_SHAPE = 13
+    TOKEN_BUDGET = 14
+    LARGE_TOKEN_BUDGET = 15
+    NONSTANDARD_FOUNDATION = 16
+    WINDOW_SIZE = 17
+    THRESHOLD = 18
+    GSN_NO_NETWORK_ID = 19
+    CURIOSITY_RANGE = 20
+    HIGH_CURIOSITY = 21
+    LINK_VECTORS_TYPE = 22
+    MANY_LINK_VECTORS = 23
+    EVF_SHAPE = 24
+    EXPLORATION_RADIUS = 25
+    BRANCH_LIMIT = 26
+    HIGH_BRANCH_LIMIT = 27
+    DIVERGENCE_KBM_CONFLICT = 28
+    GSN_NO_CURIOSITY = 29
+    DIVERGENCE_IMMUNE_CONFLICT = 30
+    
+    @property
+    def template(self) -> str:
+        """Message format string; positional fields are the finding params."""
+        return _MESSAGES[self]
+    
+    def render(self, params: tuple = ()) -> str:
+        """Human-readable message for a finding with this code."""
+        return _MESSAGES[self].format(*params)
+
+
+_MESSAGES = {
+    ValidationCode.EMPTY_INTENT: "Intent cannot be empty",
+    ValidationCode.LONG_INTENT: "Intent is very long ({0} chars)",
+    ValidationCode.DIVERGENCE_RANGE: "Divergence must be in [0.0, 1.0], got {0}",
+    ValidationCode.HIGH_DIVERGENCE: "High divergence ({0}) may reduce determinism",
+    ValidationCode.NO_CONSTRAINTS: "No constraints specified - output may be unconstrained",
+    ValidationCode.EMPTY_CONSTRAINT: "Empty constraint found",
+    ValidationCode.EMPTY_IMMUNE: "Empty immune string found",
+    ValidationCode.LONG_IMMUNE: "Very long immune string ({0} chars)",
+    ValidationCode.COHERENCE_SHAPE: "coherence_vector must be [min, max]",
+    ValidationCode.COHERENCE_ORDER: "coherence_vector min ({0}) > max ({1})",
+    ValidationCode.COHERENCE_RANGE: "coherence_vector values must be in [0.0, 1.0]",
+    ValidationCode.TIGHT_KBM: "Very tight KBM range ({0:.2f})",
+    ValidationCode.C_TVM_SHAPE: "c_tvm must be [premise_id, conclusion_id, token_budget]",
+    ValidationCode.TOKEN_BUDGET: "token_budget must be positive integer, got {0}",
+    ValidationCode.LARGE_TOKEN_BUDGET: "Very large token budget ({0})",
+    ValidationCode.NONSTANDARD_FOUNDATION: "Non-standard foundation anchor: '{0}'",
+    ValidationCode.WINDOW_SIZE: "window_size must be positive integer, got {0}",
+    ValidationCode.THRESHOLD: "threshold must be in [0.0, 1.0], got {0}",
+    ValidationCode.GSN_NO_NETWORK_ID: "GSN missing network_id - packet cannot join network",
+    ValidationCode.CURIOSITY_RANGE: "curiosity_factor must be in [0.0, 1.0], got {0}",
+    ValidationCode.HIGH_CURIOSITY: "High curiosity_factor ({0}) may destabilize network",
+    ValidationCode.LINK_VECTORS_TYPE: "link_vectors must be a list",
+    ValidationCode.MANY_LINK_VECTORS: "Many link_vectors ({0}) may impact performance",
+    ValidationCode.EVF_SHAPE: "evf must be [seed_id, exploration_radius, branch_limit]",
+    ValidationCode.EXPLORATION_RADIUS: "exploration_radius must be in [0.0, 1.0], got {0}",
+    ValidationCode.BRANCH_LIMIT: "branch_limit must be positive integer, got {0}",
+    ValidationCode.HIGH_BRANCH_LIMIT: "High branch_limit ({0}) may be computationally expensive",
+    ValidationCode.DIVERGENCE_KBM_CONFLICT: "High divergence with tight KBM may cause conflicts",
+    ValidationCode.GSN_NO_CURIOSITY: "GSN without curiosity_factor - defaulting to 0 (no exploration)",
+    ValidationCode.DIVERGENCE_IMMUNE_CONFLICT:
+        "High divergence with immune strings may not fully protect content",
+}
+
+
+# A finding is a plain (code, params) tuple; params fill the code's message
+# template. Tuples are cheap to build, so validation never formats text.
+Finding = Tuple[ValidationCode, tuple]
+
+
+def _render(findings: List[Union[Finding, str]]) -> List[str]:
+    return [f if isinstance(f, str) else f[0].render(f[1]) for f in findings]
+
+
+class _Messages:
+    """
+    ValidationResult field set to findings and read as messages.
+    
+    The findings are kept for the <severity>_findings property (e.g.
+    error_findings); the messages are rendered on first read and cached.
+    """
+    
+    def __set_name__(self, owner, name: str):
+        self.findings = "_" + name[:-1] + "_findings"
+        self.cache = "_" + name
+    
+    def __get__(self, obj, owner=None) -> List[str]:
+        if obj is None:
+            # No class attribute, so the dataclass field has no default
+            raise AttributeError(self.cache[1:])
+        messages = obj.__dict__.get(self.cache)
+        if messages is None:
+            messages = obj.__dict__[self.cache] = _render(obj.__dict__[self.findings])
+        return messages
+    
+    def __set__(self, obj, findings: List[Union[Finding, str]]) -> None:
+        if isinstance(findings, _MessageList):
+            findings = list(findings.findings)
+        obj.__dict__[self.findings] = findings
+        obj.__dict__.pop(self.cache, None)
+
+
+class _MessageList(MutableSequence):
+    """
+    Live view of a findings list as messages (Validator.errors/warnings).
+    
+    Items read as rendered messages; messages added by custom rules are
+    stored in the findings list as plain strings.
+    """
+    
+    __slots__ = ("findings",)
+    
+    def __init__(self, findings: List[Union[Finding, str]]):
+        self.findings = findings
+    
+    def __len__(self) -> int:
+        return len(self.findings)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _render(self.findings[index])
+        f = self.findings[index]
+        return f if isinstance(f, str) else f[0].render(f[1])
+    
+    def __setitem__(self, index, message) -> None:
+        self.findings[index] = message
+    
+    def __delitem__(self, index) -> None:
+        del self.findings[index]
+    
+    def insert(self, index: int, message: str) -> None:
+        self.findings.insert(index, message)
+    
+    def clear(self) -> None:
+        self.findings.clear()
+    
+    def copy(self) -> List[str]:
+        return _render(self.findings)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, _MessageList):
+            other = other.copy()
+        return self.copy() == other if isinstance(other, list) else NotImplemented
+    
+    def __repr__(self) -> str:
+        return repr(self.copy())
 
 
 @dataclass
 class ValidationResult:
-    """Result of packet validation."""
+    """
+    Result of packet validation.
+    
+    errors and warnings are given as (code, params) findings, plain
+    message strings, or a mix; they read back as message strings,
+    rendered when first accessed. The findings themselves stay available
+    as error_findings and warning_findings.
+    
+    Usage:
+        counts = Counter(code for r in results for code in r.codes)
+    """
     
     valid: bool
-    errors: List[str]
-    warnings: List[str]
+    errors: List[str] = _Messages()  # type: ignore[assignment]
+    warnings: List[str] = _Messages()  # type: ignore[assignment]
     layer: str  # "v1.3", "v1.4-kinetic", "v1.4-gregarious"
     
+    @property
+    def error_findings(self) -> List[Union[Finding, str]]:
+        """Errors as given: findings or message strings."""
+        return self.__dict__["_error_findings"]
+    
+    @property
+    def warning_findings(self) -> List[Union[Finding, str]]:
+        """Warnings as given: findings or message strings."""
+        return self.__dict__["_warning_findings"]
+    
+    @property
+    def codes(self) -> List[ValidationCode]:
+        """Codes of all findings, errors first (e.g. for Counter aggregation)."""
+        return [f[0] for f in self.error_findings + self.warning_findings
+                if not isinstance(f, str)]
+    
     def __bool__(self) -> bool:
         """Allow direct boolean checking: if ValidationResult: ..."""
         return self.valid
@@ -51,6 +256,9 @@ class Validator:
     - v1.4 Kinetic: KBM, C-TVM, μ-Loop validation
     - v1.4 Gregarious: GSN, EVF, URP validation
     
+    The checks run are the enabled rules of a RuleRegistry (default:
+    default_rules); the built-in rules are the _validate_* methods.
+    
     Usage:
         validator = Validator(packet)
         result = validator.validate()
@@ -60,215 +268,289 @@ class Validator:
             print(result.errors)
     """
     
-    def __init__(self, packet: Packet, strict: bool = False):
+    def __init__(self, packet: Packet, strict: bool = False,
+                 rules: Optional[RuleRegistry] = None):
         """
         Initialize validator.
         
         Args:
             packet: Packet to validate
             strict: If True, warnings become errors
+            rules: Rules to apply (default: default_rules)
         """
         self.packet = packet
         self.strict = strict
-        self.errors: List[str] = []
-        self.warnings: List[str] = []
+        self.rules = default_rules if rules is None else rules
+        self.error_findings: List[Union[Finding, str]] = []
+        self.warning_findings: List[Union[Finding, str]] = []
+    
+    @property
+    def errors(self) -> MutableSequence:
+        """Error messages so far, a live view of error_findings."""
+        return _MessageList(self.error_findings)
+    
+    @errors.setter
+    def errors(self, messages: Iterable[str]) -> None:
+        if not (isinstance(messages, _MessageList) and messages.findings is self.error_findings):
+            self.error_findings[:] = messages
+    
+    @property
+    def warnings(self) -> MutableSequence:
+        """Warning messages so far, a live view of warning_findings."""
+        return _MessageList(self.warning_findings)
+    
+    @warnings.setter
+    def warnings(self, messages: Iterable[str]) -> None:
+        if not (isinstance(messages, _MessageList) and messages.findings is self.warning_findings):
+            self.warning_findings[:] = messages
     
     def validate(self) -> ValidationResult:
         """
         Perform full validation.
         
         Returns:
-            ValidationResult with validity status and messages
+            ValidationResult with validity status and findings
         """
-        self.errors.clear()
-        self.warnings.clear()
+        self.error_findings.clear()
+        self.warning_findings.clear()
+        rules = self.rules
+        if rules.profiler is not None:
+            _run_steps(self, rules._steps, rules.profiler)
+            return self._result()
         
-        # Core v1.3 validation
-        self._validate_intent()
-        self._validate_divergence()
-        self._validate_constraints()
-        self._validate_immune()
+        packet = self.packet
+        for layer, checks in rules._groups:
+            # v1.4 Kinetic and Gregarious rules only run on packets using them
+            if layer == KINETIC:
+                if not (packet.kbm or packet.c_tvm or packet.foundation):
+                    continue
+            elif layer == GREGARIOUS:
+                if not (packet.gsn or packet.evf):
+                    continue
+            for check in checks:
+                check(self)
+        return self._result()
+    
+    def revalidate(self, previous: ValidationResult,
+                   changed_fields: Iterable[str]) -> ValidationResult:
+        """
+        Validate again after some fields changed, re-running only the rules
+        that read them (see Rule.dependencies).
+        
+        Findings of the other rules are taken from the previous result, so
+        the result equals validate() as long as changed_fields lists every
+        field modified since previous was produced with the same rules.
+        Cross-field rules (e.g. high divergence with a tight KBM range)
+        re-run when any field they read changes.
         
-        # v1.4 Kinetic validation
-        if self.packet.kbm or self.packet.c_tvm or self.packet.foundation:
-            self._validate_kinetic()
+        Args:
+            previous: Result of validating this packet before the change
+            changed_fields: Names of modified fields; dotted paths such as
+                "kbm.coherence_vector" count as their top-level field
         
-        # v1.4 Gregarious validation
-        if self.packet.gsn or self.packet.evf:
-            self._validate_gregarious()
+        Returns:
+            ValidationResult, as from validate()
         
-        # Check for conflicts
-        self._check_conflicts()
+        Raises:
+            ValueError: If a changed field is not a packet field
+        """
+        rules = self.rules
+        steps, stale, layer_changed = rules._revalidation_plan(tuple(changed_fields))
+        layer = None if layer_changed else previous.layer
+        if not steps:
+            return self._result_from(list(previous.error_findings),
+                                     list(previous.warning_findings), layer)
         
+        errors = self.error_findings
+        warnings = self.warning_findings
+        errors.clear()
+        warnings.clear()
+        _run_steps(self, steps, rules.profiler)
+        
+        # Each code comes from one rule at one severity, so the findings of
+        # the rules that did not run can be picked out of previous by code
+        # (findings no registered rule declares, such as plain messages,
+        # cannot be placed and force a full validation)
+        order = rules._order
+        for finding in chain(errors, warnings):
+            if isinstance(finding, str) or finding[0] not in order:
+                return self.validate()
+        kept_errors = []
+        kept_warnings = []
+        for finding in previous.error_findings:
+            if isinstance(finding, str) or finding[0] not in order:
+                return self.validate()
+            code = finding[0]
+            if code not in stale:
+                (kept_warnings if code in _WARNING_CODES else kept_errors).append(finding)
+        for finding in previous.warning_findings:
+            if isinstance(finding, str) or finding[0] not in order:
+                return self.validate()
+            if finding[0] not in stale:
+                kept_warnings.append(finding)
+        return self._result_from(_merge(kept_errors, errors, order),
+                                 _merge(kept_warnings, warnings, order), layer)
+    
+    def _result(self) -> ValidationResult:
+        """Build the result from the collected findings."""
+        return self._result_from(self.error_findings.copy(), self.warning_findings.copy())
+    
+    def _result_from(self, errors: List[Finding], warnings: List[Finding],
+                     layer: Optional[str] = None) -> ValidationResult:
         # Determine layer
-        layer = self.packet.get_version_layer()
+        if layer is None:
+            layer = self.packet.get_version_layer()
         
         # In strict mode, warnings become errors
-        if self.strict and self.warnings:
-            self.errors.extend(self.warnings)
-            self.warnings.clear()
+        if self.strict and warnings:
+            errors = errors + warnings
+            warnings = []
         
         return ValidationResult(
-            valid=len(self.errors) == 0,
-            errors=self.errors.copy(),
-            warnings=self.warnings.copy(),
+            valid=len(errors) == 0,
+            errors=errors,
+            warnings=warnings,
             layer=layer
         )
     
     def _validate_intent(self):
         """Validate intent field."""
         if not self.packet.intent:
-            self.errors.append("Intent cannot be empty")
+            self.error_findings.append((ValidationCode.EMPTY_INTENT, ()))
         elif len(self.packet.intent) > 200:
-            self.warnings.append(f"Intent is very long ({len(self.packet.intent)} chars)")
+            self.warning_findings.append((ValidationCode.LONG_INTENT, (len(self.packet.intent),)))
     
     def _validate_divergence(self):
         """Validate divergence field."""
         d = self.packet.divergence
         if not 0.0 <= d <= 1.0:
-            self.errors.append(f"Divergence must be in [0.0, 1.0], got {d}")
+            self.error_findings.append((ValidationCode.DIVERGENCE_RANGE, (d,)))
         elif d > 0.7:
-            self.warnings.append(f"High divergence ({d}) may reduce determinism")
+            self.warning_findings.append((ValidationCode.HIGH_DIVERGENCE, (d,)))
     
     def _validate_constraints(self):
         """Validate constraints field."""
         if not self.packet.constraints:
-            self.warnings.append("No constraints specified - output may be unconstrained")
+            self.warning_findings.append((ValidationCode.NO_CONSTRAINTS, ()))
         
         for constraint in self.packet.constraints:
             if not constraint.strip():
-                self.errors.append("Empty constraint found")
+                self.error_findings.append((ValidationCode.EMPTY_CONSTRAINT, ()))
     
     def _validate_immune(self):
         """Validate immune field."""
         if self.packet.immune:
             for item in self.packet.immune:
                 if not item.strip():
-                    self.errors.append("Empty immune string found")
+                    self.error_findings.append((ValidationCode.EMPTY_IMMUNE, ()))
                 elif len(item) > 500:
-                    self.warnings.append(f"Very long immune string ({len(item)} chars)")
-    
-    def _validate_kinetic(self):
-        """Validate v1.4 Kinetic fields."""
-        # KBM validation
-        if self.packet.kbm:
-            self._validate_kbm()
-        
-        # C-TVM validation
-        if self.packet.c_tvm:
-            self._validate_c_tvm()
-        
-        # Foundation validation
-        if self.packet.foundation:
-            self._validate_foundation()
-        
-        # μ-Loop validation
-        if self.packet.mu_loop:
-            self._validate_mu_loop()
+                    self.warning_findings.append((ValidationCode.LONG_IMMUNE, (len(item),)))
     
     def _validate_kbm(self):
         """Validate Kinetic Boundary Management."""
         kbm = self.packet.kbm
+        if not kbm:
+            return
         
         if "coherence_vector" in kbm:
             vec = kbm["coherence_vector"]
             if not isinstance(vec, list) or len(vec) != 2:
-                self.errors.append("coherence_vector must be [min, max]")
+                self.error_findings.append((ValidationCode.COHERENCE_SHAPE, ()))
             elif vec[0] > vec[1]:
-                self.errors.append(f"coherence_vector min ({vec[0]}) > max ({vec[1]})")
+                self.error_findings.append((ValidationCode.COHERENCE_ORDER, (vec[0], vec[1])))
             elif not (0.0 <= vec[0] <= 1.0 and 0.0 <= vec[1] <= 1.0):
-                self.errors.append("coherence_vector values must be in [0.0, 1.0]")
+                self.error_findings.append((ValidationCode.COHERENCE_RANGE, ()))
         
         # Warn if KBM range is very tight
         if "coherence_vector" in kbm:
             vec = kbm["coherence_vector"]
             if isinstance(vec, list) and len(vec) == 2:
                 if vec[1] - vec[0] < 0.05:
-                    self.warnings.append(f"Very tight KBM range ({vec[1] - vec[0]:.2f})")
+                    self.warning_findings.append((ValidationCode.TIGHT_KBM, (vec[1] - vec[0],)))
     
     def _validate_c_tvm(self):
         """Validate Contextual Token-Vector Mapping."""
         c_tvm = self.packet.c_tvm
+        if not c_tvm:
+            return
         
         if not isinstance(c_tvm, list) or len(c_tvm) != 3:
-            self.errors.append("c_tvm must be [premise_id, conclusion_id, token_budget]")
+            self.error_findings.append((ValidationCode.C_TVM_SHAPE, ()))
         else:
             token_budget = c_tvm[2]
             if not isinstance(token_budget, int) or token_budget <= 0:
-                self.errors.append(f"token_budget must be positive integer, got {token_budget}")
+                self.error_findings.append((ValidationCode.TOKEN_BUDGET, (token_budget,)))
             elif token_budget > 10000:
-                self.warnings.append(f"Very large token budget ({token_budget})")
+                self.warning_findings.append((ValidationCode.LARGE_TOKEN_BUDGET, (token_budget,)))
     
     def _validate_foundation(self):
         """Validate Foundation anchors."""
+        if not self.packet.foundation:
+            return
         valid_foundations = {"Milieu", "Gravitas", "Fulcrum", "Ambience"}
         
         for anchor in self.packet.foundation:
             if anchor not in valid_foundations:
-                self.warnings.append(f"Non-standard foundation anchor: '{anchor}'")
+                self.warning_findings.append((ValidationCode.NONSTANDARD_FOUNDATION, (anchor,)))
     
     def _validate_mu_loop(self):
         """Validate μ-Loop configuration."""
         mu = self.packet.mu_loop
+        if not mu:
+            return
         
         if "window_size" in mu:
             ws = mu["window_size"]
             if not isinstance(ws, int) or ws <= 0:
-                self.errors.append(f"window_size must be positive integer, got {ws}")
+                self.error_findings.append((ValidationCode.WINDOW_SIZE, (ws,)))
         
         if "threshold" in mu:
             t = mu["threshold"]
             if not isinstance(t, (int, float)) or not 0.0 <= t <= 1.0:
-                self.errors.append(f"threshold must be in [0.0, 1.0], got {t}")
-    
-    def _validate_gregarious(self):
-        """Validate v1.4 Gregarious fields."""
-        # GSN validation
-        if self.packet.gsn:
-            self._validate_gsn()
-        
-        # EVF validation
-        if self.packet.evf:
-            self._validate_evf()
+                self.error_findings.append((ValidationCode.THRESHOLD, (t,)))
     
     def _validate_gsn(self):
         """Validate Gregarious Semantic Network."""
         gsn = self.packet.gsn
+        if not gsn:
+            return
         
         if "network_id" not in gsn:
-            self.warnings.append("GSN missing network_id - packet cannot join network")
+            self.warning_findings.append((ValidationCode.GSN_NO_NETWORK_ID, ()))
         
         if "curiosity_factor" in gsn:
             cf = gsn["curiosity_factor"]
             if not isinstance(cf, (int, float)) or not 0.0 <= cf <= 1.0:
-                self.errors.append(f"curiosity_factor must be in [0.0, 1.0], got {cf}")
+                self.error_findings.append((ValidationCode.CURIOSITY_RANGE, (cf,)))
             elif cf > 0.8:
-                self.warnings.append(f"High curiosity_factor ({cf}) may destabilize network")
+                self.warning_findings.append((ValidationCode.HIGH_CURIOSITY, (cf,)))
         
         if "link_vectors" in gsn:
             links = gsn["link_vectors"]
             if not isinstance(links, list):
-                self.errors.append("link_vectors must be a list")
+                self.error_findings.append((ValidationCode.LINK_VECTORS_TYPE, ()))
             elif len(links) > 100:
-                self.warnings.append(f"Many link_vectors ({len(links)}) may impact performance")
+                self.warning_findings.append((ValidationCode.MANY_LINK_VECTORS, (len(links),)))
     
     def _validate_evf(self):
         """Validate Exploratory Vector Fields."""
         evf = self.packet.evf
+        if not evf:
+            return
         
         if not isinstance(evf, list) or len(evf) != 3:
-            self.errors.append("evf must be [seed_id, exploration_radius, branch_limit]")
+            self.error_findings.append((ValidationCode.EVF_SHAPE, ()))
         else:
             radius = evf[1]
             branch_limit = evf[2]
             
             if not isinstance(radius, (int, float)) or not 0.0 <= radius <= 1.0:
-                self.errors.append(f"exploration_radius must be in [0.0, 1.0], got {radius}")
+                self.error_findings.append((ValidationCode.EXPLORATION_RADIUS, (radius,)))
             
             if not isinstance(branch_limit, int) or branch_limit <= 0:
-                self.errors.append(f"branch_limit must be positive integer, got {branch_limit}")
+                self.error_findings.append((ValidationCode.BRANCH_LIMIT, (branch_limit,)))
             elif branch_limit > 20:
-                self.warnings.append(f"High branch_limit ({branch_limit}) may be computationally expensive")
+                self.warning_findings.append((ValidationCode.HIGH_BRANCH_LIMIT, (branch_limit,)))
     
     def _check_conflicts(self):
         """Check for field conflicts and logical inconsistencies."""
@@ -277,31 +559,488 @@ class Validator:
             vec = self.packet.kbm["coherence_vector"]
             if isinstance(vec, list) and len(vec) == 2:
                 if self.packet.divergence > 0.5 and (vec[1] - vec[0]) < 0.1:
-                    self.warnings.append(
-                        "High divergence with tight KBM may cause conflicts"
-                    )
+                    self.warning_findings.append((ValidationCode.DIVERGENCE_KBM_CONFLICT, ()))
         
         # GSN with no curiosity_factor defaults to 0 (which is fine, but notable)
         if self.packet.gsn and "curiosity_factor" not in self.packet.gsn:
-            self.warnings.append("GSN without curiosity_factor - defaulting to 0 (no exploration)")
+            self.warning_findings.append((ValidationCode.GSN_NO_CURIOSITY, ()))
         
         # Immune strings should be enforced with low divergence
         if self.packet.immune and self.packet.divergence > 0.5:
-            self.warnings.append(
-                "High divergence with immune strings may not fully protect content"
-            )
+            self.warning_findings.append((ValidationCode.DIVERGENCE_IMMUNE_CONFLICT, ()))
+
+
+# Codes reported as warnings (strict mode reports them as errors)
+_WARNING_CODES = frozenset({
+    ValidationCode.LONG_INTENT, ValidationCode.HIGH_DIVERGENCE,
+    ValidationCode.NO_CONSTRAINTS, ValidationCode.LONG_IMMUNE, ValidationCode.TIGHT_KBM,
+    ValidationCode.LARGE_TOKEN_BUDGET, ValidationCode.NONSTANDARD_FOUNDATION,
+    ValidationCode.GSN_NO_NETWORK_ID, ValidationCode.HIGH_CURIOSITY,
+    ValidationCode.MANY_LINK_VECTORS, ValidationCode.HIGH_BRANCH_LIMIT,
+    ValidationCode.DIVERGENCE_KBM_CONFLICT, ValidationCode.GSN_NO_CURIOSITY,
+    ValidationCode.DIVERGENCE_IMMUNE_CONFLICT,
+})
 
 
-def validate_packet(packet: Packet, strict: bool = False) -> ValidationResult:
+def _merge(kept: List[Finding], rerun: List[Finding], order: Dict[Any, int]) -> List[Finding]:
+    """Combine findings into the order validate() reports them in."""
+    if not kept or not rerun:
+        return kept + rerun
+    # Stable: findings of one rule keep their order
+    return sorted(kept + rerun, key=lambda finding: order[finding[0]])
+
+
+def builtin_rules() -> List[Rule]:
+    """The built-in rules, in the order they run."""
+    V = Validator
+    C = ValidationCode
+    return [
+        Rule("intent", V._validate_intent, "v1.3", {"intent"},
+             (C.EMPTY_INTENT, C.LONG_INTENT)),
+        Rule("divergence", V._validate_divergence, "v1.3", {"divergence"},
+             (C.DIVERGENCE_RANGE, C.HIGH_DIVERGENCE)),
+        Rule("constraints", V._validate_constraints, "v1.3", {"constraints"},
+             (C.NO_CONSTRAINTS, C.EMPTY_CONSTRAINT)),
+        Rule("immune", V._validate_immune, "v1.3", {"immune"},
+             (C.EMPTY_IMMUNE, C.LONG_IMMUNE)),
+        Rule("kbm", V._validate_kbm, "kinetic", {"kbm"},
+             (C.COHERENCE_SHAPE, C.COHERENCE_ORDER, C.COHERENCE_RANGE, C.TIGHT_KBM)),
+        Rule("c_tvm", V._validate_c_tvm, "kinetic", {"c_tvm"},
+             (C.C_TVM_SHAPE, C.TOKEN_BUDGET, C.LARGE_TOKEN_BUDGET)),
+        Rule("foundation", V._validate_foundation, "kinetic", {"foundation"},
+             (C.NONSTANDARD_FOUNDATION,)),
+        Rule("mu_loop", V._validate_mu_loop, "kinetic", {"mu_loop"},
+             (C.WINDOW_SIZE, C.THRESHOLD)),
+        Rule("gsn", V._validate_gsn, "gregarious", {"gsn"},
+             (C.GSN_NO_NETWORK_ID, C.CURIOSITY_RANGE, C.HIGH_CURIOSITY, C.LINK_VECTORS_TYPE,
+              C.MANY_LINK_VECTORS)),
+        Rule("evf", V._validate_evf, "gregarious", {"evf"},
+             (C.EVF_SHAPE, C.EXPLORATION_RADIUS, C.BRANCH_LIMIT, C.HIGH_BRANCH_LIMIT)),
+        # Conflicts between fields, checked last
+        Rule("conflicts", V._check_conflicts, "v1.3", {"divergence", "kbm", "gsn", "immune"},
+             (C.DIVERGENCE_KBM_CONFLICT, C.GSN_NO_CURIOSITY, C.DIVERGENCE_IMMUNE_CONFLICT)),
+    ]
+
+
+# Rules every Validator applies unless given others
+default_rules = RuleRegistry(builtin_rules())
+
+# Packet fields each built-in rule depends on (see Rule.dependencies)
+RULE_FIELDS: Dict[str, FrozenSet[str]] = {rule.name: rule.dependencies for rule in default_rules}
+
+
+def get_default_rules() -> RuleRegistry:
+    """The registry Validators use by default."""
+    return default_rules
+
+
+def set_default_rules(rules: RuleRegistry) -> None:
+    """
+    Replace the registry Validators use by default.
+    """
+    global default_rules
+    default_rules = rules
+
+
+def validate_packet(packet: Packet, strict: bool = False,
+                    cache: Optional['ValidationCache'] = None) -> ValidationResult:
     """
     Convenience function to validate a packet.
     
     Args:
         packet: Packet to validate
         strict: If True, warnings become errors
+        cache: Reuse results for packets validated before (see ValidationCache)
         
     Returns:
         ValidationResult
     """
+    if cache is not None:
+        return cache.validate(packet, strict)
     validator = Validator(packet, strict=strict)
     return validator.validate()
+
+
+# Every field validation reads (all but metadata)
+_validated_fields = operator.attrgetter(
+    "version", "intent", "divergence", "constraints", "immune", "kbm",
+    "c_tvm", "foundation", "mu_loop", "gsn", "evf", "urp_enabled",
+)
+
+
+def validation_key(packet: Packet) -> bytes:
+    """
+    Content key for caching validation results (cached on the packet).
+    
+    BLAKE2b-128 of the repr of every field except metadata, which
+    validation does not look at. Unlike Packet.digest(), the repr keeps
+    100 apart from 100.0 and tuples apart from lists, as the validator
+    does, and it is cheaper to compute than JSON.
+    """
+    cache = packet._serial_cache()
+    key = cache.get("validation_key")
+    if key is None:
+        text = repr(_validated_fields(packet))
+        key = cache["validation_key"] = hashlib.blake2b(
+            text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    return key
+
+
+class ValidationCache:
+    """
+    Thread-safe LRU cache of validation results.
+    
+    Results are keyed by (validation_key(packet), strict), so an equal copy
+    of a packet validated before is a dictionary lookup. The result is also
+    remembered on the packet until one of its fields changes, so
+    revalidating the same unchanged object skips even the key. Cached
+    results are shared between callers and must not be modified.
+    
+    Usage:
+        cache = ValidationCache(maxsize=100_000)
+        result = validate_packet(packet, cache=cache)
+        cache.stats()["hit_rate"]
+    """
+    
+    def __init__(self, maxsize: int = 65536):
+        """
+        Initialize cache.
+        
+        Args:
+            maxsize: Maximum number of results held
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._results: 'OrderedDict[Tuple[bytes, bool], ValidationResult]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._token = object()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def validate(self, packet: Packet, strict: bool = False) -> ValidationResult:
+        """
+        Cached result for a packet, validating it on a miss.
+        
+        Args:
+            packet: Packet to validate
+            strict: If True, warnings become errors
+            
+        Returns:
+            ValidationResult (shared with other callers)
+        """
+        # Unchanged packets remember their result, which skips hashing and
+        # the LRU; the token keeps results of other (or cleared) caches apart
+        memo = packet._serial_cache()
+        memo_key = (self._token, strict)
+        result = memo.get(memo_key)
+        if result is not None:
+            with self._lock:
+                self.hits += 1
+            return result
+        
+        key = (validation_key(packet), strict)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                memo[memo_key] = result
+                return result
+            self.misses += 1
+        
+        # Validate outside the lock; racing threads may both compute a result
+        result = Validator(packet, strict=strict).validate()
+        memo[memo_key] = result
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+                self.evictions += 1
+        return result
+    
+    def __len__(self) -> int:
+        return len(self._results)
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Cache effectiveness.
+        
+        Returns:
+            Dictionary with size, maxsize, hits, misses, evictions and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._results),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+    
+    def clear(self) -> None:
+        """Drop every result and reset counters."""
+        with self._lock:
+            self._results.clear()
+            self._token = object()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+# ----------------------------------------------------------------------
+# Batch validation
+# ----------------------------------------------------------------------
+
+# Per-packet result of validate_batch
+BATCH_RESULT_DTYPE = np.dtype([("valid", "?"), ("errors", "<u4"), ("warnings", "<u4")])
+
+_STANDARD_FOUNDATIONS = {"Milieu", "Gravitas", "Fulcrum", "Ambience"}
+_NAN = float("nan")
+
+
+def _number(x: Any, kinds=(int, float)) -> float:
+    """x as float if it is one of kinds (bool counts as int), else NaN."""
+    if isinstance(x, kinds):
+        try:
+            return float(x)
+        except OverflowError:
+            return float("inf") if x > 0 else float("-inf")
+    return _NAN
+
+
+def _contains(value: Any, key: str) -> bool:
+    try:
+        return key in value
+    except TypeError:
+        return False
+
+
+# Feature extractors for nested values: each maps one decoded value (or
+# None) to a tuple of numbers; the rules are then applied as array masks.
+# Numbers that are the wrong type become NaN plus a False "is_*" flag.
+
+_KBM_FEATURES = [("truthy", "?"), ("cv_present", "?"), ("cv_pair", "?"),
+                 ("v0", "f8"), ("v1", "f8")]
+
+
+def _kbm_features(kbm: Any) -> tuple:
+    if not kbm or not _contains(kbm, "coherence_vector"):
+        return (bool(kbm), False, False, _NAN, _NAN)
+    vec = kbm["coherence_vector"]
+    if not isinstance(vec, list) or len(vec) != 2:
+        return (True, True, False, _NAN, _NAN)
+    return (True, True, True, _number(vec[0]), _number(vec[1]))
+
+
+_C_TVM_FEATURES = [("truthy", "?"), ("shape_ok", "?"), ("budget_int", "?"), ("budget", "f8")]
+
+
+def _c_tvm_features(c_tvm: Any) -> tuple:
+    if not c_tvm:
+        return (False, False, False, _NAN)
+    if not isinstance(c_tvm, list) or len(c_tvm) != 3:
+        return (True, False, False, _NAN)
+    budget = c_tvm[2]
+    return (True, True, isinstance(budget, int), _number(budget, int))
+
+
+_MU_LOOP_FEATURES = [("truthy", "?"), ("ws_present", "?"), ("ws", "f8"),
+                     ("t_present", "?"), ("t", "f8")]
+
+
+def _mu_loop_features(mu: Any) -> tuple:
+    if not mu:
+        return (False, False, _NAN, False, _NAN)
+    ws_present = _contains(mu, "window_size")
+    t_present = _contains(mu, "threshold")
+    return (True,
+            ws_present, _number(mu["window_size"], int) if ws_present else _NAN,
+            t_present, _number(mu["threshold"]) if t_present else _NAN)
+
+
+_GSN_FEATURES = [("truthy", "?"), ("network_id", "?"), ("cf_present", "?"), ("cf", "f8"),
+                 ("links_present", "?"), ("links_list", "?"), ("links_len", "i8")]
+
+
+def _gsn_features(gsn: Any) -> tuple:
+    if not gsn:
+        return (False, False, False, _NAN, False, False, 0)
+    cf_present = _contains(gsn, "curiosity_factor")
+    links_present = _contains(gsn, "link_vectors")
+    links = gsn["link_vectors"] if links_present else None
+    return (True, _contains(gsn, "network_id"),
+            cf_present, _number(gsn["curiosity_factor"]) if cf_present else _NAN,
+            links_present, isinstance(links, list),
+            len(links) if isinstance(links, list) else 0)
+
+
+_EVF_FEATURES = [("truthy", "?"), ("shape_ok", "?"), ("radius", "f8"),
+                 ("branch_int", "?"), ("branch", "f8")]
+
+
+def _evf_features(evf: Any) -> tuple:
+    if not evf:
+        return (False, False, _NAN, False, _NAN)
+    if not isinstance(evf, list) or len(evf) != 3:
+        return (True, False, _NAN, False, _NAN)
+    return (True, True, _number(evf[1]), isinstance(evf[2], int), _number(evf[2], int))
+
+
+def _used(codes: np.ndarray, size: int) -> List[int]:
+    """Distinct non-negative codes below size."""
+    return np.flatnonzero(np.bincount(codes[codes >= 0], minlength=size)).tolist()
+
+
+def _blob_table(batch: PacketBatch, name: str, extract, fields):
+    """
+    Features of each distinct value of a nested field.
+    
+    Returns:
+        (table, codes): one table row per blob id plus a final row for None,
+        and the per-packet blob ids (-1, i.e. the last row, for None)
+    """
+    codes = batch._columns[f"{name}_blob"]
+    table = np.zeros(len(batch.blobs) + 1, dtype=np.dtype(fields))
+    table[-1] = extract(None)
+    for code in _used(codes, len(batch.blobs)):
+        table[code] = extract(json.loads(batch.blobs[code]))
+    return table, codes
+
+
+def _string_flags(batch: PacketBatch, name: str, predicate) -> np.ndarray:
+    """Boolean flag per string id, evaluated only for ids used by a list field."""
+    flags = np.zeros(len(batch.strings), dtype=bool)
+    values = batch.strings.values
+    for sid in _used(batch._columns[f"{name}_ids"], len(values)):
+        flags[sid] = predicate(values[sid])
+    return flags
+
+
+def _ragged_count(batch: PacketBatch, name: str, flags: np.ndarray) -> np.ndarray:
+    """Per-row count of list items whose string id is flagged."""
+    offsets = batch._columns[f"{name}_offsets"]
+    ids = batch._columns[f"{name}_ids"]
+    hits = np.zeros(len(ids) + 1, dtype=np.int32)
+    np.cumsum(flags[ids], out=hits[1:])
+    return hits[offsets[1:]] - hits[offsets[:-1]]
+
+
+def _in_unit(x: np.ndarray) -> np.ndarray:
+    """0 <= x <= 1 (False for NaN)."""
+    return (x >= 0.0) & (x <= 1.0)
+
+
+def validate_batch(packets: Union[PacketBatch, Iterable[Packet]],
+                   strict: bool = False) -> np.ndarray:
+    """
+    Validate many packets at once.
+    
+    Gives the same verdicts and error/warning counts as Validator.validate()
+    per packet, but evaluates the rules as NumPy masks: per packet for the
+    scalar and list fields, and per distinct value for the nested fields
+    (each kbm/c_tvm/mu_loop/gsn/evf value is decoded once, however many
+    packets share it). Values are judged as stored in the batch (JSON), so
+    a tuple counts as a list.
+    
+    Args:
+        packets: PacketBatch (fastest) or iterable of packets
+        strict: If True, warnings become errors
+        
+    Returns:
+        Array of BATCH_RESULT_DTYPE (valid, errors, warnings), one per packet
+    """
+    batch = packets if isinstance(packets, PacketBatch) else PacketBatch.from_packets(packets)
+    n = len(batch)
+    
+    # Intent: empty / very long
+    lengths = np.fromiter(map(len, batch.strings.values), dtype=np.int64,
+                          count=len(batch.strings))
+    intent_len = lengths[batch.intent]
+    errors = (intent_len == 0).astype(np.int32)
+    warnings = (intent_len > 200).astype(np.int32)
+    
+    # Divergence range / high divergence
+    d = batch.divergence
+    d_ok = _in_unit(d)
+    errors += ~d_ok
+    warnings += d_ok & (d > 0.7)
+    high_d = d > 0.5
+    
+    # Constraints: none at all / blank items
+    warnings += batch.list_lengths("constraints") == 0
+    errors += _ragged_count(batch, "constraints",
+                            _string_flags(batch, "constraints", lambda s: not s.strip()))
+    
+    # Immune: blank / very long items, divergence conflict
+    blank = _string_flags(batch, "immune", lambda s: not s.strip())
+    errors += _ragged_count(batch, "immune", blank)
+    warnings += _ragged_count(batch, "immune", ~blank & (lengths > 500))
+    warnings += (batch.list_lengths("immune") > 0) & high_d
+    
+    # Kinetic layer: kbm coherence vector (plus its divergence conflict)
+    kbm, codes = _blob_table(batch, "kbm", _kbm_features, _KBM_FEATURES)
+    v0, v1 = kbm["v0"], kbm["v1"]
+    pair = kbm["cv_pair"]
+    span = v1 - v0
+    errors += (kbm["cv_present"] & (~pair | (v0 > v1) | ~(_in_unit(v0) & _in_unit(v1))))[codes]
+    warnings += (pair & (span < 0.05))[codes]
+    warnings += (pair & (span < 0.1))[codes] & high_d
+    kinetic = kbm["truthy"][codes]
+    
+    # c_tvm token budget
+    c_tvm, codes = _blob_table(batch, "c_tvm", _c_tvm_features, _C_TVM_FEATURES)
+    budget = c_tvm["budget"]
+    budget_ok = c_tvm["shape_ok"] & c_tvm["budget_int"] & (budget > 0)
+    errors += (c_tvm["truthy"] & ~budget_ok)[codes]
+    warnings += (budget_ok & (budget > 10000))[codes]
+    kinetic |= c_tvm["truthy"][codes]
+    
+    # Foundation anchors
+    foundation_truthy = batch.foundation_present & (batch.list_lengths("foundation") > 0)
+    nonstandard = _string_flags(batch, "foundation", lambda s: s not in _STANDARD_FOUNDATIONS)
+    warnings += _ragged_count(batch, "foundation", nonstandard)
+    kinetic |= foundation_truthy
+    
+    # mu_loop is only checked when the kinetic layer is active
+    mu, codes = _blob_table(batch, "mu_loop", _mu_loop_features, _MU_LOOP_FEATURES)
+    mu_errors = (mu["truthy"] & mu["ws_present"] & ~(mu["ws"] > 0)).astype(np.int32)
+    mu_errors += mu["truthy"] & mu["t_present"] & ~_in_unit(mu["t"])
+    errors += mu_errors[codes] * kinetic
+    
+    # Gregarious layer (each field being set activates the layer)
+    gsn, codes = _blob_table(batch, "gsn", _gsn_features, _GSN_FEATURES)
+    cf = gsn["cf"]
+    cf_ok = _in_unit(cf)
+    gsn_errors = (gsn["cf_present"] & ~cf_ok).astype(np.int32)
+    gsn_errors += gsn["links_present"] & ~gsn["links_list"]
+    gsn_warnings = (gsn["truthy"] & ~gsn["network_id"]).astype(np.int32)
+    gsn_warnings += gsn["cf_present"] & cf_ok & (cf > 0.8)
+    gsn_warnings += gsn["links_list"] & (gsn["links_len"] > 100)
+    gsn_warnings += gsn["truthy"] & ~gsn["cf_present"]
+    errors += gsn_errors[codes]
+    warnings += gsn_warnings[codes]
+    
+    evf, codes = _blob_table(batch, "evf", _evf_features, _EVF_FEATURES)
+    shape_ok = evf["shape_ok"]
+    branch = evf["branch"]
+    branch_ok = evf["branch_int"] & (branch > 0)
+    evf_errors = (evf["truthy"] & ~shape_ok).astype(np.int32)
+    evf_errors += shape_ok & ~_in_unit(evf["radius"])
+    evf_errors += shape_ok & ~branch_ok
+    errors += evf_errors[codes]
+    warnings += (shape_ok & branch_ok & (branch > 20))[codes]
+    
+    if strict:
+        errors += warnings
+        warnings[:] = 0
+    
+    result = np.empty(n, dtype=BATCH_RESULT_DTYPE)
+    result["valid"] = errors == 0
+    result["errors"] = errors
+    result["warnings"] = warnings
+    return result
@@ -0,0 +1,192 @@
+"""
+VSE Core: Vocabulary Pool
+Bounded string interning for recurring packet tokens.
+
+Constraint, immune and foundation values come from a small vocabulary
+(``formal_tone``, ``3_sentences``, the four foundation anchors, ...), but
+every decoder allocates a fresh string per occurrence. A Vocabulary maps
+each distinct token to one shared str instance and a small integer id, so
+decoded packets share token storage and token sets can be compared as ids.
+
+The pool is bounded: once it holds max_size tokens, or for tokens longer
+than max_token_length, strings are passed through unchanged and get no id.
+Ids are never reassigned, so they stay valid for columnar storage.
+"""
+
+from typing import Dict, Iterable, List, Optional
+import sys
+import threading
+
+
+class Vocabulary:
+    """
+    Bounded pool of interned tokens with stable integer ids.
+
+    Usage:
+        vocab = Vocabulary()
+        constraints = vocab.intern_list(["formal_tone", "3_sentences"])
+        vocab.token_id("formal_tone")   # -> 0
+        vocab.stats()["hit_rate"]
+    """
+
+    def __init__(self, max_size: int = 65536, max_token_length: int = 64):
+        """
+        Initialize pool.
+
+        Args:
+            max_size: Maximum number of distinct tokens held
+            max_token_length: Longer strings are never interned
+        """
+        self.max_size = max_size
+        self.max_token_length = max_token_length
+        self.tokens: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._counts: List[int] = []
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.rejected = 0
+
+    def _add(self, token: str) -> int:
+        """Add a token; returns its id, or -1 if it cannot be pooled."""
+        if len(token) > self.max_token_length:
+            return -1
+        with self._lock:
+            tid = self._ids.get(token)
+            if tid is None:
+                if len(self.tokens) >= self.max_size:
+                    return -1
+                tid = len(self.tokens)
+                self.tokens.append(token)
+                self._counts.append(0)
+                self._ids[token] = tid
+            return tid
+
+    def token_id(self, token: str) -> int:
+        """
+        Id of a token, adding it if there is room.
+
+        Returns:
+            Integer id, or -1 if the token is not (and cannot be) pooled
+        """
+        tid = self._ids.get(token)
+        if tid is None:
+            tid = self._add(token)
+        return tid
+
+    def token(self, tid: int) -> str:
+        """Token for an id."""
+        return self.tokens[tid]
+
+    def ids(self, items: Iterable[str]) -> List[int]:
+        """Ids for several tokens (-1 for unpooled ones)."""
+        return [self.token_id(item) for item in items]
+
+    def intern(self, token: str) -> str:
+        """Return the pooled instance equal to token (or token itself)."""
+        return self.intern_list((token,))[0]
+
+    def intern_list(self, items: Iterable[str]) -> List[str]:
+        """
+        Replace each token by its pooled instance.
+
+        Args:
+            items: Decoded tokens
+
+        Returns:
+            New list of equal strings, sharing storage with the pool
+        """
+        ids = self._ids
+        tokens = self.tokens
+        counts = self._counts
+        result = []
+        pooled = []
+        rejected = 0
+        for item in items:
+            tid = ids.get(item)
+            if tid is None:
+                tid = self._add(item) if type(item) is str else -1
+                if tid < 0:
+                    rejected += 1
+                    result.append(item)
+                    continue
+            pooled.append(tid)
+            result.append(tokens[tid])
+        # Statistics are merged under the lock so concurrent decoders
+        # don't lose updates; skipped if clear() ran meanwhile
+        with self._lock:
+            if counts is self._counts:
+                for tid in pooled:
+                    counts[tid] += 1
+                self.lookups += len(result)
+                self.rejected += rejected
+        return result
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._ids
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the pool (strings + index)."""
+        return (
+            sum(sys.getsizeof(s) for s in self.tokens)
+            + sys.getsizeof(self.tokens)
+            + sys.getsizeof(self._ids)
+            + sys.getsizeof(self._counts)
+        )
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Pool effectiveness.
+
+        Returns:
+            Dictionary with tokens, lookups, hits, rejected, hit_rate,
+            saved_bytes (string allocations avoided by sharing) and
+            pool_bytes
+        """
+        with self._lock:
+            counted = list(zip(self.tokens, self._counts))
+            lookups = self.lookups
+            rejected = self.rejected
+        hits = 0
+        saved = 0
+        for token, count in counted:
+            if count > 1:
+                hits += count - 1
+                saved += (count - 1) * sys.getsizeof(token)
+        return {
+            "tokens": len(self.tokens),
+            "lookups": lookups,
+            "hits": hits,
+            "rejected": rejected,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "saved_bytes": saved,
+            "pool_bytes": self.nbytes(),
+        }
+
+    def clear(self) -> None:
+        """Drop every token and reset statistics (invalidates ids)."""
+        with self._lock:
+            self.tokens = []
+            self._ids = {}
+            self._counts = []
+            self.lookups = 0
+            self.rejected = 0
+
+
+# Pool shared by every Packet decoder
+default_vocabulary = Vocabulary()
+
+
+def get_default_vocabulary() -> Vocabulary:
+    """The pool Packet decoders intern into."""
+    return default_vocabulary
+
+
+def set_default_vocabulary(vocab: Optional[Vocabulary]) -> None:
+    """
+    Replace the shared pool (None disables interning in decoders).
+    """
+    global default_vocabulary
+    default_vocabulary = vocab